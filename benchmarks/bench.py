@@ -0,0 +1,343 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2024 Olivier Bernard (@pytoccaz)
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""Benchmarks of TfcClient and of the module core functions against the mock API.
+
+Each scenario runs against a C(mock_tfc.py) server started in a separate
+process, and reports the requests served, the wall time, the requests per
+second, and the peak memory allocated by the scenario (C(tracemalloc)) in a
+second pass, as tracing slows the first one down.
+
+    python benchmarks/bench.py                                  # 10k workspaces, 100 vars each
+    python benchmarks/bench.py --workspaces 1000 --latency 0.02 --only pages
+    python benchmarks/bench.py --save baseline.json
+    python benchmarks/bench.py --compare baseline.json          # exit status 1 on a regression
+
+Requires ansible-core and requests, as the modules do.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from urllib.request import urlopen
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+COLLECTION_DIR = os.path.dirname(BENCH_DIR)
+ORGANIZATION = 'org'
+TOKEN = 'benchmark-token'
+
+
+def import_collection():
+    """Make the working copy importable as C(ansible_collections.pytoccaz.terraform_cloud)."""
+    root = tempfile.mkdtemp(prefix='tfc-bench-')
+    namespace = os.path.join(root, 'ansible_collections', 'pytoccaz')
+    os.makedirs(namespace)
+    os.symlink(COLLECTION_DIR, os.path.join(namespace, 'terraform_cloud'))
+    sys.path.insert(0, root)
+
+
+def plugin(kind, name):
+    return importlib.import_module('ansible_collections.pytoccaz.terraform_cloud.plugins.%s.%s' % (kind, name))
+
+
+class MockProcess:
+    """The mock API served by a child process, so that its memory and CPU stay out of the measures."""
+
+    def __init__(self, args):
+        command = [sys.executable, os.path.join(BENCH_DIR, 'mock_tfc.py'),
+                   '--organization', ORGANIZATION,
+                   '--workspaces', str(args.workspaces), '--vars', str(args.vars), '--varsets', str(args.varsets),
+                   '--latency', str(args.latency), '--rate', str(args.server_rate),
+                   '--run-duration', str(args.run_duration)]
+        self.process = subprocess.Popen(command, stdout=subprocess.PIPE, universal_newlines=True)
+        self.url = self.process.stdout.readline().strip()
+        if not self.url:
+            raise RuntimeError('The mock API did not start.')
+
+    def requests(self):
+        with urlopen(self.url + '/_stats') as response:
+            return json.loads(response.read().decode('utf-8'))['requests']
+
+    def stop(self):
+        self.process.terminate()
+        self.process.wait()
+
+
+class Bench:
+
+    def __init__(self, args, mock):
+        self.args = args
+        self.mock = mock
+        self.results = {}
+
+        tfc = plugin('module_utils', 'tfc')
+        self.client_class = tfc.TfcClient
+        self.snapshot_file = os.path.join(tempfile.mkdtemp(prefix='tfc-bench-'), 'snapshot.json.gz')
+
+    def params(self, **params):
+        """Module parameters, as AnsibleModule would fill them."""
+        defaults = dict(
+            api_url=self.mock.url,
+            api_token=TOKEN,
+            validate_certs=True,
+            connection_timeout=30,
+            max_retries=5,
+            rate_limit=self.args.rate_limit,
+            max_workers=self.args.workers,
+        )
+        defaults.update(params)
+        return defaults
+
+    def client(self, **kwargs):
+        return self.client_class(TOKEN, url=self.mock.url, pool_maxsize=max(10, self.args.workers),
+                                 max_retries=5, rate_limit=self.args.rate_limit, **kwargs)
+
+    def sample(self):
+        """Workspace numbers spread over the organization."""
+        step = max(1, self.args.workspaces // self.args.sample)
+        return range(0, self.args.workspaces, step)[:self.args.sample]
+
+    def run(self, name, scenario):
+        before = self.mock.requests()
+        started = time.time()
+        items = scenario()
+        wall = time.time() - started
+        requests = self.mock.requests() - before
+
+        peak = None
+        if self.args.memory:
+            # tracing slows the allocations down, measure the memory in a pass of its own
+            tracemalloc.start()
+            scenario()
+            peak = round(tracemalloc.get_traced_memory()[1] / 1024.0 / 1024.0, 2)
+            tracemalloc.stop()
+
+        result = {
+            'items': items,
+            'requests': requests,
+            'wall': round(wall, 3),
+            'rps': round(requests / wall, 1) if wall else None,
+            'peak_mib': peak,
+        }
+        self.results[name] = result
+        print('%-36s %10d %10d %10.3f %10s %10s' % (name, items, requests, wall, result['rps'], peak))
+        sys.stdout.flush()
+
+    # TfcClient
+
+    def client_items_sequential(self):
+        with self.client() as client:
+            return sum(1 for item in client.items('/organizations/%s/workspaces' % ORGANIZATION,
+                                                  params=[('page[size]', 100)]))
+
+    def client_items_concurrent(self):
+        with self.client() as client:
+            return sum(1 for item in client.items('/organizations/%s/workspaces' % ORGANIZATION,
+                                                  params=[('page[size]', 100)], max_workers=self.args.workers))
+
+    def client_stream_items(self):
+        with self.client() as client:
+            return sum(1 for item in client.stream_items('/organizations/%s/workspaces' % ORGANIZATION,
+                                                         params=[('page[size]', 100)]))
+
+    def client_read_vars(self):
+        with self.client() as client:
+            return sum(len(client.read('/workspaces/ws-%016d/vars' % number)['data']) for number in self.sample())
+
+    # modules
+
+    def get_workspaces(self):
+        module = plugin('modules', 'tfc_workspaces_info')
+        r = module.get_workspaces(self.params(organization=ORGANIZATION, all_pages=True, page_number=1,
+                                              page_size=100))
+        return len(r['data'])
+
+    def get_workspaces_stream(self):
+        module = plugin('modules', 'tfc_workspaces_info')
+        r = module.get_workspaces(self.params(organization=ORGANIZATION, stream=True, page_number=1,
+                                              page_size=100, projection=['id', 'attributes.name']))
+        return len(r['data'])
+
+    def workspaces_sync_full(self):
+        if os.path.exists(self.snapshot_file):
+            os.remove(self.snapshot_file)
+        return self.workspaces_sync_incremental()
+
+    def workspaces_sync_incremental(self):
+        # a full sync when run without workspaces_sync_full before
+        module = plugin('modules', 'tfc_workspaces_sync')
+        r = module.sync_workspaces(self.params(organization=ORGANIZATION, snapshot_file=self.snapshot_file,
+                                               page_size=100))
+        return r['count']
+
+    def get_workspace(self):
+        module = plugin('modules', 'tfc_workspace_info')
+        for number in self.sample():
+            module.get_workspace(self.params(organization=ORGANIZATION, workspace_name='workspace-%05d' % number))
+        return len(self.sample())
+
+    def get_workspace_vars(self):
+        module = plugin('modules', 'tfc_workspace_vars_info')
+        return sum(len(module.get_workspace_vars(self.params(workspace_id='ws-%016d' % number))['data'])
+                   for number in self.sample())
+
+    def update_var(self):
+        module = plugin('modules', 'tfc_workspace_var_update')
+        for number in self.sample():
+            module.update_var(self.params(workspace_id='ws-%016d' % number, variable_key='var_0',
+                                          attributes={'value': 'bench-%f' % time.time()}))
+        return len(self.sample())
+
+    def update_var_by_id(self):
+        module = plugin('modules', 'tfc_var_update')
+        for number in self.sample():
+            module.update_var(self.params(variable_id='var-%08d%08d' % (number, 1),
+                                          attributes={'value': 'bench-%f' % time.time()}))
+        return len(self.sample())
+
+    def update_vars(self):
+        module = plugin('modules', 'tfc_workspace_vars_update')
+        variables = dict(('var_%d' % index, 'bench-%f' % time.time()) for index in range(0, self.args.vars, 2))
+        for number in self.sample()[:10]:
+            module.update_vars(self.params(workspace_id='ws-%016d' % number, variables=variables))
+        return len(self.sample()[:10]) * len(variables)
+
+    def organization_vars(self):
+        module = plugin('modules', 'tfc_organization_vars_info')
+        r = asyncio.run(module.get_organization_vars(self.params(organization=ORGANIZATION, key='var_1',
+                                                                 value='value_1', varsets=True, index_ttl=3600,
+                                                                 page_size=100)))
+        return r['index']['variables']
+
+    def patch_workspace(self):
+        module = plugin('modules', 'tfc_workspace_update')
+        for number in self.sample():
+            module.patch_workspace(self.params(workspace_id='ws-%016d' % number,
+                                               attributes={'description': 'bench-%f' % time.time()}))
+        return len(self.sample())
+
+    def patch_workspaces(self):
+        module = plugin('modules', 'tfc_workspaces_update')
+        r = module.patch_workspaces(self.params(organization=ORGANIZATION, search_wildcard_name='workspace-*1',
+                                                page_size=100, attributes={'description': 'bench-%f' % time.time()}))
+        return len(r['updated'])
+
+    def queue_runs(self):
+        module = plugin('modules', 'tfc_run')
+        r = module.queue_runs(self.params(workspace_ids=['ws-%016d' % number for number in self.sample()[:50]],
+                                          message='bench', attributes={'auto-apply': True}, wait=True,
+                                          wait_timeout=600, poll_interval=0.2, poll_interval_max=2))
+        return len(r['runs'])
+
+    def queue_runs_webhook(self):
+        module = plugin('modules', 'tfc_run')
+        r = module.queue_runs(self.params(workspace_ids=['ws-%016d' % number for number in self.sample()[:50]],
+                                          message='bench', attributes={'auto-apply': True}, wait=True,
+                                          wait_timeout=600, wait_strategy='webhook', webhook_host='127.0.0.1',
+                                          webhook_port=0, webhook_create=True, webhook_grace=30))
+        return len(r['runs'])
+
+    SCENARIOS = (
+        ('pages', 'client_items_sequential'),
+        ('pages', 'client_items_concurrent'),
+        ('pages', 'client_stream_items'),
+        ('vars', 'client_read_vars'),
+        ('pages', 'get_workspaces'),
+        ('pages', 'get_workspaces_stream'),
+        ('pages', 'workspaces_sync_full'),
+        ('pages', 'workspaces_sync_incremental'),
+        ('workspace', 'get_workspace'),
+        ('vars', 'get_workspace_vars'),
+        ('vars', 'update_var'),
+        ('vars', 'update_var_by_id'),
+        ('vars', 'update_vars'),
+        ('vars', 'organization_vars'),
+        ('workspace', 'patch_workspace'),
+        ('workspace', 'patch_workspaces'),
+        ('runs', 'queue_runs'),
+        ('runs', 'queue_runs_webhook'),
+    )
+
+    def run_all(self, only=None):
+        print('%-36s %10s %10s %10s %10s %10s' % ('scenario', 'items', 'requests', 'wall (s)', 'req/s', 'peak MiB'))
+        for group, name in self.SCENARIOS:
+            if only and group not in only and name not in only:
+                continue
+            self.run(name, getattr(self, name))
+
+
+def compare(results, baseline, tolerance):
+    """Return the scenarios slower or hungrier than the baseline beyond the tolerance."""
+    regressions = []
+    for name, result in sorted(results.items()):
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        for measure in ('wall', 'peak_mib', 'requests'):
+            if reference.get(measure) and result.get(measure) and result[measure] > reference[measure] * (1 + tolerance):
+                regressions.append('%s: %s %s -> %s' % (name, measure, reference[measure], result[measure]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--workspaces', type=int, default=10000)
+    parser.add_argument('--vars', type=int, default=100, help='variables per workspace')
+    parser.add_argument('--varsets', type=int, default=10, help='variable sets of the organization')
+    parser.add_argument('--sample', type=int, default=200, help='workspaces used by the per-workspace scenarios')
+    parser.add_argument('--workers', type=int, default=8, help='max_workers of the concurrent scenarios')
+    parser.add_argument('--latency', type=float, default=0, help='seconds added by the mock to every answer')
+    parser.add_argument('--server-rate', type=int, default=0, help='requests per second allowed by the mock')
+    parser.add_argument('--run-duration', type=float, default=1.0, help='seconds a run takes to be applied by the mock')
+    parser.add_argument('--rate-limit', type=int, default=0, help='rate_limit option of the client')
+    parser.add_argument('--no-memory', dest='memory', action='store_false',
+                        help='skip the second pass of each scenario measuring its peak memory')
+    parser.add_argument('--only', nargs='*', help='scenario names or groups (pages, vars, workspace, runs)')
+    parser.add_argument('--save', help='write the results to this JSON file')
+    parser.add_argument('--compare', help='JSON file of baseline results')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed relative regression')
+    args = parser.parse_args(argv)
+
+    import_collection()
+    mock = MockProcess(args)
+    try:
+        print('mock API at %s: %d workspaces, %d variables each, %.3fs latency' % (
+            mock.url, args.workspaces, args.vars, args.latency))
+        bench = Bench(args, mock)
+        bench.run_all(args.only)
+    finally:
+        mock.stop()
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'args': vars(args), 'results': bench.results}, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(bench.results, baseline, args.tolerance)
+        for regression in regressions:
+            print('REGRESSION %s' % regression)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,765 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2024 Olivier Bernard (@pytoccaz)
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""Local stand-in for the HCP Terraform API, to run the modules and the benchmarks offline.
+
+It serves the routes used by the collection: workspaces (listing with
+pagination, search and sparse fieldsets, read and update by ID or name) and
+workspace variables (list, create, update, delete), variable sets with
+their variables, and runs going through their statuses in C(--run-duration)
+seconds (a run whose message starts with C(fail) errors after its plan).
+Workspaces with a notification configuration get their runs driven in the
+background and notified to its url, signed with its token, as the API does;
+C(--webhook-loss) drops a share of the deliveries. Workspace variables are generated on first access, so that
+large organizations start instantly.
+
+The API budget of HCP Terraform is mimicked with a token bucket answering
+C(429) with C(Retry-After) and C(X-RateLimit-*) headers, and a latency can be
+added to every answer. C(GET /_stats) returns the number of requests served.
+
+    python benchmarks/mock_tfc.py --workspaces 10000 --vars 100 --latency 0.02 --rate 30
+
+The url to use as C(api_url) is printed on the first line of the output.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import argparse
+import hashlib
+import hmac
+import json
+import random
+import re
+import sys
+import threading
+import time
+
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode, urlsplit
+from urllib.request import Request, urlopen
+
+API_PREFIX = '/api/v2'
+MAX_PAGE_SIZE = 100
+PROJECTS = 10
+TAGS = 10
+VARSET_SPREAD = 50
+VARSET_VARS = 5
+# status of a run from the given fraction of its duration, a run not auto-applied stops at planned
+RUN_PHASES = [('pending', 0), ('plan_queued', 0.1), ('planning', 0.2), ('planned', 0.5),
+              ('apply_queued', 0.6), ('applying', 0.7), ('applied', 1.0)]
+RUN_FINAL_STATUSES = ('applied', 'planned_and_finished', 'errored', 'discarded', 'canceled', 'force_canceled')
+RUN_TRIGGERS = {'planning': 'run:planning', 'applying': 'run:applying', 'applied': 'run:completed',
+                'planned_and_finished': 'run:completed', 'errored': 'run:errored'}
+
+
+def timestamp(seconds):
+    return datetime.fromtimestamp(seconds, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+
+class MockError(Exception):
+
+    def __init__(self, status, detail=None):
+        super(MockError, self).__init__(detail)
+        self.status = status
+        self.detail = detail
+
+
+class RateLimiter:
+    """Token bucket of the server, C(rate) requests per second."""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = float(rate)
+        self.updated = time.time()
+        self.lock = threading.Lock()
+
+    def take(self):
+        """Return the rate limit headers, and the delay to wait when the request is refused."""
+        with self.lock:
+            now = time.time()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+            delay = None
+            if self.tokens >= 1:
+                self.tokens -= 1
+            else:
+                delay = (1 - self.tokens) / self.rate
+
+            headers = {
+                'X-RateLimit-Limit': str(self.rate),
+                'X-RateLimit-Remaining': str(int(self.tokens)),
+                'X-RateLimit-Reset': '%.3f' % (max(0, 1 - self.tokens) / self.rate),
+            }
+            return headers, delay
+
+
+class MockState:
+    """The organization served, with its workspaces, their variables and the variable sets."""
+
+    def __init__(self, organization='org', workspaces=100, vars=10, varsets=0, run_duration=1.0, webhook_loss=0.0):
+        self.organization = organization
+        self.vars_per_workspace = vars
+        self.base_url = ''
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.routes = {}
+
+        self.workspaces = {}
+        self.names = {}
+        self.vars = {}
+        self.var_owners = {}
+        self.created = 0
+        self.runs = {}
+        self.run_duration = run_duration
+        self.notification_configurations = {}
+        self.webhook_loss = webhook_loss
+        self.webhooks = 0
+
+        started = time.time() - workspaces
+        for number in range(workspaces):
+            workspace_id = 'ws-%016d' % number
+            name = 'workspace-%05d' % number
+            self.workspaces[workspace_id] = {
+                'id': workspace_id,
+                'type': 'workspaces',
+                'attributes': {
+                    'name': name,
+                    'description': None,
+                    'auto-apply': False,
+                    'execution-mode': 'remote',
+                    'terraform-version': '1.5.7',
+                    'working-directory': '',
+                    'tag-names': ['tag-%d' % (number % TAGS)],
+                    'created-at': timestamp(started + number),
+                    'updated-at': timestamp(started + number),
+                },
+                'relationships': {
+                    'organization': {'data': {'id': organization, 'type': 'organizations'}},
+                    'project': {'data': {'id': 'prj-%016d' % (number % PROJECTS), 'type': 'projects'}},
+                },
+                'links': {'self': '%s/workspaces/%s' % (API_PREFIX, workspace_id)},
+            }
+            self.names[name] = workspace_id
+
+        self.ordered = sorted(self.workspaces)
+
+        # the first variable set is global, the second has priority, the others apply to a project
+        # or to one workspace out of VARSET_SPREAD, and they all define VARSET_VARS variables
+        self.varsets = {}
+        self.varset_variables = {}
+        for number in range(varsets):
+            varset_id = 'varset-%016d' % number
+            variables = self.varset_variables[varset_id] = {}
+            for index in range(VARSET_VARS):
+                var_id = 'var-s%07d%08d' % (number, index)
+                variables[var_id] = {
+                    'id': var_id,
+                    'type': 'vars',
+                    'attributes': {
+                        'key': 'var_%d' % index,
+                        'value': 'varset_value_%d' % index,
+                        'description': None,
+                        'sensitive': index == VARSET_VARS - 1,
+                        'category': 'env' if index % 2 else 'terraform',
+                        'hcl': False,
+                    },
+                    'relationships': {
+                        'configurable': {'data': {'id': varset_id, 'type': 'varsets'}},
+                    },
+                }
+            applied = number > 1 and number % 2 == 0
+            self.varsets[varset_id] = {
+                'id': varset_id,
+                'type': 'varsets',
+                'attributes': {
+                    'name': 'varset-%03d' % number,
+                    'description': '',
+                    'global': number == 0,
+                    'priority': number == 1,
+                    'var-count': VARSET_VARS,
+                    'updated-at': timestamp(started),
+                },
+                'relationships': {
+                    'workspaces': {'data': [] if number < 2 or applied else [
+                        {'id': 'ws-%016d' % workspace, 'type': 'workspaces'}
+                        for workspace in range(number, workspaces, VARSET_SPREAD)]},
+                    'projects': {'data': [{'id': 'prj-%016d' % (number % PROJECTS), 'type': 'projects'}]
+                                 if applied else []},
+                    'vars': {'data': [{'id': var_id, 'type': 'vars'} for var_id in variables]},
+                },
+            }
+
+    # workspaces
+
+    def _workspace(self, workspace_id):
+        workspace = self.workspaces.get(workspace_id)
+        if workspace is None:
+            raise MockError(404, 'workspace %s not found' % workspace_id)
+        return workspace
+
+    def _workspace_by_name(self, organization, name):
+        if organization != self.organization or name not in self.names:
+            raise MockError(404, 'workspace %s not found' % name)
+        return self.workspaces[self.names[name]]
+
+    @staticmethod
+    def _sparse(resource, query):
+        fields = query.get('fields[%s]' % resource['type'])
+        if fields is None:
+            return resource
+        fields = fields.split(',')
+        sparse = {'id': resource['id'], 'type': resource['type']}
+        sparse['attributes'] = dict((k, v) for k, v in resource['attributes'].items() if k in fields)
+        relationships = dict((k, v) for k, v in (resource.get('relationships') or {}).items() if k in fields)
+        if relationships:
+            sparse['relationships'] = relationships
+        return sparse
+
+    def _included(self, workspaces, query):
+        included = {}
+        for name in (query.get('include') or '').split(','):
+            for workspace in workspaces:
+                data = ((workspace.get('relationships') or {}).get(name) or {}).get('data')
+                if data is not None:
+                    included[(data['type'], data['id'])] = dict(data, attributes={})
+        return list(included.values())
+
+    def _update_workspace(self, workspace, body):
+        attributes = ((body or {}).get('data') or {}).get('attributes') or {}
+        with self.lock:
+            name = attributes.get('name')
+            if name is not None and name != workspace['attributes']['name']:
+                if name in self.names:
+                    raise MockError(422, 'name %s has already been taken' % name)
+                del self.names[workspace['attributes']['name']]
+                self.names[name] = workspace['id']
+            workspace['attributes'].update(attributes)
+            workspace['attributes']['updated-at'] = timestamp(time.time())
+        return workspace
+
+    def _paginate(self, resources, query, path):
+        """Return the page of resources asked for, and the document with its links and pagination meta."""
+        size = min(int(query.get('page[size]', 20)), MAX_PAGE_SIZE)
+        number = int(query.get('page[number]', 1))
+        total_pages = max(1, (len(resources) + size - 1) // size)
+        page = resources[(number - 1) * size:number * size]
+
+        def link(page_number):
+            if page_number is None:
+                return None
+            return '%s?%s' % (self.base_url + API_PREFIX + path,
+                              urlencode(dict(query, **{'page[number]': page_number, 'page[size]': size})))
+
+        document = {
+            'links': {
+                'self': link(number),
+                'first': link(1),
+                'prev': link(number - 1 if number > 1 else None),
+                'next': link(number + 1 if number < total_pages else None),
+                'last': link(total_pages),
+            },
+            'meta': {'pagination': {
+                'current-page': number,
+                'page-size': size,
+                'prev-page': number - 1 if number > 1 else None,
+                'next-page': number + 1 if number < total_pages else None,
+                'total-pages': total_pages,
+                'total-count': len(resources),
+            }},
+        }
+        return page, document
+
+    def list_workspaces(self, method, query, body, organization):
+        if organization != self.organization:
+            raise MockError(404, 'organization %s not found' % organization)
+
+        workspaces = [self.workspaces[workspace_id] for workspace_id in self.ordered]
+
+        if query.get('search[name]'):
+            workspaces = [w for w in workspaces if query['search[name]'] in w['attributes']['name']]
+        if query.get('search[wildcard-name]'):
+            pattern = re.compile('^%s$' % re.escape(query['search[wildcard-name]']).replace(r'\*', '.*'))
+            workspaces = [w for w in workspaces if pattern.match(w['attributes']['name'])]
+        if query.get('search[tags]'):
+            tags = set(query['search[tags]'].split(','))
+            workspaces = [w for w in workspaces if tags.issubset(w['attributes']['tag-names'])]
+        if query.get('filter[project][id]'):
+            workspaces = [w for w in workspaces
+                          if w['relationships']['project']['data']['id'] == query['filter[project][id]']]
+
+        page, document = self._paginate(workspaces, query, '/organizations/%s/workspaces' % organization)
+        document['data'] = [self._sparse(w, query) for w in page]
+        if query.get('include'):
+            document['included'] = self._included(page, query)
+        return 200, document
+
+    def workspace_by_name(self, method, query, body, organization, name):
+        workspace = self._workspace_by_name(organization, name)
+        if method == 'PATCH':
+            workspace = self._update_workspace(workspace, body)
+        document = {'data': self._sparse(workspace, query)}
+        if query.get('include'):
+            document['included'] = self._included([workspace], query)
+        return 200, document
+
+    def workspace(self, method, query, body, workspace_id):
+        workspace = self._workspace(workspace_id)
+        if method == 'PATCH':
+            workspace = self._update_workspace(workspace, body)
+        document = {'data': self._sparse(workspace, query)}
+        if query.get('include'):
+            document['included'] = self._included([workspace], query)
+        return 200, document
+
+    # variables
+
+    def _vars(self, workspace_id):
+        self._workspace(workspace_id)
+        with self.lock:
+            if workspace_id not in self.vars:
+                number = int(workspace_id[3:])
+                variables = self.vars[workspace_id] = {}
+                for index in range(self.vars_per_workspace):
+                    var_id = 'var-%08d%08d' % (number, index)
+                    variables[var_id] = {
+                        'id': var_id,
+                        'type': 'vars',
+                        'attributes': {
+                            'key': 'var_%d' % index,
+                            'value': 'value_%d' % index,
+                            'description': None,
+                            'sensitive': index % 10 == 9,
+                            'category': 'env' if index % 2 else 'terraform',
+                            'hcl': False,
+                        },
+                        'relationships': {
+                            'configurable': {'data': {'id': workspace_id, 'type': 'workspaces'}},
+                        },
+                    }
+                    self.var_owners[var_id] = workspace_id
+            return self.vars[workspace_id]
+
+    @staticmethod
+    def _shown(var):
+        # the API never returns sensitive values
+        if var['attributes']['sensitive']:
+            return dict(var, attributes=dict(var['attributes'], value=None))
+        return var
+
+    def _update_var(self, var, body):
+        attributes = ((body or {}).get('data') or {}).get('attributes') or {}
+        with self.lock:
+            var['attributes'].update(attributes)
+        return 200, {'data': self._shown(var)}
+
+    def workspace_vars(self, method, query, body, workspace_id):
+        variables = self._vars(workspace_id)
+
+        if method == 'POST':
+            attributes = ((body or {}).get('data') or {}).get('attributes') or {}
+            if not attributes.get('key'):
+                raise MockError(422, 'key is missing')
+            category = attributes.get('category', 'terraform')
+            with self.lock:
+                for var in variables.values():
+                    if var['attributes']['key'] == attributes['key'] and var['attributes']['category'] == category:
+                        raise MockError(422, 'key %s has already been taken' % attributes['key'])
+                self.created += 1
+                var_id = 'var-new%013d' % self.created
+                var = variables[var_id] = {
+                    'id': var_id,
+                    'type': 'vars',
+                    'attributes': dict({'value': None, 'description': None, 'sensitive': False,
+                                        'category': category, 'hcl': False}, **attributes),
+                    'relationships': {
+                        'configurable': {'data': {'id': workspace_id, 'type': 'workspaces'}},
+                    },
+                }
+                self.var_owners[var_id] = workspace_id
+            return 201, {'data': self._shown(var)}
+
+        return 200, {'data': [self._shown(var) for var in variables.values()]}
+
+    def workspace_var(self, method, query, body, workspace_id, var_id):
+        variables = self._vars(workspace_id)
+        var = variables.get(var_id)
+        if var is None:
+            raise MockError(404, 'variable %s not found' % var_id)
+
+        if method == 'DELETE':
+            with self.lock:
+                variables.pop(var_id, None)
+                self.var_owners.pop(var_id, None)
+            return 204, None
+
+        return self._update_var(var, body)
+
+    def var(self, method, query, body, var_id):
+        # C(/vars/:id) also finds the variables not generated yet
+        match = re.match(r'^var-(\d{8})\d{8}$', var_id)
+        if var_id not in self.var_owners and match:
+            self._vars('ws-%016d' % int(match.group(1)))
+
+        workspace_id = self.var_owners.get(var_id)
+        if workspace_id is None:
+            raise MockError(404, 'variable %s not found' % var_id)
+        return self._update_var(self.vars[workspace_id][var_id], body)
+
+    # variable sets
+
+    def list_varsets(self, method, query, body, organization):
+        if organization != self.organization:
+            raise MockError(404, 'organization %s not found' % organization)
+
+        varsets = [self.varsets[varset_id] for varset_id in sorted(self.varsets)]
+        page, document = self._paginate(varsets, query, '/organizations/%s/varsets' % organization)
+        document['data'] = page
+        return 200, document
+
+    def varset(self, method, query, body, varset_id):
+        if varset_id not in self.varsets:
+            raise MockError(404, 'variable set %s not found' % varset_id)
+        return 200, {'data': self.varsets[varset_id]}
+
+    def varset_vars(self, method, query, body, varset_id):
+        if varset_id not in self.varsets:
+            raise MockError(404, 'variable set %s not found' % varset_id)
+        return 200, {'data': [self._shown(var) for var in self.varset_variables[varset_id].values()]}
+
+    # runs
+
+    def _run_progress(self, run):
+        """Move a run along its phases, given the time elapsed since its creation."""
+        attributes = run['attributes']
+        if attributes['status'] in RUN_FINAL_STATUSES:
+            return
+
+        elapsed = (time.time() - run['meta']['created']) / (self.run_duration or 1e-9)
+        if attributes['message'].startswith('fail'):
+            phases = RUN_PHASES[:3] + [('errored', 0.5)]
+        elif attributes['plan-only']:
+            phases = RUN_PHASES[:3] + [('planned_and_finished', 0.5)]
+        elif not attributes['auto-apply'] and not run['meta']['confirmed']:
+            phases = RUN_PHASES[:4]
+        else:
+            phases = RUN_PHASES
+
+        for status, at in phases[1:]:
+            if elapsed < at:
+                break
+            key = '%s-at' % status.replace('_', '-')
+            if key not in attributes['status-timestamps']:
+                attributes['status-timestamps'][key] = timestamp(run['meta']['created'] + at * self.run_duration)
+            attributes['status'] = status
+
+        # a run not auto-applied waits at planned for a confirmation
+        attributes['actions']['is-confirmable'] = attributes['status'] == 'planned' and phases == RUN_PHASES[:4]
+
+    def create_run(self, method, query, body):
+        data = (body or {}).get('data') or {}
+        attributes = data.get('attributes') or {}
+        workspace_id = (((data.get('relationships') or {}).get('workspace') or {}).get('data') or {}).get('id')
+        workspace = self._workspace(workspace_id)
+
+        with self.lock:
+            run_id = 'run-%016d' % (len(self.runs) + 1)
+            created = time.time()
+            run = self.runs[run_id] = {
+                'id': run_id,
+                'type': 'runs',
+                'attributes': {
+                    'status': 'pending',
+                    'message': attributes.get('message') or 'Queued manually using the API',
+                    'is-destroy': bool(attributes.get('is-destroy')),
+                    'plan-only': bool(attributes.get('plan-only')),
+                    'auto-apply': attributes.get('auto-apply', workspace['attributes']['auto-apply']),
+                    'created-at': timestamp(created),
+                    'status-timestamps': {},
+                    'actions': {'is-cancelable': True, 'is-confirmable': False, 'is-discardable': False},
+                },
+                'relationships': {
+                    'workspace': {'data': {'id': workspace_id, 'type': 'workspaces'}},
+                },
+                'meta': {'created': created, 'confirmed': False},
+            }
+            notified = any(configuration['workspace_id'] == workspace_id
+                           for configuration in self.notification_configurations.values())
+
+        if notified:
+            threading.Thread(target=self._drive_run, args=(run,), daemon=True).start()
+        return 201, {'data': self._shown_run(run)}
+
+    def _drive_run(self, run):
+        """Move a run of a notifying workspace along its phases, sending a notification on each change."""
+        self._notify(run, 'run:created')
+        last = run['attributes']['status']
+        while True:
+            time.sleep(max(0.01, self.run_duration / 20))
+            with self.lock:
+                self._run_progress(run)
+                status = run['attributes']['status']
+                confirmable = run['attributes']['actions']['is-confirmable']
+            if status != last:
+                trigger = 'run:needs_attention' if confirmable else RUN_TRIGGERS.get(status)
+                if trigger is not None:
+                    self._notify(run, trigger)
+                last = status
+            if status in RUN_FINAL_STATUSES or confirmable:
+                return
+
+    @staticmethod
+    def _shown_run(run):
+        return dict((key, value) for key, value in run.items() if key != 'meta')
+
+    def run(self, method, query, body, run_id):
+        run = self.runs.get(run_id)
+        if run is None:
+            raise MockError(404, 'run %s not found' % run_id)
+        with self.lock:
+            self._run_progress(run)
+        return 200, {'data': self._sparse(self._shown_run(run), query)}
+
+    # notifications
+
+    def _deliver(self, configuration, payload):
+        if random.random() < self.webhook_loss:
+            return
+        body = json.dumps(payload).encode('utf-8')
+        headers = {'Content-Type': 'application/json'}
+        if configuration['attributes'].get('token'):
+            headers['X-TFE-Notification-Signature'] = hmac.new(
+                configuration['attributes']['token'].encode('utf-8'), body, hashlib.sha512).hexdigest()
+        try:
+            urlopen(Request(configuration['attributes']['url'], data=body, headers=headers), timeout=5).close()
+        except (IOError, OSError):
+            # like the API, a failed delivery is not retried
+            return
+        with self.lock:
+            self.webhooks += 1
+
+    def _notify(self, run, trigger):
+        workspace_id = run['relationships']['workspace']['data']['id']
+        with self.lock:
+            configurations = [configuration for configuration in self.notification_configurations.values()
+                              if configuration['workspace_id'] == workspace_id
+                              and configuration['attributes']['enabled']
+                              and trigger in configuration['attributes']['triggers']]
+            attributes = run['attributes']
+            payload = {
+                'payload_version': 1,
+                'run_url': '%s/app/%s/workspaces/%s/runs/%s' % (self.base_url, self.organization,
+                                                                self.workspaces[workspace_id]['attributes']['name'],
+                                                                run['id']),
+                'run_id': run['id'],
+                'run_message': attributes['message'],
+                'run_created_at': attributes['created-at'],
+                'run_created_by': 'ansible',
+                'workspace_id': workspace_id,
+                'workspace_name': self.workspaces[workspace_id]['attributes']['name'],
+                'organization_name': self.organization,
+                'notifications': [{
+                    'message': 'Run %s' % trigger.split(':')[1],
+                    'trigger': trigger,
+                    'run_status': attributes['status'],
+                    'run_updated_at': timestamp(time.time()),
+                    'run_updated_by': 'ansible',
+                }],
+            }
+        for configuration in configurations:
+            self._deliver(configuration, dict(payload, notification_configuration_id=configuration['id']))
+
+    def workspace_notifications(self, method, query, body, workspace_id):
+        self._workspace(workspace_id)
+        attributes = ((body or {}).get('data') or {}).get('attributes') or {}
+        if not attributes.get('url') or not attributes.get('name'):
+            raise MockError(422, 'name and url are required')
+
+        with self.lock:
+            notification_id = 'nc-%016d' % (len(self.notification_configurations) + 1)
+            configuration = self.notification_configurations[notification_id] = {
+                'id': notification_id,
+                'type': 'notification-configurations',
+                'attributes': dict({'enabled': False, 'triggers': [], 'token': None}, **attributes),
+                'workspace_id': workspace_id,
+            }
+
+        if configuration['attributes']['enabled']:
+            # verify the destination, as the API does on creation
+            verification = {'payload_version': 1, 'notification_configuration_id': notification_id, 'run_id': None,
+                            'notifications': [{'message': 'Verification of %s' % attributes['name'],
+                                               'trigger': 'verification'}]}
+            threading.Thread(target=self._deliver, args=(configuration, verification), daemon=True).start()
+
+        shown = dict((key, value) for key, value in configuration.items() if key != 'workspace_id')
+        shown['attributes'] = dict(shown['attributes'], token=None)
+        return 201, {'data': shown}
+
+    def notification_configuration(self, method, query, body, notification_id):
+        with self.lock:
+            if self.notification_configurations.pop(notification_id, None) is None:
+                raise MockError(404, 'notification configuration %s not found' % notification_id)
+        return 204, None
+
+    def stats(self, method, query, body):
+        with self.lock:
+            return 200, {'requests': self.requests, 'routes': dict(self.routes), 'webhooks': self.webhooks}
+
+
+ROUTES = [
+    (('GET',), r'/organizations/(?P<organization>[^/]+)/workspaces', 'list_workspaces'),
+    (('GET', 'PATCH'), r'/organizations/(?P<organization>[^/]+)/workspaces/(?P<name>[^/]+)', 'workspace_by_name'),
+    (('GET', 'PATCH'), r'/workspaces/(?P<workspace_id>[^/]+)', 'workspace'),
+    (('GET', 'POST'), r'/workspaces/(?P<workspace_id>[^/]+)/vars', 'workspace_vars'),
+    (('PATCH', 'DELETE'), r'/workspaces/(?P<workspace_id>[^/]+)/vars/(?P<var_id>[^/]+)', 'workspace_var'),
+    (('PATCH',), r'/vars/(?P<var_id>[^/]+)', 'var'),
+    (('GET',), r'/organizations/(?P<organization>[^/]+)/varsets', 'list_varsets'),
+    (('GET',), r'/varsets/(?P<varset_id>[^/]+)', 'varset'),
+    (('GET',), r'/varsets/(?P<varset_id>[^/]+)/relationships/vars', 'varset_vars'),
+    (('POST',), r'/runs', 'create_run'),
+    (('GET',), r'/runs/(?P<run_id>[^/]+)', 'run'),
+    (('POST',), r'/workspaces/(?P<workspace_id>[^/]+)/notification-configurations', 'workspace_notifications'),
+    (('DELETE',), r'/notification-configurations/(?P<notification_id>[^/]+)', 'notification_configuration'),
+]
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    # keep-alive, as the API does
+    protocol_version = 'HTTP/1.1'
+    # headers and body are written apart, do not let Nagle hold the body back
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            BaseHTTPRequestHandler.log_message(self, format, *args)
+
+    def _answer(self, status, document=None, headers=None):
+        body = json.dumps(document).encode('utf-8') if document is not None else b''
+        headers = dict(headers or {})
+
+        if self.command == 'GET' and status == 200:
+            etag = '"%s"' % hashlib.md5(body).hexdigest()
+            headers['ETag'] = etag
+            if self.headers.get('If-None-Match') == etag:
+                status, body = 304, b''
+
+        self.send_response(status)
+        if body:
+            self.send_header('Content-Type', 'application/vnd.api+json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self):
+        server = self.server
+        state = server.state
+        parts = urlsplit(self.path)
+        query = dict(parse_qsl(parts.query, keep_blank_values=True))
+
+        length = int(self.headers.get('Content-Length') or 0)
+        raw_body = self.rfile.read(length) if length else b''
+
+        if parts.path == '/_stats':
+            return self._answer(*state.stats(self.command, query, None))
+
+        with state.lock:
+            state.requests += 1
+
+        if server.latency or server.jitter:
+            time.sleep(server.latency + random.uniform(0, server.jitter))
+
+        headers = {}
+        if server.rate_limiter is not None:
+            headers, delay = server.rate_limiter.take()
+            if delay is not None:
+                headers['Retry-After'] = '%.3f' % delay
+                return self._answer(429, {'errors': [{'status': '429', 'title': 'Too many requests'}]}, headers)
+
+        if not parts.path.startswith(API_PREFIX + '/'):
+            return self._answer(404, {'errors': [{'status': '404', 'title': 'not found'}]}, headers)
+        path = parts.path[len(API_PREFIX):]
+
+        for methods, pattern, handler in server.routes:
+            match = pattern.match(path)
+            if match is None:
+                continue
+            if self.command not in methods:
+                return self._answer(405, {'errors': [{'status': '405'}]}, headers)
+
+            with state.lock:
+                route = '%s %s' % (self.command, pattern.pattern)
+                state.routes[route] = state.routes.get(route, 0) + 1
+
+            try:
+                body = json.loads(raw_body.decode('utf-8')) if raw_body else None
+                status, document = getattr(state, handler)(self.command, query, body, **match.groupdict())
+            except ValueError:
+                status, document = 400, {'errors': [{'status': '400', 'title': 'invalid JSON body'}]}
+            except MockError as e:
+                status, document = e.status, {'errors': [{'status': str(e.status), 'title': e.detail}]}
+            return self._answer(status, document, headers)
+
+        return self._answer(404, {'errors': [{'status': '404', 'title': 'not found'}]}, headers)
+
+    do_GET = do_POST = do_PATCH = do_DELETE = _handle
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, state, host='127.0.0.1', port=0, latency=0, jitter=0, rate=0, verbose=False):
+        ThreadingHTTPServer.__init__(self, (host, port), MockHandler)
+        self.state = state
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limiter = RateLimiter(rate) if rate else None
+        self.verbose = verbose
+        self.routes = [(methods, re.compile('^%s$' % pattern), handler) for methods, pattern, handler in ROUTES]
+        self.url = 'http://%s:%d' % self.server_address[:2]
+        state.base_url = self.url
+
+    def start(self):
+        """Serve from a background thread."""
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return self
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=0, help='0 picks a free port')
+    parser.add_argument('--organization', default='org')
+    parser.add_argument('--workspaces', type=int, default=100)
+    parser.add_argument('--vars', type=int, default=10, help='variables per workspace')
+    parser.add_argument('--varsets', type=int, default=0, help='variable sets of the organization')
+    parser.add_argument('--run-duration', type=float, default=1.0, help='seconds a run takes to be applied')
+    parser.add_argument('--webhook-loss', type=float, default=0, help='share of the run notifications not delivered')
+    parser.add_argument('--latency', type=float, default=0, help='seconds added to every answer')
+    parser.add_argument('--jitter', type=float, default=0, help='random seconds added on top of the latency')
+    parser.add_argument('--rate', type=int, default=0, help='requests per second before answering 429, 0 for none')
+    parser.add_argument('--verbose', action='store_true', help='log the requests')
+    args = parser.parse_args(argv)
+
+    state = MockState(args.organization, args.workspaces, args.vars, args.varsets, args.run_duration,
+                      args.webhook_loss)
+    server = MockServer(state, args.host, args.port, args.latency, args.jitter, args.rate, args.verbose)
+    print(server.url)
+    sys.stdout.flush()
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
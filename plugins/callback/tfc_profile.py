@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2024 Olivier Bernard (@pytoccaz)
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+DOCUMENTATION = '''
+---
+name: tfc_profile
+
+type: aggregate
+
+short_description: Profile of the Terraform Cloud API (HCP Terraform) requests sent by a playbook run.
+
+version_added: 2.2.0
+
+description:
+    - Collects the C(tfc_metrics) returned by the C(pytoccaz.terraform_cloud) modules run with C(metrics=true),
+      and prints a ranked summary at the end of the playbook run.
+    - The requests are aggregated by module, host and endpoint, to show the slowest and most called endpoints,
+      the C(429 Too Many Requests) answers and the urls read more than once by a task, which the response
+      cache (C(cache_ttl)) or a single listing could spare.
+    - The urls read once by each of several tasks are not part of C(tfc_metrics), look them up by their
+      C(fingerprint) in the C(metrics_file) lines.
+    - Set C(module_defaults) with C(metrics=true) for the modules of the collection to profile a whole role.
+
+requirements:
+    - Enable in configuration, for instance with C(callbacks_enabled = pytoccaz.terraform_cloud.tfc_profile).
+
+options:
+    top:
+        description:
+            - Number of lines of each ranking.
+        type: int
+        default: 10
+        env:
+            - name: TFC_PROFILE_TOP
+        ini:
+            - section: callback_tfc_profile
+              key: top
+
+author:
+  - Olivier Bernard (@pytoccaz)
+'''
+
+EXAMPLES = '''
+# ansible.cfg
+# [defaults]
+# callbacks_enabled = pytoccaz.terraform_cloud.tfc_profile
+#
+# playbook
+# - hosts: localhost
+#   module_defaults:
+#     group/pytoccaz.terraform_cloud.tfc:
+#       metrics: true
+'''
+
+from ansible.plugins.callback import CallbackBase
+
+COUNTERS = ('count', 'errors', 'retries', 'throttled', 'bytes', 'duration')
+
+
+def new_totals():
+    totals = dict((counter, 0) for counter in COUNTERS)
+    totals['p95'] = 0
+    return totals
+
+
+def add_totals(totals, metrics):
+    for counter in COUNTERS:
+        totals[counter] += metrics.get(counter) or 0
+    # percentiles do not add up, keep the worst one
+    totals['p95'] = max(totals['p95'], metrics.get('p95') or 0)
+
+
+def mean_duration(totals):
+    return totals['duration'] / totals['count'] if totals['count'] else 0
+
+
+class CallbackModule(CallbackBase):
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = 'aggregate'
+    CALLBACK_NAME = 'pytoccaz.terraform_cloud.tfc_profile'
+    CALLBACK_NEEDS_ENABLED = True
+
+    def __init__(self, display=None):
+        super(CallbackModule, self).__init__(display=display)
+        self.tasks = 0
+        self.totals = new_totals()
+        self.modules = {}
+        self.hosts = {}
+        self.endpoints = {}
+        self.reads = {}
+
+    def _collect(self, result):
+        results = result._result.get('results')
+        if not isinstance(results, list):
+            # not a loop
+            results = [result._result]
+
+        module = result._task.action.split('.')[-1]
+        host = result._host.get_name()
+
+        for item in results:
+            metrics = item.get('tfc_metrics') if isinstance(item, dict) else None
+            if not metrics:
+                continue
+
+            self.tasks += 1
+            add_totals(self.totals, metrics)
+            add_totals(self.modules.setdefault(module, new_totals()), metrics)
+            add_totals(self.hosts.setdefault(host, new_totals()), metrics)
+
+            for endpoint, endpoint_metrics in (metrics.get('endpoints') or {}).items():
+                add_totals(self.endpoints.setdefault(endpoint, new_totals()), endpoint_metrics)
+
+            for fingerprint, read in (metrics.get('fingerprints') or {}).items():
+                total = self.reads.setdefault(fingerprint, {'endpoint': read['endpoint'], 'count': 0, 'tasks': 0})
+                total['count'] += read['count']
+                total['tasks'] += 1
+
+    def v2_runner_on_ok(self, result):
+        self._collect(result)
+
+    def v2_runner_on_failed(self, result, ignore_errors=False):
+        self._collect(result)
+
+    def v2_playbook_on_stats(self, stats):
+        if not self.tasks:
+            return
+
+        top = self.get_option('top')
+        totals = self.totals
+
+        self._display.banner('TFC API PROFILE')
+        self._display.display('%d requests in %d task results: %.3fs, %d bytes, %d errors, %d retries, %d answered 429' % (
+            totals['count'], self.tasks, totals['duration'], totals['bytes'], totals['errors'],
+            totals['retries'], totals['throttled']))
+        self._display.display('')
+
+        def ranking(index, key):
+            return sorted(index.items(), key=lambda item: key(item[1]), reverse=True)[:top]
+
+        self._ranking('By module', ranking(self.modules, lambda t: t['duration']))
+        self._ranking('By host', ranking(self.hosts, lambda t: t['duration']))
+        self._ranking('Slowest endpoints', ranking(self.endpoints, mean_duration))
+        self._ranking('Most called endpoints', ranking(self.endpoints, lambda t: t['count']))
+        self._ranking('Throttled endpoints', [item for item in ranking(self.endpoints, lambda t: t['throttled'])
+                                              if item[1]['throttled']])
+
+        duplicates = {}
+        for read in self.reads.values():
+            if read['count'] > 1:
+                duplicate = duplicates.setdefault(read['endpoint'], {'urls': 0, 'reads': 0, 'spared': 0, 'tasks': 0})
+                duplicate['urls'] += 1
+                duplicate['reads'] += read['count']
+                duplicate['spared'] += read['count'] - 1
+                duplicate['tasks'] = max(duplicate['tasks'], read['tasks'])
+
+        if duplicates:
+            self._display.display('Duplicate reads (same url read more than once):')
+            self._display.display('  %-52s %10s %10s %10s %10s' % ('', 'urls', 'reads', 'spareable', 'max tasks'))
+            for endpoint, duplicate in sorted(duplicates.items(), key=lambda item: item[1]['spared'],
+                                              reverse=True)[:top]:
+                self._display.display('  %-52s %10d %10d %10d %10d' % (
+                    endpoint[:52], duplicate['urls'], duplicate['reads'], duplicate['spared'], duplicate['tasks']))
+            self._display.display('')
+
+    def _ranking(self, title, rows):
+        if not rows:
+            return
+
+        self._display.display('%s:' % title)
+        self._display.display('  %-52s %10s %10s %10s %10s %10s %10s' % (
+            '', 'requests', 'total (s)', 'mean (s)', 'p95 (s)', 'errors', '429'))
+        for name, totals in rows:
+            self._display.display('  %-52s %10d %10.3f %10.3f %10.3f %10d %10d' % (
+                name[:52], totals['count'], totals['duration'], mean_duration(totals), totals['p95'],
+                totals['errors'], totals['throttled']))
+        self._display.display('')
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2024 Olivier Bernard
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+class ModuleDocFragment(object):
+
+    # doc fragment
+    DOCUMENTATION = r'''
+
+options:
+    cache_ttl:
+        description:
+            - Time (in seconds) the API responses are kept in a local cache and served without any request.
+            - Once expired, an entry holding an C(ETag) is revalidated with C(If-None-Match).
+            - The cache is keyed by the request url, parameters and a hash of the token.
+            - The default C(0) disables the cache.
+        type: int
+        default: 0
+        version_added: 2.2.0
+
+    cache_dir:
+        description:
+            - Directory of the response cache.
+            - Cached responses may hold non-sensitive variable values, the directory is created readable by its owner only.
+            - Defaults to C(~/.ansible/tfc_cache).
+        type: path
+        version_added: 2.2.0
+
+    cache_max_size:
+        description:
+            - Maximum size (in MiB) of the response cache; the least recently used entries are evicted beyond.
+        type: int
+        default: 50
+        version_added: 2.2.0
+    '''
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2024 Olivier Bernard
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+class ModuleDocFragment(object):
+
+    # doc fragment
+    DOCUMENTATION = r'''
+
+options:
+    name_index:
+        description:
+            - Keep the IDs of the workspaces and variables met by the module in a local index, and use it to resolve
+              workspace names and variable keys without requesting the API.
+            - The index is refreshed by the listings and updates of any module using it, and an ID found stale
+              is dropped and resolved again.
+        type: bool
+        default: false
+        version_added: 2.2.0
+
+    name_index_ttl:
+        description:
+            - Time (in seconds) an entry of the name index is trusted.
+        type: int
+        default: 86400
+        version_added: 2.2.0
+
+    name_index_dir:
+        description:
+            - Directory of the name index, holding one file per API url and token.
+            - Defaults to C(~/.ansible/tfc_index).
+        type: path
+        version_added: 2.2.0
+    '''
@@ -41,4 +41,53 @@ options:
             - Controls the HTTP connections timeout period (in seconds) to the API.
         type: int
         default: 10
+
+    max_retries:
+        description:
+            - Number of times a request is retried when the API answers C(429 Too Many Requests),
+              or a C(502), C(503) or C(504) gateway error to a read.
+            - Retries back off exponentially with jitter, waiting at least the C(Retry-After) of the answer.
+        type: int
+        default: 3
+        version_added: 2.2.0
+
+    rate_limit:
+        description:
+            - Maximum number of requests per second sent with the token, paced by a client-side token bucket.
+            - The bucket follows the C(X-RateLimit-Limit), C(X-RateLimit-Remaining) and C(X-RateLimit-Reset) headers of the API responses.
+            - Set to C(0) to disable the throttling.
+        type: int
+        default: 30
+        version_added: 2.2.0
+
+    rate_limit_dir:
+        description:
+            - Directory holding the token bucket state shared by all the processes using the same API url and token.
+            - Setting it lets the modules run by parallel Ansible forks coordinate on one request budget
+              instead of each one pacing its own C(rate_limit).
+            - The state file is named after a hash of the API url and token, never the token itself.
+            - By default, each process paces its requests on its own.
+            - Requires a POSIX system as the state file is protected with C(flock).
+        type: path
+        version_added: 2.2.0
+
+    metrics:
+        description:
+            - Record the API requests sent by the module and return their statistics in C(tfc_metrics).
+            - Each request is recorded once with its method, route (e.g. C(/workspaces/:id/vars)), final status,
+              duration (waits for the rate limiter and retries included), response size and number of retries.
+            - C(tfc_metrics) holds the count, errors, retries, C(429) answers, bytes, total duration and p50/p95
+              durations of all the requests and per endpoint, along with the number of duplicate reads of the same url.
+            - C(tfc_metrics.fingerprints) maps a hash of each url read more than once to its endpoint and number
+              of reads, for the 50 most read urls. The C(fingerprint) of every read is only written to C(metrics_file).
+        type: bool
+        default: false
+        version_added: 2.2.0
+
+    metrics_file:
+        description:
+            - Append one JSON line per API request to this file, for analysis after the run.
+            - Lines are written with a single appending write, so that the parallel Ansible forks can share the file.
+        type: path
+        version_added: 2.2.0
     '''
@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2024 Olivier Bernard (@pytoccaz)
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+DOCUMENTATION = '''
+---
+name: tfc
+
+short_description: Terraform Cloud API (HCP Terraform) inventory of the workspaces of an organization.
+
+version_added: 2.2.0
+
+description:
+    - Exposes the workspaces of one organization as inventory hosts.
+    - The workspaces are fetched with one paginated listing, the pages being requested concurrently.
+    - Hosts are grouped by tag, project and terraform version, and the workspace attributes are exposed as host variables.
+    - The inventory source file name must end with C(tfc.yml) or C(tfc.yaml).
+    - See https://developer.hashicorp.com/terraform/cloud-docs/api-docs/workspaces#list-workspaces
+
+options:
+    plugin:
+        description:
+            - Token that ensures this is a source file for the plugin.
+        required: true
+        choices: ['pytoccaz.terraform_cloud.tfc']
+
+    api_url:
+        description:
+            - Terraform cloud API (HCP Terraform) url.
+            - You should not change the value unless for test purpose.
+        type: str
+        env:
+            - name: TFC_API_URL
+        aliases:
+            - url
+
+    api_token:
+        description:
+            - A token to authenticate Ansible.
+        type: str
+        required: true
+        env:
+            - name: TFC_TOKEN
+        aliases:
+            - token
+
+    validate_certs:
+        description:
+            - Verify TLS certificates (do not disable this in production).
+        type: bool
+        default: true
+
+    connection_timeout:
+        description:
+            - Controls the HTTP connections timeout period (in seconds) to the API.
+        type: int
+        default: 10
+
+    max_retries:
+        description:
+            - Number of times a request is retried when the API answers C(429 Too Many Requests),
+              or a C(502), C(503) or C(504) gateway error.
+        type: int
+        default: 3
+
+    rate_limit:
+        description:
+            - Maximum number of requests per second sent with the token.
+            - Set to C(0) to disable the throttling.
+        type: int
+        default: 30
+
+    organization:
+        description:
+            - The name of the organization whose workspaces are listed.
+        type: str
+        required: true
+
+    search_wildcard_name:
+        description:
+            - Restricts the inventory to workspaces with partial name matching, using * on prefix, suffix, or both.
+        type: str
+
+    search_tags:
+        description:
+            - Restricts the inventory to workspaces holding all these tags.
+        type: list
+        elements: str
+
+    page_size:
+        description:
+            - Size of the pages of the listing.
+        type: int
+        default: 100
+
+    max_workers:
+        description:
+            - Number of pages fetched in parallel once the first page gives the total number of pages.
+        type: int
+        default: 4
+
+    hostname:
+        description:
+            - The workspace field used as inventory hostname.
+        type: str
+        choices: ['name', 'id']
+        default: name
+
+    group_by_tags:
+        description:
+            - Add the workspaces to a C(tag_<tag>) group for each of their tags.
+        type: bool
+        default: true
+
+    group_by_project:
+        description:
+            - Add the workspaces to a C(project_<project_id>) group.
+        type: bool
+        default: true
+
+    group_by_terraform_version:
+        description:
+            - Add the workspaces to a C(terraform_<version>) group.
+        type: bool
+        default: true
+
+extends_documentation_fragment:
+    - constructed
+    - inventory_cache
+
+author:
+  - Olivier Bernard (@pytoccaz)
+'''
+
+EXAMPLES = '''
+# myorga.tfc.yml
+plugin: pytoccaz.terraform_cloud.tfc
+organization: myorga
+search_wildcard_name: "prod-*"
+cache: true
+cache_plugin: ansible.builtin.jsonfile
+cache_connection: ~/.ansible/tfc_inventory
+cache_timeout: 600
+compose:
+  # workspaces are API objects, run the tasks targeting them locally
+  ansible_connection: "'local'"
+keyed_groups:
+  - key: tfc_execution_mode
+    prefix: mode
+'''
+
+from ansible.errors import AnsibleError
+from ansible.plugins.inventory import BaseInventoryPlugin, Cacheable, Constructable
+
+from ansible_collections.pytoccaz.terraform_cloud.plugins.module_utils.tfc import TfcClient, TfcError, POOL_MAXSIZE
+
+WORKSPACES_PATH = "/organizations/{organization}/workspaces"
+
+
+class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
+
+    NAME = 'pytoccaz.terraform_cloud.tfc'
+
+    def verify_file(self, path):
+        valid = False
+        if super(InventoryModule, self).verify_file(path):
+            if path.endswith(('tfc.yml', 'tfc.yaml')):
+                valid = True
+        return valid
+
+    def _fetch_workspaces(self):
+        organization = self.get_option('organization')
+        max_workers = self.get_option('max_workers')
+
+        params = [('page[number]', 1), ('page[size]', self.get_option('page_size'))]
+        if self.get_option('search_wildcard_name'):
+            params.append(('search[wildcard-name]', self.get_option('search_wildcard_name')))
+        if self.get_option('search_tags'):
+            params.append(('search[tags]', ','.join(self.get_option('search_tags'))))
+
+        client = TfcClient(self.get_option('api_token'), url=self.get_option('api_url'),
+                           pool_maxsize=max(POOL_MAXSIZE, max_workers),
+                           max_retries=self.get_option('max_retries'),
+                           rate_limit=self.get_option('rate_limit'))
+
+        workspaces = []
+        with client:
+            for workspace in client.items(WORKSPACES_PATH.format(organization=organization), params=params,
+                                          max_workers=max_workers, verify=self.get_option('validate_certs'),
+                                          timeout=self.get_option('connection_timeout')):
+                # only keep what the inventory uses, this is what gets cached
+                project = ((workspace.get('relationships') or {}).get('project') or {}).get('data') or {}
+                workspaces.append({
+                    "id": workspace["id"],
+                    "attributes": workspace.get("attributes") or {},
+                    "project_id": project.get("id"),
+                })
+
+        return workspaces
+
+    def _populate(self, workspaces):
+        strict = self.get_option('strict')
+        organization = self.get_option('organization')
+
+        for workspace in workspaces:
+            attributes = workspace["attributes"]
+            hostname = workspace["id"] if self.get_option('hostname') == 'id' else attributes.get("name")
+            host = self.inventory.add_host(hostname)
+
+            hostvars = dict(("tfc_" + name.replace('-', '_'), value) for name, value in attributes.items())
+            hostvars.update(
+                tfc_workspace_id=workspace["id"],
+                tfc_organization=organization,
+                tfc_project_id=workspace["project_id"],
+            )
+            for name, value in hostvars.items():
+                self.inventory.set_variable(host, name, value)
+
+            groups = []
+            if self.get_option('group_by_tags'):
+                groups.extend("tag_%s" % tag for tag in attributes.get("tag-names") or [])
+            if self.get_option('group_by_project') and workspace["project_id"]:
+                groups.append("project_%s" % workspace["project_id"])
+            if self.get_option('group_by_terraform_version') and attributes.get("terraform-version"):
+                groups.append("terraform_%s" % attributes["terraform-version"])
+
+            for group in groups:
+                group = self.inventory.add_group(self._sanitize_group_name(group))
+                self.inventory.add_child(group, host)
+
+            self._set_composite_vars(self.get_option('compose'), hostvars, host, strict=strict)
+            self._add_host_to_composed_groups(self.get_option('groups'), hostvars, host, strict=strict)
+            self._add_host_to_keyed_groups(self.get_option('keyed_groups'), hostvars, host, strict=strict)
+
+    def parse(self, inventory, loader, path, cache=True):
+        super(InventoryModule, self).parse(inventory, loader, path, cache)
+        self._read_config_data(path)
+
+        cache_key = self.get_cache_key(path)
+        user_cache_setting = self.get_option('cache')
+        attempt_to_read_cache = user_cache_setting and cache
+        cache_needs_update = user_cache_setting and not cache
+
+        if attempt_to_read_cache:
+            try:
+                workspaces = self._cache[cache_key]
+            except KeyError:
+                cache_needs_update = True
+
+        if not attempt_to_read_cache or cache_needs_update:
+            try:
+                workspaces = self._fetch_workspaces()
+            except TfcError as e:
+                raise AnsibleError(str(e))
+
+        if cache_needs_update:
+            self._cache[cache_key] = workspaces
+
+        self._populate(workspaces)
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2024 Olivier Bernard (@pytoccaz)
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+DOCUMENTATION = '''
+---
+name: tfc_var
+
+short_description: Terraform Cloud API (HCP Terraform) lookup of workspace variables.
+
+version_added: 2.2.0
+
+description:
+    - Returns the value of variables attached to a workspace, given the workspace ID followed by the variable keys.
+    - The variable list of a workspace is requested once per process and kept in memory, further keys are read from it.
+    - Ansible templates each task in its own worker process; set C(cache_ttl) to also share the variable lists
+      between tasks through the on-disk response cache.
+    - Sensitive variables have no value through the API, C(None) is returned for them.
+    - See https://developer.hashicorp.com/terraform/cloud-docs/api-docs/workspace-variables#list-variables
+
+options:
+    _terms:
+        description:
+            - The workspace ID followed by the keys of the variables to read.
+        required: true
+        type: list
+        elements: str
+
+    attribute:
+        description:
+            - The variable attribute to return.
+        type: str
+        default: value
+
+    default:
+        description:
+            - Value returned for the keys not found in the workspace.
+            - An error is raised for missing keys when not set.
+        type: raw
+
+    api_url:
+        description:
+            - Terraform cloud API (HCP Terraform) url.
+            - You should not change the value unless for test purpose.
+        type: str
+        env:
+            - name: TFC_API_URL
+        aliases:
+            - url
+
+    api_token:
+        description:
+            - A token to authenticate Ansible.
+        type: str
+        required: true
+        env:
+            - name: TFC_TOKEN
+        aliases:
+            - token
+
+    validate_certs:
+        description:
+            - Verify TLS certificates (do not disable this in production).
+        type: bool
+        default: true
+
+    connection_timeout:
+        description:
+            - Controls the HTTP connections timeout period (in seconds) to the API.
+        type: int
+        default: 10
+
+    max_retries:
+        description:
+            - Number of times a request is retried when the API answers C(429 Too Many Requests),
+              or a C(502), C(503) or C(504) gateway error.
+        type: int
+        default: 3
+
+    rate_limit:
+        description:
+            - Maximum number of requests per second sent with the token.
+            - Set to C(0) to disable the throttling.
+        type: int
+        default: 30
+
+    cache_ttl:
+        description:
+            - Time (in seconds) the variable lists are kept in the on-disk response cache.
+            - The default C(0) only keeps them in memory for the current process.
+        type: int
+        default: 0
+
+    cache_dir:
+        description:
+            - Directory of the on-disk response cache.
+            - Defaults to C(~/.ansible/tfc_cache).
+        type: path
+
+author:
+  - Olivier Bernard (@pytoccaz)
+'''
+
+EXAMPLES = '''
+- name: Read one variable
+  ansible.builtin.debug:
+    msg: "{{ lookup('pytoccaz.terraform_cloud.tfc_var', 'ws-c6FoAsJsrD5abMrS', 'AWS_REGION') }}"
+
+- name: Read several variables of a workspace with a single request
+  ansible.builtin.debug:
+    msg: "{{ query('pytoccaz.terraform_cloud.tfc_var', 'ws-c6FoAsJsrD5abMrS', 'var1', 'var2', default='') }}"
+
+- name: Check whether a variable is sensitive
+  ansible.builtin.debug:
+    msg: "{{ lookup('pytoccaz.terraform_cloud.tfc_var', 'ws-c6FoAsJsrD5abMrS', 'db_password', attribute='sensitive') }}"
+'''
+
+RETURN = '''
+_raw:
+    description:
+        - The requested attribute of each variable, in the order of the keys.
+    type: list
+'''
+
+import threading
+
+from ansible.errors import AnsibleError
+from ansible.plugins.lookup import LookupBase
+
+from ansible_collections.pytoccaz.terraform_cloud.plugins.module_utils.tfc import (TfcClient, TfcError, token_hash,
+                                                                              vars_by_key)
+
+WORKSPACE_VARS_PATH = "/workspaces/{workspace_id}/vars"
+
+# variable indexes keyed by API url and token hash, then workspace ID
+VARS_BY_WORKSPACE = {}
+VARS_BY_WORKSPACE_LOCK = threading.Lock()
+
+
+class LookupModule(LookupBase):
+
+    def _workspace_vars(self, workspace_id):
+        key = (token_hash(self.get_option('api_url'), self.get_option('api_token')), workspace_id)
+
+        with VARS_BY_WORKSPACE_LOCK:
+            if key not in VARS_BY_WORKSPACE:
+                client = TfcClient(self.get_option('api_token'), url=self.get_option('api_url'),
+                                   max_retries=self.get_option('max_retries'),
+                                   rate_limit=self.get_option('rate_limit'),
+                                   cache_ttl=self.get_option('cache_ttl'),
+                                   cache_dir=self.get_option('cache_dir'))
+                with client:
+                    vars = client.read(WORKSPACE_VARS_PATH.format(workspace_id=workspace_id),
+                                       verify=self.get_option('validate_certs'),
+                                       timeout=self.get_option('connection_timeout'))
+                VARS_BY_WORKSPACE[key] = vars_by_key(vars["data"])
+
+            return VARS_BY_WORKSPACE[key]
+
+    def run(self, terms, variables=None, **kwargs):
+        self.set_options(var_options=variables, direct=kwargs)
+
+        if len(terms) < 2:
+            raise AnsibleError('tfc_var lookup expects a workspace ID followed by at least one variable key.')
+
+        workspace_id = terms[0]
+        attribute = self.get_option('attribute')
+
+        try:
+            index = self._workspace_vars(workspace_id)
+        except TfcError as e:
+            raise AnsibleError(str(e))
+
+        ret = []
+        for key in terms[1:]:
+            if key in index:
+                ret.append(index[key]["attributes"].get(attribute))
+            elif self.get_option('default') is not None:
+                ret.append(self.get_option('default'))
+            else:
+                raise AnsibleError('Variable with key %s not found in workspace %s.' % (key, workspace_id))
+
+        return ret
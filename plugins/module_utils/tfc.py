@@ -7,9 +7,34 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 
 try:
-    from requests import get, post, patch
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:
+    HAS_FCNTL = False
+
+from .tfc_cache import TfcResponseCache
+from .tfc_stream import JsonDataStream, JsonStreamError
+
+try:
+    from urllib.parse import parse_qsl, urlsplit, urlunsplit
+except ImportError:
+    from urlparse import parse_qsl, urlsplit, urlunsplit
+
+try:
+    from requests import Session
+    from requests.adapters import HTTPAdapter
     from requests.auth import AuthBase
     from requests.exceptions import HTTPError, RequestException, JSONDecodeError
     HAS_REQUESTS = True
@@ -19,10 +44,488 @@ except ImportError:
 API_URL = "{url}/api/{version}"
 URL = "https://app.terraform.io"
 VERSION = "v2"
+POOL_MAXSIZE = 10
+RATE_LIMIT = 30
+MAX_RETRIES = 3
+STREAM_CHUNK_SIZE = 64 * 1024
+BACKOFF = 0.5
+BACKOFF_MAX = 30
+
+# statuses worth retrying; the 5xx ones only for idempotent reads
+RETRY_STATUSES = (429,)
+RETRY_READ_STATUSES = (502, 503, 504)
 
 
 class TfcError(Exception):
-    pass
+
+    def __init__(self, msg='', status=None):
+        super(TfcError, self).__init__(msg)
+        # the HTTP status of the failed request, if any
+        self.status = status
+
+
+def concurrent_map(func, iterable, max_workers=1):
+    """Like C(map) but runs C(func) in a bounded thread pool; results keep the input order."""
+    if max_workers is None or max_workers <= 1:
+        for item in iterable:
+            yield func(item)
+        return
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for result in executor.map(func, iterable):
+            yield result
+
+
+def vars_by_key(variables):
+    """Index a list of variables from the API by their key."""
+    return dict((var["attributes"]["key"], var) for var in variables)
+
+
+def normalize_variables(variables):
+    """Turn variables given as a key->attributes dict or a list of dicts with a key item into (key, attributes) pairs.
+
+    A plain value instead of a dict of attributes stands for the variable value.
+    A key given twice in the list form is rejected, as its two writes would race.
+    """
+    if isinstance(variables, dict):
+        items = list(variables.items())
+    elif isinstance(variables, list):
+        items = []
+        for variable in variables:
+            if not isinstance(variable, dict) or 'key' not in variable:
+                raise TfcError('Each item of variables must be a dict with a key item.')
+            attributes = dict(variable)
+            items.append((attributes.pop('key'), attributes))
+
+        seen = set()
+        duplicates = set()
+        for key, attributes in items:
+            if key in seen:
+                duplicates.add(key)
+            seen.add(key)
+        if duplicates:
+            raise TfcError('Duplicate keys in variables: %s.' % ', '.join(sorted(duplicates)))
+    else:
+        raise TfcError('variables must be a dict or a list of dicts.')
+
+    return [(key, attributes if isinstance(attributes, dict) else {"value": attributes})
+            for key, attributes in items]
+
+
+def var_changes(var, attributes):
+    """Return the requested attributes which differ from the current ones of a variable."""
+    current = var["attributes"]
+    changes = {}
+    for name, value in attributes.items():
+        if name == "value" and current.get("sensitive"):
+            # the API never discloses sensitive values: they can't be compared
+            changes[name] = value
+            continue
+
+        if name == "value" and isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = str(value)
+
+        if current.get(name) != value:
+            changes[name] = value
+
+    return changes
+
+
+def var_diff(var, attributes):
+    """Build the before/after diff of a variable update, hiding sensitive values."""
+    current = var["attributes"]
+    before = dict((name, current.get(name)) for name in attributes)
+    after = dict(attributes)
+    if current.get("sensitive") or attributes.get("sensitive"):
+        for values in (before, after):
+            if values.get("value") is not None:
+                values["value"] = "VALUE_SPECIFIED_IN_NO_LOG_PARAMETER"
+
+    return {"before": before, "after": after}
+
+
+def param_pairs(params):
+    """Turn request parameters given as a dict or a list of pairs into a list of pairs."""
+    if isinstance(params, dict):
+        return list(params.items())
+    return list(params or [])
+
+
+def sparse_params(fields=None, include=None):
+    """Build the JSON:API sparse fieldsets and inclusion parameters of a request."""
+    params = []
+    for resource_type, names in sorted((fields or {}).items()):
+        if isinstance(names, (list, tuple)):
+            names = ','.join(names)
+        params.append(('fields[%s]' % resource_type, names))
+
+    if include:
+        params.append(('include', ','.join(include)))
+
+    return params
+
+
+def index_included(documents, index=None):
+    """Gather the sideloaded resources of API documents by type and ID, dropping the duplicates."""
+    if index is None:
+        index = {}
+    for document in documents:
+        for resource in document.get('included') or []:
+            index.setdefault(resource['type'], {})[resource['id']] = resource
+
+    return index
+
+
+def project(item, paths):
+    """Keep only the given dotted paths (e.g. C(attributes.name)) of an API resource."""
+    projected = {}
+    for path in paths:
+        names = path.split('.')
+        value = item
+        for name in names:
+            if not isinstance(value, dict) or name not in value:
+                break
+            value = value[name]
+        else:
+            target = projected
+            for name in names[:-1]:
+                target = target.setdefault(name, {})
+            target[names[-1]] = value
+
+    return projected
+
+
+def client_options(module_params):
+    """Extract the TfcClient tuning options from the parameters of a module."""
+    return dict(
+        max_retries=module_params.get('max_retries'),
+        rate_limit=module_params.get('rate_limit'),
+        rate_limit_dir=module_params.get('rate_limit_dir'),
+        cache_ttl=module_params.get('cache_ttl'),
+        cache_dir=module_params.get('cache_dir'),
+        cache_max_size=module_params.get('cache_max_size'),
+        metrics=get_metrics(module_params),
+    )
+
+
+def token_hash(api_url, token):
+    """Identify an API url and token pair without keeping the token around."""
+    return hashlib.sha256(("%s|%s" % (api_url, token)).encode('utf-8')).hexdigest()[:16]
+
+
+def header_float(headers, name):
+    try:
+        return float(headers.get(name))
+    except (TypeError, ValueError):
+        return None
+
+
+def spread(delay, jitter=BACKOFF):
+    """Add a random jitter to a delay, so that the clients held at once do not all resume at the same instant."""
+    return delay + random.uniform(0, jitter)
+
+
+def retry_delay(attempt, headers=None, backoff=BACKOFF):
+    """Delay before retrying a request: a jittered exponential backoff, at least C(Retry-After) when given.
+
+    C(Retry-After) and C(X-RateLimit-Reset) are taken as a minimum and the
+    jitter comes on top: the forks refused by the same 429 are told the
+    same instant, and would otherwise all hit the limit again together.
+    """
+    headers = headers or {}
+    delay = min(BACKOFF_MAX, backoff * (2 ** attempt))
+    retry_after = header_float(headers, 'Retry-After') or 0
+    reset = header_float(headers, 'X-RateLimit-Reset') or 0
+    return spread(max(retry_after, reset, delay), delay)
+
+
+class TfcRateLimiter:
+    """Thread-safe token bucket pacing the requests sent with one API token.
+
+    The bucket refills at C(rate) requests per second at most, lowered to
+    the limit advertised by the C(X-RateLimit-*) headers the API returns.
+    """
+
+    def __init__(self, rate=RATE_LIMIT):
+        self.max_rate = float(rate)
+        self.rate = self.max_rate
+        self.tokens = self.rate
+        self.updated = time.monotonic()
+        self.blocked_until = 0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self):
+        """Take a token and return how long to wait (in seconds) before using it."""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            return max(0, -self.tokens / self.rate, self.blocked_until - now)
+
+    def acquire(self):
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    def update(self, headers):
+        """Sync the bucket with the rate limit headers of a response."""
+        limit = header_float(headers, 'X-RateLimit-Limit')
+        remaining = header_float(headers, 'X-RateLimit-Remaining')
+        reset = header_float(headers, 'X-RateLimit-Reset')
+
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            if limit:
+                self.rate = min(self.max_rate, limit)
+            if remaining is not None:
+                self.tokens = min(self.tokens, remaining)
+                if remaining <= 0 and reset:
+                    self.blocked_until = max(self.blocked_until, now + spread(reset))
+
+    def block(self, delay):
+        """Hold every request for C(delay) seconds, e.g. after a 429."""
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+
+
+class TfcSharedRateLimiter(TfcRateLimiter):
+    """Token bucket kept in a locked state file, shared by all the processes using one API token.
+
+    Each Ansible fork runs its own copy of a module: going through the same
+    file keeps their aggregate rate under the API limit.
+    """
+
+    def __init__(self, path, rate=RATE_LIMIT):
+        if not HAS_FCNTL:
+            raise TfcError('A shared rate limit requires the fcntl module (POSIX systems).')
+
+        super(TfcSharedRateLimiter, self).__init__(rate)
+        self.path = path
+
+        try:
+            os.makedirs(os.path.dirname(path), 0o700)
+        except OSError:
+            if not os.path.isdir(os.path.dirname(path)):
+                raise
+
+    @contextmanager
+    def _state(self):
+        with self.lock:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                # closing the file descriptor releases the lock
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                try:
+                    state = json.loads(os.read(fd, 4096) or b'{}')
+                except ValueError:
+                    state = {}
+
+                now = time.time()
+                rate = min(self.max_rate, state.get('rate') or self.max_rate)
+                tokens = state.get('tokens', rate)
+                elapsed = max(0, now - state.get('updated', now))
+                state = {
+                    'rate': rate,
+                    'tokens': min(rate, tokens + elapsed * rate),
+                    'updated': now,
+                    'blocked_until': state.get('blocked_until', 0),
+                }
+
+                yield state, now
+
+                os.lseek(fd, 0, os.SEEK_SET)
+                os.ftruncate(fd, 0)
+                os.write(fd, json.dumps(state).encode('utf-8'))
+            finally:
+                os.close(fd)
+
+    def reserve(self):
+        with self._state() as (state, now):
+            state['tokens'] -= 1
+            return max(0, -state['tokens'] / state['rate'], state['blocked_until'] - now)
+
+    def update(self, headers):
+        limit = header_float(headers, 'X-RateLimit-Limit')
+        remaining = header_float(headers, 'X-RateLimit-Remaining')
+        reset = header_float(headers, 'X-RateLimit-Reset')
+
+        with self._state() as (state, now):
+            if limit:
+                state['rate'] = min(self.max_rate, limit)
+            if remaining is not None:
+                state['tokens'] = min(state['tokens'], remaining)
+                if remaining <= 0 and reset:
+                    state['blocked_until'] = max(state['blocked_until'], now + spread(reset))
+
+    def block(self, delay):
+        with self._state() as (state, now):
+            state['blocked_until'] = max(state['blocked_until'], now + delay)
+
+
+# clients sharing an API url and token in one process share their bucket
+RATE_LIMITERS = {}
+RATE_LIMITERS_LOCK = threading.Lock()
+
+
+def get_rate_limiter(api_url, token, rate=RATE_LIMIT, state_dir=None):
+    """Return the bucket of an API url and token, shared across processes through C(state_dir) when given."""
+    key = (token_hash(api_url, token), state_dir)
+    with RATE_LIMITERS_LOCK:
+        if key not in RATE_LIMITERS:
+            if state_dir is None:
+                RATE_LIMITERS[key] = TfcRateLimiter(rate)
+            else:
+                path = os.path.join(os.path.expanduser(state_dir), key[0] + '.json')
+                RATE_LIMITERS[key] = TfcSharedRateLimiter(path, rate)
+        limiter = RATE_LIMITERS[key]
+
+    with limiter.lock:
+        limiter.max_rate = min(limiter.max_rate, rate)
+        limiter.rate = min(limiter.rate, rate)
+    return limiter
+
+
+RESOURCE_ID = re.compile(r'^[a-z]+-[A-Za-z0-9]{16}$')
+# most repeated reads listed in a summary, the metrics file holds all of them
+DUPLICATE_READS_MAX = 50
+
+
+def path_template(url):
+    """Reduce a request url to its route, e.g. C(/workspaces/:id/vars)."""
+    segments = urlsplit(url).path.split('/')
+    if segments[1:3] == ['api', VERSION]:
+        segments = [''] + segments[3:]
+
+    template = []
+    for position, segment in enumerate(segments):
+        if RESOURCE_ID.match(segment):
+            segment = ':id'
+        elif position > 0 and segments[position - 1] == 'organizations':
+            segment = ':organization'
+        elif position > 1 and template[position - 2] == ':organization' and segments[position - 1] == 'workspaces':
+            segment = ':name'
+        template.append(segment)
+
+    return '/'.join(template)
+
+
+def percentile(values, rank):
+    """Nearest-rank percentile of a sorted list."""
+    if not values:
+        return None
+    return values[max(0, int(math.ceil(rank / 100.0 * len(values))) - 1)]
+
+
+class TfcMetrics:
+    """Collector of the requests sent by the clients of a process.
+
+    Each request, retries included, is recorded once with its route, final
+    status, duration (from the first attempt to the response, waits for the
+    rate limiter and backoffs included; the headers only for a streamed
+    listing), response size and number of retries. Records are kept for
+    C(summary) and, with C(path), appended as JSON lines to a file that
+    parallel forks can share.
+    """
+
+    def __init__(self, path=None):
+        self.path = os.path.expanduser(path) if path else None
+        self.records = []
+        self.lock = threading.Lock()
+
+    def record(self, method, url, status, duration, size, retries=0, throttled=0):
+        record = {
+            'method': method,
+            'path': path_template(url),
+            'status': status,
+            'duration': round(duration, 6),
+            'bytes': size,
+            'retries': retries,
+            'throttled': throttled,
+        }
+        if method == 'GET':
+            # tells apart repeated reads of the same resource, query included
+            parts = urlsplit(url)
+            record['fingerprint'] = hashlib.sha256(
+                (parts.path + '?' + parts.query).encode('utf-8')).hexdigest()[:16]
+
+        with self.lock:
+            self.records.append(record)
+
+        if self.path is not None:
+            line = json.dumps(dict(record, time=time.time(), pid=os.getpid())) + '\n'
+            try:
+                # a single appending write keeps the lines of parallel forks whole
+                fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+                try:
+                    os.write(fd, line.encode('utf-8'))
+                finally:
+                    os.close(fd)
+            except OSError:
+                pass
+
+    @staticmethod
+    def _aggregate(records):
+        durations = sorted(record['duration'] for record in records)
+        return {
+            'count': len(records),
+            'errors': sum(1 for record in records if record['status'] is None or record['status'] >= 400),
+            'retries': sum(record['retries'] for record in records),
+            'throttled': sum(record['throttled'] for record in records),
+            'bytes': sum(record['bytes'] or 0 for record in records),
+            'duration': round(sum(durations), 6),
+            'p50': percentile(durations, 50),
+            'p95': percentile(durations, 95),
+        }
+
+    def summary(self):
+        with self.lock:
+            records = list(self.records)
+
+        endpoints = {}
+        fingerprints = {}
+        for record in records:
+            endpoint = '%s %s' % (record['method'], record['path'])
+            endpoints.setdefault(endpoint, []).append(record)
+            if 'fingerprint' in record:
+                read = fingerprints.setdefault(record['fingerprint'], {'endpoint': endpoint, 'count': 0})
+                read['count'] += 1
+
+        summary = self._aggregate(records)
+        summary['endpoints'] = dict((endpoint, self._aggregate(endpoint_records))
+                                    for endpoint, endpoint_records in endpoints.items())
+        duplicates = sorted((item for item in fingerprints.items() if item[1]['count'] > 1),
+                            key=lambda item: item[1]['count'], reverse=True)
+        summary['duplicate_gets'] = sum(read['count'] - 1 for fingerprint, read in duplicates)
+        summary['fingerprints'] = dict(duplicates[:DUPLICATE_READS_MAX])
+        return summary
+
+
+# modules run in their own process: one collector serves all their clients
+METRICS = {}
+METRICS_LOCK = threading.Lock()
+
+
+def get_metrics(module_params):
+    """Return the metrics collector of the process, or None when the module does not record metrics."""
+    if not module_params.get('metrics') and not module_params.get('metrics_file'):
+        return None
+
+    with METRICS_LOCK:
+        if 'collector' not in METRICS:
+            METRICS['collector'] = TfcMetrics(module_params.get('metrics_file'))
+        return METRICS['collector']
+
+
+def metrics_result(module_params):
+    """Return the C(tfc_metrics) result item of a module, when it asked for it."""
+    if not module_params.get('metrics'):
+        return {}
+    return {'tfc_metrics': get_metrics(module_params).summary()}
 
 
 if HAS_REQUESTS:
@@ -43,7 +546,10 @@ if HAS_REQUESTS:
 
 class TfcClient:
 
-    def __init__(self, token: str, url: str = None) -> None:
+    def __init__(self, token: str, url: str = None, pool_maxsize: int = POOL_MAXSIZE,
+                 max_retries: int = MAX_RETRIES, rate_limit: int = RATE_LIMIT,
+                 rate_limit_dir: str = None, cache_ttl: int = None, cache_dir: str = None,
+                 cache_max_size: int = None, metrics: TfcMetrics = None) -> None:
         if not HAS_REQUESTS:
             raise TfcError('All Tfc modules require python requests library')
 
@@ -58,39 +564,263 @@ class TfcClient:
         self.token = token
         self.headers = {"Content-Type": "application/vnd.api+json"}
 
-    def do_request(self, func, path: str, params=None, json=None, verify=True, timeout=10):
+        # One keep-alive session per client: every call a module makes reuses
+        # the pooled connections instead of paying a new TCP+TLS handshake.
+        self.session = Session()
+        self.session.auth = TfcTokenAuth(token)
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
 
-        if path.startswith(('http:', 'https:')):
-            api_url = path
-        elif path is not None:
-            api_url = self.api_url + path
-        else:
-            api_url = self.api_url
+        self.max_retries = max_retries or 0
+        self.rate_limiter = None
+        if rate_limit:
+            self.rate_limiter = get_rate_limiter(self.api_url, token, rate_limit, rate_limit_dir)
+
+        self.cache = None
+        if cache_ttl:
+            self.cache = TfcResponseCache(cache_ttl, cache_dir, cache_max_size)
+
+        self.metrics = metrics
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self.session.close()
 
-        auth = TfcTokenAuth(self.token)
+    def _api_url(self, path):
+        if path is None:
+            return self.api_url
+        if path.startswith(('http:', 'https:')):
+            return path
+        return self.api_url + path
 
+    def _checked_send(self, method, api_url, **kwargs):
         try:
-            response = func(api_url, params=params, headers=self.headers,
-                            json=json, verify=verify, auth=auth, timeout=timeout)
+            response = self._send(method, api_url, **kwargs)
             response.raise_for_status()
         except HTTPError as e:
             raise TfcError(
-                'Status code error from request POST %s: %s' % (api_url, str(e)))
+                'Status code error from request %s %s: %s' % (method, api_url, str(e)),
+                status=e.response.status_code if e.response is not None else None)
         except RequestException as e:
-            raise TfcError('Error trying request POST %s: %s' %
-                           (api_url, str(e)))
+            raise TfcError('Error trying request %s %s: %s' %
+                           (method, api_url, str(e)))
+
+        return response
+
+    @staticmethod
+    def _decode(method, api_url, response):
+        if not response.content:
+            # e.g. 204 No Content answering a DELETE
+            return {}
 
         try:
             return response.json()
         except JSONDecodeError as e:
             raise TfcError(
-                'API returned invalid JSON when trying to POST %s: %s' % (api_url, str(e)))
+                'API returned invalid JSON when trying to %s %s: %s' % (method, api_url, str(e)))
+
+    def do_request(self, method, path: str, params=None, json=None, verify=True, timeout=10):
+        api_url = self._api_url(path)
+        response = self._checked_send(method, api_url, params=params, json=json,
+                                      verify=verify, timeout=timeout)
+
+        return self._decode(method, api_url, response)
+
+    def _cached_read(self, path, params=None, verify=True, timeout=10):
+        api_url = self._api_url(path)
+        key = self.cache.key(token_hash(self.api_url, self.token), api_url, params)
+
+        entry, fresh = self.cache.get(key)
+        if fresh:
+            return entry['body']
+
+        headers = None
+        if entry is not None and entry.get('etag'):
+            headers = {'If-None-Match': entry['etag']}
+
+        response = self._checked_send('GET', api_url, params=params, headers=headers,
+                                      verify=verify, timeout=timeout)
+        if response.status_code == 304 and entry is not None:
+            self.cache.refresh(key, entry)
+            return entry['body']
+
+        body = self._decode('GET', api_url, response)
+        self.cache.put(key, body, response.headers.get('ETag'))
+
+        return body
+
+    def _send(self, method, api_url, **kwargs):
+        retry_statuses = RETRY_STATUSES
+        if method == 'GET':
+            retry_statuses += RETRY_READ_STATUSES
+
+        started = time.time()
+        throttled = 0
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+
+            try:
+                response = self.session.request(method, api_url, **kwargs)
+            except RequestException:
+                if self.metrics is not None:
+                    self.metrics.record(method, api_url, None, time.time() - started, 0, attempt, throttled)
+                raise
+
+            if self.rate_limiter is not None:
+                self.rate_limiter.update(response.headers)
+
+            if response.status_code == 429:
+                throttled += 1
+
+            if response.status_code not in retry_statuses or attempt >= self.max_retries:
+                if self.metrics is not None:
+                    self._record(method, response, started, attempt, throttled, kwargs.get('stream'))
+                return response
+
+            # hand a streamed connection back to the pool before retrying
+            response.close()
+
+            delay = retry_delay(attempt, response.headers)
+            if response.status_code == 429 and self.rate_limiter is not None:
+                # let the other threads of this client back off as well
+                self.rate_limiter.block(delay)
+            else:
+                time.sleep(delay)
+            attempt += 1
+
+    def _record(self, method, response, started, retries, throttled, stream=False):
+        size = header_float(response.headers, 'Content-Length')
+        if size is None and not stream:
+            size = len(response.content)
+        # the size of a streamed body without Content-Length is unknown before it is read
+        self.metrics.record(method, response.url, response.status_code, time.time() - started,
+                            int(size or 0), retries, throttled)
 
     def patch(self, path, json=None, verify=True, timeout=10):
-        return self.do_request(patch, path, json=json, verify=verify, timeout=timeout)
+        return self.do_request('PATCH', path, json=json, verify=verify, timeout=timeout)
 
     def create(self, path, json=None, verify=True, timeout=10):
-        return self.do_request(post, path, json=json, verify=verify, timeout=timeout)
+        return self.do_request('POST', path, json=json, verify=verify, timeout=timeout)
+
+    def delete(self, path, verify=True, timeout=10):
+        return self.do_request('DELETE', path, verify=verify, timeout=timeout)
 
     def read(self, path, params=None, verify=True, timeout=10):
-        return self.do_request(get, path, params=params, verify=verify, timeout=timeout)
+        if self.cache is not None:
+            return self._cached_read(path, params=params, verify=verify, timeout=timeout)
+        return self.do_request('GET', path, params=params, verify=verify, timeout=timeout)
+
+    def stream_items(self, path, params=None, max_items=None, verify=True, timeout=10):
+        """Yield the C(data) items of a listing across its pages, decoding each response incrementally.
+
+        Unlike C(items), a page is never held whole in memory: items are
+        decoded as the response body arrives, then the next page is requested.
+        Responses are not cached and the pages are walked one after the other.
+        """
+        count = 0
+        while path is not None:
+            api_url = self._api_url(path)
+            response = self._checked_send('GET', api_url, params=params, stream=True,
+                                          verify=verify, timeout=timeout)
+            try:
+                stream = JsonDataStream(response.iter_content(STREAM_CHUNK_SIZE))
+                for item in stream:
+                    if max_items is not None and count >= max_items:
+                        return
+                    count += 1
+                    yield item
+            except JsonStreamError as e:
+                raise TfcError(
+                    'API returned invalid JSON when trying to GET %s: %s' % (api_url, str(e)))
+            except RequestException as e:
+                raise TfcError('Error trying request GET %s: %s' % (api_url, str(e)))
+            finally:
+                response.close()
+
+            if max_items is not None and count >= max_items:
+                return
+
+            path = (stream.members.get('links') or {}).get('next')
+            params = None
+
+    def pages(self, path, params=None, max_items=None, max_workers=1, verify=True, timeout=10):
+        """Lazily yield the pages of a listing by following C(links.next).
+
+        With C(max_workers) > 1, the pages following the first one are fetched
+        in parallel once C(meta.pagination.total-pages) is known, and are still
+        yielded in order.
+        """
+        if max_workers is not None and max_workers > 1:
+            for page in self._prefetch_pages(path, params, max_items, max_workers, verify, timeout):
+                yield page
+            return
+
+        count = 0
+        while path is not None:
+            page = self.read(path, params=params, verify=verify, timeout=timeout)
+            yield page
+
+            count += len(page.get('data') or [])
+            if max_items is not None and count >= max_items:
+                return
+
+            # the next link already carries the pagination and filter parameters
+            path = (page.get('links') or {}).get('next')
+            params = None
+
+    def _prefetch_pages(self, path, params, max_items, max_workers, verify, timeout):
+        # pagination parameters may come from a direct link as well as from params
+        scheme, netloc, url_path, query, fragment = urlsplit(path)
+        path = urlunsplit((scheme, netloc, url_path, '', fragment))
+        params = parse_qsl(query) + param_pairs(params)
+
+        first = self.read(path, params=params, verify=verify, timeout=timeout)
+        yield first
+
+        pagination = (first.get('meta') or {}).get('pagination') or {}
+        current = pagination.get('current-page')
+        total = pagination.get('total-pages')
+        if current is None or total is None:
+            # no page count to rely on, fall back on the serial walk
+            next_link = (first.get('links') or {}).get('next')
+            if next_link is not None:
+                remaining = None if max_items is None else max_items - len(first.get('data') or [])
+                if remaining is None or remaining > 0:
+                    for page in self.pages(next_link, max_items=remaining, verify=verify, timeout=timeout):
+                        yield page
+            return
+
+        last = total
+        if max_items is not None:
+            page_size = pagination.get('page-size') or len(first.get('data') or []) or 1
+            remaining = max_items - len(first.get('data') or [])
+            last = min(total, current + -(-remaining // page_size))
+
+        base_params = [(k, v) for k, v in params if k != 'page[number]']
+
+        def read_page(number):
+            return self.read(path, params=base_params + [('page[number]', number)],
+                             verify=verify, timeout=timeout)
+
+        for page in concurrent_map(read_page, range(current + 1, last + 1), max_workers):
+            yield page
+
+    def items(self, path, params=None, max_items=None, max_workers=1, verify=True, timeout=10):
+        """Yield the C(data) items of a listing across all its pages, up to C(max_items)."""
+        count = 0
+        for page in self.pages(path, params=params, max_items=max_items, max_workers=max_workers,
+                               verify=verify, timeout=timeout):
+            for item in page.get('data') or []:
+                if max_items is not None and count >= max_items:
+                    return
+                count += 1
+                yield item
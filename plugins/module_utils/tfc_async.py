@@ -0,0 +1,345 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2024 Olivier Bernard
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import asyncio
+import json
+import ssl
+import time
+
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+try:
+    import aiohttp
+    HAS_AIOHTTP = True
+except ImportError:
+    HAS_AIOHTTP = False
+
+from .tfc import (API_URL, MAX_RETRIES, RATE_LIMIT, RETRY_READ_STATUSES, RETRY_STATUSES, URL, VERSION, TfcError,
+                  get_rate_limiter, param_pairs, retry_delay)
+
+MAX_CONCURRENCY = 20
+
+
+class Headers(dict):
+    """Response headers with case-insensitive lookups."""
+
+    def __init__(self, items=()):
+        super(Headers, self).__init__((name.lower(), value) for name, value in items)
+
+    def get(self, name, default=None):
+        return super(Headers, self).get(name.lower(), default)
+
+
+class AiohttpTransport:
+    """HTTP layer backed by an C(aiohttp) session."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.session = None
+
+    async def request(self, method, url, headers, body, verify, timeout):
+        if self.session is None:
+            self.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.limit))
+
+        try:
+            async with self.session.request(method, url, headers=headers, data=body, ssl=None if verify else False,
+                                            timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                return response.status, Headers(response.headers.items()), await response.read()
+        except asyncio.TimeoutError:
+            raise TfcError('Timeout trying request %s %s.' % (method, url))
+        except aiohttp.ClientError as e:
+            raise TfcError('Error trying request %s %s: %s' % (method, url, str(e)))
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+
+class StdlibTransport:
+    """Minimal HTTP/1.1 layer on asyncio streams, keeping the connections alive for reuse."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.idle = {}
+
+    async def _connect(self, scheme, host, port, verify):
+        context = None
+        if scheme == 'https':
+            context = ssl.create_default_context()
+            if not verify:
+                context.check_hostname = False
+                context.verify_mode = ssl.CERT_NONE
+        return await asyncio.open_connection(host, port, ssl=context)
+
+    @staticmethod
+    async def _read_body(reader, headers, status, method):
+        if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+            return b'', True
+
+        if 'chunked' in (headers.get('Transfer-Encoding') or '').lower():
+            body = bytearray()
+            while True:
+                size = int((await reader.readline()).split(b';')[0].strip(), 16)
+                if size == 0:
+                    # skip the trailers
+                    while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass
+                    return bytes(body), True
+                body += await reader.readexactly(size)
+                await reader.readline()
+
+        if headers.get('Content-Length') is not None:
+            return await reader.readexactly(int(headers.get('Content-Length'))), True
+
+        # no framing: the body ends with the connection
+        return await reader.read(), False
+
+    async def _exchange(self, reader, writer, method, target, host, headers, body):
+        lines = ['%s %s HTTP/1.1' % (method, target), 'Host: %s' % host, 'Connection: keep-alive',
+                 'Content-Length: %d' % len(body or b'')]
+        lines.extend('%s: %s' % item for item in headers.items())
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + (body or b''))
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError('Connection closed by the server.')
+        status = int(status_line.split()[1])
+
+        header_lines = []
+        while True:
+            line = (await reader.readline()).decode('latin-1').rstrip('\r\n')
+            if not line:
+                break
+            name, _sep, value = line.partition(':')
+            header_lines.append((name.strip(), value.strip()))
+        response_headers = Headers(header_lines)
+
+        response_body, reusable = await self._read_body(reader, response_headers, status, method)
+        if (response_headers.get('Connection') or '').lower() == 'close':
+            reusable = False
+
+        return status, response_headers, response_body, reusable
+
+    async def _request(self, method, url, headers, body, verify):
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        key = (parts.scheme, parts.hostname, port, verify)
+        target = (parts.path or '/') + ('?' + parts.query if parts.query else '')
+
+        idle = self.idle.setdefault(key, [])
+        while True:
+            reused = bool(idle)
+            if reused:
+                reader, writer = idle.pop()
+            else:
+                reader, writer = await self._connect(parts.scheme, parts.hostname, port, verify)
+
+            try:
+                status, response_headers, response_body, reusable = await self._exchange(
+                    reader, writer, method, target, parts.netloc, headers, body)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                writer.close()
+                if reused:
+                    # the server dropped an idle keep-alive connection, try another one
+                    continue
+                raise
+            except BaseException:
+                writer.close()
+                raise
+
+            if reusable and len(idle) < self.limit:
+                idle.append((reader, writer))
+            else:
+                writer.close()
+
+            return status, response_headers, response_body
+
+    async def request(self, method, url, headers, body, verify, timeout):
+        try:
+            return await asyncio.wait_for(self._request(method, url, headers, body, verify), timeout)
+        except asyncio.TimeoutError:
+            raise TfcError('Timeout trying request %s %s.' % (method, url))
+        except (OSError, ValueError, IndexError, asyncio.IncompleteReadError) as e:
+            raise TfcError('Error trying request %s %s: %s' % (method, url, str(e)))
+
+    async def close(self):
+        for connections in self.idle.values():
+            for reader, writer in connections:
+                writer.close()
+        self.idle = {}
+
+
+class AsyncTfcClient:
+    """Asynchronous counterpart of C(TfcClient) for high fan-out operations.
+
+    Requests run on one event loop, at most C(max_concurrency) at a time, and
+    share the rate limiting and retry logic of C(TfcClient). The HTTP layer is
+    C(aiohttp) when installed, else a minimal HTTP/1.1 client on asyncio streams.
+    """
+
+    def __init__(self, token: str, url: str = None, max_concurrency: int = MAX_CONCURRENCY,
+                 max_retries: int = MAX_RETRIES, rate_limit: int = RATE_LIMIT,
+                 rate_limit_dir: str = None, transport=None, metrics=None) -> None:
+        if url is None:
+            url = URL
+
+        if not url.lower().startswith(('http:', 'https:')):
+            raise TfcError(
+                "url '%s' should either start with 'http' or 'https'." % url)
+
+        self.api_url = API_URL.format(url=url, version=VERSION)
+        self.token = token
+        self.headers = {"Content-Type": "application/vnd.api+json"}
+        if token is not None:
+            self.headers['Authorization'] = "Bearer {0}".format(token)
+
+        self.max_concurrency = max_concurrency
+        self.semaphore = None
+
+        if transport is None:
+            transport = AiohttpTransport(max_concurrency) if HAS_AIOHTTP else StdlibTransport(max_concurrency)
+        self.transport = transport
+
+        self.max_retries = max_retries or 0
+        self.rate_limiter = None
+        if rate_limit:
+            self.rate_limiter = get_rate_limiter(self.api_url, token, rate_limit, rate_limit_dir)
+
+        self.metrics = metrics
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def close(self):
+        await self.transport.close()
+
+    def _api_url(self, path, params=None):
+        if path is None:
+            api_url = self.api_url
+        elif path.startswith(('http:', 'https:')):
+            api_url = path
+        else:
+            api_url = self.api_url + path
+
+        if params:
+            api_url += ('&' if '?' in api_url else '?') + urlencode(params)
+
+        return api_url
+
+    async def _send(self, method, api_url, body, verify, timeout):
+        retry_statuses = RETRY_STATUSES
+        if method == 'GET':
+            retry_statuses += RETRY_READ_STATUSES
+
+        started = time.time()
+        throttled = 0
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                delay = self.rate_limiter.reserve()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            try:
+                status, headers, response_body = await self.transport.request(
+                    method, api_url, self.headers, body, verify, timeout)
+            except TfcError:
+                if self.metrics is not None:
+                    self.metrics.record(method, api_url, None, time.time() - started, 0, attempt, throttled)
+                raise
+
+            if self.rate_limiter is not None:
+                self.rate_limiter.update(headers)
+
+            if status == 429:
+                throttled += 1
+
+            if status not in retry_statuses or attempt >= self.max_retries:
+                if self.metrics is not None:
+                    self.metrics.record(method, api_url, status, time.time() - started, len(response_body),
+                                        attempt, throttled)
+                return status, headers, response_body
+
+            delay = retry_delay(attempt, headers)
+            if status == 429 and self.rate_limiter is not None:
+                self.rate_limiter.block(delay)
+            else:
+                await asyncio.sleep(delay)
+            attempt += 1
+
+    async def do_request(self, method, path: str, params=None, json_data=None, verify=True, timeout=10):
+        if self.semaphore is None:
+            # created here so that it binds to the running loop
+            self.semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        api_url = self._api_url(path, params)
+        body = json.dumps(json_data).encode('utf-8') if json_data is not None else None
+
+        async with self.semaphore:
+            status, headers, response_body = await self._send(method, api_url, body, verify, timeout)
+
+        if status >= 400:
+            raise TfcError(
+                'Status code error from request %s %s: %s' % (method, api_url, status), status=status)
+
+        if not response_body:
+            return {}
+
+        try:
+            return json.loads(response_body.decode('utf-8'))
+        except ValueError as e:
+            raise TfcError(
+                'API returned invalid JSON when trying to %s %s: %s' % (method, api_url, str(e)))
+
+    async def patch(self, path, json=None, verify=True, timeout=10):
+        return await self.do_request('PATCH', path, json_data=json, verify=verify, timeout=timeout)
+
+    async def create(self, path, json=None, verify=True, timeout=10):
+        return await self.do_request('POST', path, json_data=json, verify=verify, timeout=timeout)
+
+    async def delete(self, path, verify=True, timeout=10):
+        return await self.do_request('DELETE', path, verify=verify, timeout=timeout)
+
+    async def read(self, path, params=None, verify=True, timeout=10):
+        return await self.do_request('GET', path, params=params, verify=verify, timeout=timeout)
+
+    async def items(self, path, params=None, verify=True, timeout=10):
+        """Return the C(data) items of a listing, fetching the pages after the first one concurrently."""
+        # pagination parameters may come from a direct link as well as from params
+        scheme, netloc, url_path, query, fragment = urlsplit(path)
+        path = urlunsplit((scheme, netloc, url_path, '', fragment))
+        params = parse_qsl(query) + param_pairs(params)
+
+        first = await self.read(path, params=params, verify=verify, timeout=timeout)
+        items = list(first.get('data') or [])
+
+        pagination = (first.get('meta') or {}).get('pagination') or {}
+        current = pagination.get('current-page')
+        total = pagination.get('total-pages')
+        if current is None or total is None:
+            next_link = (first.get('links') or {}).get('next')
+            while next_link is not None:
+                page = await self.read(next_link, verify=verify, timeout=timeout)
+                items.extend(page.get('data') or [])
+                next_link = (page.get('links') or {}).get('next')
+            return items
+
+        base_params = [(k, v) for k, v in params if k != 'page[number]']
+        pages = await asyncio.gather(*[
+            self.read(path, params=base_params + [('page[number]', number)], verify=verify, timeout=timeout)
+            for number in range(current + 1, total + 1)])
+        for page in pages:
+            items.extend(page.get('data') or [])
+
+        return items
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2024 Olivier Bernard
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+CACHE_DIR = "~/.ansible/tfc_cache"
+CACHE_MAX_SIZE = 50
+
+
+class TfcResponseCache:
+    """On-disk cache of API responses with a TTL and a size-bounded LRU eviction.
+
+    Each entry is a JSON file named after a hash of the request, holding the
+    decoded body along with its C(ETag) so that an expired entry can still be
+    revalidated with C(If-None-Match).
+    """
+
+    def __init__(self, ttl, cache_dir=None, max_size=CACHE_MAX_SIZE):
+        self.ttl = ttl
+        self.cache_dir = os.path.expanduser(cache_dir or CACHE_DIR)
+        # max_size is given in MiB
+        self.max_size = (max_size or CACHE_MAX_SIZE) * 1024 * 1024
+
+        try:
+            os.makedirs(self.cache_dir, 0o700)
+        except OSError:
+            if not os.path.isdir(self.cache_dir):
+                raise
+
+    @staticmethod
+    def key(*parts):
+        return hashlib.sha256(json.dumps(parts, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + '.json')
+
+    def get(self, key):
+        """Return the entry stored under C(key) with its freshness, or C((None, False))."""
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (IOError, OSError, ValueError):
+            return None, False
+
+        # the modification time doubles as the LRU clock
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+        return entry, time.time() - entry.get('stored', 0) < self.ttl
+
+    def put(self, key, body, etag=None):
+        entry = {'stored': time.time(), 'etag': etag, 'body': body}
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(entry, f)
+            os.rename(tmp_path, self._path(key))
+        except (IOError, OSError):
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+
+        self.evict()
+
+    def refresh(self, key, entry):
+        """Mark a revalidated entry as fresh again."""
+        self.put(key, entry['body'], entry.get('etag'))
+
+    def evict(self):
+        """Remove the least recently used entries until the cache fits in its maximum size."""
+        entries = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json'):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+            total += stat.st_size
+
+        for mtime, size, name in sorted(entries):
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
+            total -= size
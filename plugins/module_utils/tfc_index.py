@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2024 Olivier Bernard
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import json
+import os
+import tempfile
+import threading
+import time
+
+from contextlib import contextmanager
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:
+    HAS_FCNTL = False
+
+from .tfc import token_hash
+
+INDEX_DIR = "~/.ansible/tfc_index"
+INDEX_TTL = 86400
+
+WORKSPACE_PATH_BY_ORGANIZATIONS = "/organizations/{organization}/workspaces/{workspace_name}"
+
+
+class TfcNameIndex:
+    """Persistent index of the IDs of workspaces by organization and name, and of variables by workspace and key.
+
+    The index is one JSON file per API url and token, loaded once and merged
+    under a file lock on each write so that parallel forks keep each other's
+    entries. Listings read by the modules refresh it, writes update it, and
+    entries older than C(ttl) are ignored.
+
+    The IDs served by C(workspace_id) and C(var_id) are remembered in C(hits):
+    a module getting a 404 for one of them calls C(discard_hits) and resolves
+    the names again.
+    """
+
+    def __init__(self, path, ttl=INDEX_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.hits = []
+
+        try:
+            os.makedirs(os.path.dirname(path), 0o700)
+        except OSError:
+            if not os.path.isdir(os.path.dirname(path)):
+                raise
+
+        self.data = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (IOError, OSError, ValueError):
+            data = {}
+
+        data.setdefault('workspaces', {})
+        data.setdefault('vars', {})
+        return data
+
+    @contextmanager
+    def _update(self):
+        """Reload the index under the lock, let the caller change it, then write it back."""
+        with self.lock:
+            fd = None
+            if HAS_FCNTL:
+                fd = os.open(self.path + '.lock', os.O_RDWR | os.O_CREAT, 0o600)
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                self.data = self._load()
+                yield self.data
+
+                tmp_fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix='.tmp')
+                try:
+                    with os.fdopen(tmp_fd, 'w') as f:
+                        json.dump(self.data, f)
+                    os.rename(tmp_path, self.path)
+                except (IOError, OSError):
+                    try:
+                        os.remove(tmp_path)
+                    except OSError:
+                        pass
+            finally:
+                if fd is not None:
+                    # closing the file descriptor releases the lock
+                    os.close(fd)
+
+    def _fresh(self, entry):
+        return entry is not None and time.time() - entry[1] < self.ttl
+
+    @staticmethod
+    def _ids(names):
+        """Reverse a scope of the index, built once per update to find renamed resources."""
+        return dict((entry[0], name) for name, entry in names.items())
+
+    @staticmethod
+    def _put(names, ids, name, id):
+        # a renamed resource keeps its ID, drop its former name
+        former = ids.get(id)
+        if former is not None and former != name and names.get(former, [None])[0] == id:
+            del names[former]
+        names[name] = [id, time.time()]
+        ids[id] = name
+
+    def workspace_id(self, organization, name):
+        entry = self.data['workspaces'].get(organization, {}).get(name)
+        if not self._fresh(entry):
+            return None
+        self.hits.append(('workspaces', organization, name))
+        return entry[0]
+
+    def var_id(self, workspace_id, key):
+        entry = self.data['vars'].get(workspace_id, {}).get(key)
+        if not self._fresh(entry):
+            return None
+        self.hits.append(('vars', workspace_id, key))
+        return entry[0]
+
+    def add_workspaces(self, workspaces, organization=None):
+        """Index workspaces as returned by the API, in the given organization or the one of their relationships."""
+        reverse = {}
+        with self._update() as data:
+            for workspace in workspaces:
+                name = (workspace.get('attributes') or {}).get('name')
+                org = organization or (((workspace.get('relationships') or {}).get('organization') or {})
+                                       .get('data') or {}).get('id')
+                if name is not None and org is not None:
+                    names = data['workspaces'].setdefault(org, {})
+                    if org not in reverse:
+                        reverse[org] = self._ids(names)
+                    self._put(names, reverse[org], name, workspace['id'])
+
+    def set_vars(self, workspace_id, vars):
+        """Replace the variables of a workspace with a complete listing."""
+        with self._update() as data:
+            names = data['vars'][workspace_id] = {}
+            for var in vars:
+                names[var['attributes']['key']] = [var['id'], time.time()]
+
+    def add_vars(self, workspace_id, vars):
+        """Index variables created or updated in a workspace."""
+        with self._update() as data:
+            names = data['vars'].setdefault(workspace_id, {})
+            ids = self._ids(names)
+            for var in vars:
+                key = (var.get('attributes') or {}).get('key')
+                if key is not None:
+                    self._put(names, ids, key, var['id'])
+
+    def discard_hits(self):
+        """Forget the entries served since the index was loaded, one of them being stale."""
+        hits, self.hits = self.hits, []
+        with self._update() as data:
+            for kind, scope, name in hits:
+                data[kind].get(scope, {}).pop(name, None)
+
+
+def get_name_index(module_params):
+    """Return the name index of the module API url and token, or None when the module does not use one."""
+    if not module_params.get('name_index'):
+        return None
+
+    index_dir = os.path.expanduser(module_params.get('name_index_dir') or INDEX_DIR)
+    path = os.path.join(index_dir, token_hash(module_params.get('api_url'), module_params.get('api_token')) + '.json')
+
+    return TfcNameIndex(path, ttl=module_params.get('name_index_ttl') or INDEX_TTL)
+
+
+def resolve_workspace_id(client, index, organization, workspace_name, verify=True, timeout=10):
+    """Return the ID of a workspace given by name, from the index when possible."""
+    if index is not None:
+        workspace_id = index.workspace_id(organization, workspace_name)
+        if workspace_id is not None:
+            return workspace_id
+
+    path = WORKSPACE_PATH_BY_ORGANIZATIONS.format(organization=organization, workspace_name=workspace_name)
+    workspace = client.read(path, params=[('fields[workspaces]', 'name')], verify=verify, timeout=timeout)["data"]
+
+    if index is not None:
+        index.add_workspaces([workspace], organization=organization)
+
+    return workspace["id"]
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2024 Olivier Bernard
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import re
+
+RECORD_TYPES = {}
+
+
+def flat_name(path):
+    """Name of a dotted path in a flat record: C(attributes.name) is C(name), other paths are kept whole."""
+    if path.startswith('attributes.'):
+        return path[len('attributes.'):]
+    return path
+
+
+class Record:
+    """Base of the record types built by C(record_type)."""
+
+    __slots__ = ()
+    _fields = ()
+    _paths = ()
+
+    @classmethod
+    def from_resource(cls, resource):
+        """Build a record from an API resource, a missing path giving None."""
+        record = cls.__new__(cls)
+        for slot, names in zip(cls.__slots__, cls._paths):
+            value = resource
+            for name in names:
+                if not isinstance(value, dict):
+                    value = None
+                    break
+                value = value.get(name)
+            setattr(record, slot, value)
+        return record
+
+    def values(self):
+        return [getattr(self, slot) for slot in self.__slots__]
+
+    def as_dict(self):
+        return dict(zip(self._fields, self.values()))
+
+    def __repr__(self):
+        return '%s(%s)' % (type(self).__name__, ', '.join('%s=%r' % item for item in zip(self._fields, self.values())))
+
+
+def record_type(paths, name='WorkspaceRecord'):
+    """Return the record class keeping the given dotted paths of a resource, one slot each.
+
+    Records hold no per-instance C(__dict__), so a long listing of them costs
+    a fraction of the nested resources they are built from. The classes are
+    built once per list of paths.
+    """
+    paths = tuple(paths)
+    key = (name, paths)
+    if key in RECORD_TYPES:
+        return RECORD_TYPES[key]
+
+    fields = []
+    slots = []
+    for path in paths:
+        field = flat_name(path)
+        if field in fields:
+            raise ValueError('Duplicate field %s in %s.' % (field, ', '.join(paths)))
+        slot = re.sub(r'\W', '_', field)
+        if not slot or slot[0].isdigit() or slot in slots:
+            slot = '_%d_%s' % (len(slots), slot)
+        fields.append(field)
+        slots.append(slot)
+
+    cls = type(name, (Record,), {
+        '__slots__': tuple(slots),
+        '_fields': tuple(fields),
+        '_paths': tuple(tuple(path.split('.')) for path in paths),
+    })
+    RECORD_TYPES[key] = cls
+    return cls
+
+
+def to_columns(cls, records):
+    """Turn records into one list of values per field."""
+    columns = [[] for slot in cls.__slots__]
+    for record in records:
+        for column, slot in zip(columns, cls.__slots__):
+            column.append(getattr(record, slot))
+    return dict(zip(cls._fields, columns))
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2024 Olivier Bernard
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import codecs
+import json
+
+WHITESPACE = ' \t\r\n'
+DIGITS = '0123456789'
+# the characters which may go on with a number ending with a digit
+NUMBER_CHARS = DIGITS + '.eE+-'
+
+
+class JsonStreamError(ValueError):
+    pass
+
+
+class JsonDataStream:
+    """Incremental decoder of a JSON:API document read by chunks.
+
+    Iterating over the stream yields the items of the top-level C(data) array
+    as soon as each one is complete, so that only one item is held in memory
+    at a time. The other top-level members (C(links), C(meta)...) are decoded
+    whole and available in C(members) once the iteration is over.
+    """
+
+    def __init__(self, chunks, key='data'):
+        self.chunks = iter(chunks)
+        self.key = key
+        self.members = {}
+        self.decoder = json.JSONDecoder()
+        self.text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        if self.eof:
+            raise JsonStreamError('Unexpected end of JSON document.')
+
+        # drop what has already been decoded before growing the buffer
+        self.buf = self.buf[self.pos:]
+        self.pos = 0
+
+        for chunk in self.chunks:
+            if chunk:
+                self.buf += self.text_decoder.decode(chunk)
+                return
+
+        self.buf += self.text_decoder.decode(b'', final=True)
+        self.eof = True
+
+    def _peek(self):
+        """Skip the whitespaces and return the next character."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            self._fill()
+
+    def _expect(self, chars):
+        char = self._peek()
+        if char not in chars:
+            raise JsonStreamError('Expecting one of %r at position %d, got %r.' % (chars, self.pos, char))
+        self.pos += 1
+        return char
+
+    def _value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except ValueError:
+                self._fill()
+                continue
+
+            # a number cut at a chunk boundary is decoded as its prefix, and goes on in the next chunk
+            if (not self.eof and self.buf[end - 1] in DIGITS
+                    and (end == len(self.buf) or self.buf[end] in NUMBER_CHARS)):
+                self._fill()
+                continue
+
+            self.pos = end
+            return value
+
+    def _end(self):
+        """Check that only whitespaces follow the document."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                raise JsonStreamError('Extra data at position %d after the JSON document.' % self.pos)
+            if self.eof:
+                return
+            self._fill()
+
+    def __iter__(self):
+        self._expect('{')
+        if self._peek() == '}':
+            self.pos += 1
+            self._end()
+            return
+
+        while True:
+            name = self._value()
+            self._expect(':')
+
+            if name == self.key and self._peek() == '[':
+                self.pos += 1
+                if self._peek() == ']':
+                    self.pos += 1
+                else:
+                    while True:
+                        yield self._value()
+                        if self._expect(',]') == ']':
+                            break
+            else:
+                self.members[name] = self._value()
+
+            if self._expect(',}') == '}':
+                self._end()
+                return
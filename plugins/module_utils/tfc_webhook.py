@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2024 Olivier Bernard
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import hashlib
+import hmac
+import json
+import socket
+import threading
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SIGNATURE_HEADER = 'X-TFE-Notification-Signature'
+RUN_TRIGGERS = ['run:created', 'run:planning', 'run:needs_attention', 'run:applying', 'run:completed', 'run:errored']
+
+
+def signature(token, body):
+    """HMAC-SHA512 of a notification body, as sent by HCP Terraform in C(X-TFE-Notification-Signature)."""
+    return hmac.new(token.encode('utf-8'), body, hashlib.sha512).hexdigest()
+
+
+class WebhookHandler(BaseHTTPRequestHandler):
+
+    def log_message(self, format, *args):
+        pass
+
+    def _answer(self, status):
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_POST(self):
+        listener = self.server.listener
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+
+        received = self.headers.get(SIGNATURE_HEADER) or ''
+        if not hmac.compare_digest(received, signature(listener.token, body)):
+            listener.rejected += 1
+            return self._answer(401)
+
+        try:
+            payload = json.loads(body.decode('utf-8'))
+        except ValueError:
+            listener.rejected += 1
+            return self._answer(400)
+
+        # the verification sent on the creation of a notification configuration has no run
+        if isinstance(payload, dict) and payload.get('run_id'):
+            listener.add(payload['run_id'], payload.get('notifications') or [])
+        self._answer(200)
+
+
+class WebhookServer(ThreadingHTTPServer):
+    # runs settling together notify at once: a short backlog resets their connections, and the lost
+    # notifications leave the runs to the polling of webhook_grace
+    request_queue_size = 128
+    daemon_threads = True
+
+
+class WebhookListener:
+    """Short-lived HTTP server receiving the run notifications of HCP Terraform.
+
+    Notifications are queued by run ID until C(take) hands them over, and
+    C(wait) blocks until one arrives. The requests whose
+    C(X-TFE-Notification-Signature) does not match C(token) are rejected,
+    as anyone reaching the listener could otherwise settle the runs.
+    """
+
+    def __init__(self, token, host='127.0.0.1', port=0):
+        self.token = token
+        self.received = 0
+        self.rejected = 0
+        self.notifications = {}
+        self.condition = threading.Condition()
+
+        self.server = WebhookServer((host, port), WebhookHandler)
+        self.server.listener = self
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        if host in ('0.0.0.0', '::', ''):
+            host = socket.getfqdn()
+        return 'http://%s:%d/' % (host, port)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        if self.thread is not None:
+            self.server.shutdown()
+            self.thread = None
+        self.server.server_close()
+
+    def add(self, run_id, notifications):
+        with self.condition:
+            self.received += 1
+            self.notifications.setdefault(run_id, []).extend(notifications)
+            self.condition.notify_all()
+
+    def take(self, run_ids):
+        """Return and forget the notifications received for the given runs."""
+        with self.condition:
+            return dict((run_id, self.notifications.pop(run_id)) for run_id in run_ids
+                        if run_id in self.notifications)
+
+    def wait(self, run_ids, timeout):
+        """Wait up to C(timeout) seconds for a notification of one of the given runs."""
+        with self.condition:
+            return self.condition.wait_for(lambda: any(run_id in self.notifications for run_id in run_ids),
+                                           timeout=max(0, timeout))
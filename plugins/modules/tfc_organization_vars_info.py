@@ -0,0 +1,454 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2024 Olivier Bernard (@pytoccaz)
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+DOCUMENTATION = '''
+---
+module: tfc_organization_vars_info
+
+short_description: Terraform Cloud API (HCP Terraform) module to search the variables of a whole organization.
+
+version_added: 2.2.0
+
+description:
+  - This module searches the variables of all the workspaces and variable sets of an organization in one task.
+  - The variables of the workspaces and of the variable sets are read concurrently, then indexed by key and by a hash
+    of their value to answer the C(key), C(value), C(category) and C(sensitive) filters.
+  - With C(index_file), the index is kept on disk and only the workspaces and variable sets updated since, or whose
+    entry is older than C(index_ttl), are read again on the next run.
+  - Sensitive values are never returned by the API, so the C(value) filter never matches sensitive variables.
+  - See https://developer.hashicorp.com/terraform/cloud-docs/api-docs/workspace-variables
+    and https://developer.hashicorp.com/terraform/cloud-docs/api-docs/variable-sets
+
+seealso:
+    - module: pytoccaz.terraform_cloud.tfc_workspace_vars_info
+
+options:
+    organization:
+        description:
+            - The name of the organization.
+        type: str
+        required: true
+
+    key:
+        description:
+            - Only return the variables with this key.
+            - Shell-style wildcards (C(*), C(?), C([seq])) are supported.
+        type: str
+
+    value:
+        description:
+            - Only return the variables with this value.
+        type: str
+
+    category:
+        description:
+            - Only return the variables of this category.
+        type: str
+        choices:
+            - terraform
+            - env
+
+    sensitive:
+        description:
+            - Only return the sensitive variables when C(true), the other ones when C(false).
+        type: bool
+
+    varsets:
+        description:
+            - Also search the variable sets of the organization.
+        type: bool
+        default: true
+
+    index_file:
+        description:
+            - File keeping the index between runs, created readable by its owner only as it holds the non-sensitive values.
+            - By default, the index only lives for the task.
+        type: path
+
+    index_ttl:
+        description:
+            - Time (in seconds) the variables of an unchanged workspace or variable set are reused from C(index_file).
+            - Updating a variable does not always change the C(updated-at) of its workspace, this bounds how stale
+              an entry can be.
+        type: int
+        default: 3600
+
+    page_size:
+        description:
+            - Size of the pages of the workspace and variable set listings.
+        type: int
+        default: 100
+
+    max_workers:
+        description:
+            - Number of requests in flight at the same time.
+        type: int
+        default: 16
+
+extends_documentation_fragment:
+    - pytoccaz.terraform_cloud.tfc_options
+
+author:
+  - Olivier Bernard (@pytoccaz)
+'''
+
+EXAMPLES = '''
+- name: Find the workspaces where AWS_REGION is us-east-1
+  tfc_organization_vars_info:
+    organization: myorga
+    key: AWS_REGION
+    value: us-east-1
+    token: "{{ lookup('ansible.builtin.env', 'TERRA_TOKEN') }}"
+  register: found
+
+- name: List the sensitive environment variables, refreshing a persisted index
+  tfc_organization_vars_info:
+    organization: myorga
+    category: env
+    sensitive: true
+    index_file: ~/.ansible/tfc_index/myorga-vars.json
+    token: "{{ lookup('ansible.builtin.env', 'TERRA_TOKEN') }}"
+'''
+
+RETURN = '''
+matches:
+    description:
+        - The variables matching the filters, from a workspace (C(workspace_id), C(workspace_name))
+          or from a variable set (C(varset_id), C(varset_name)).
+    returned: success
+    type: list
+    elements: dict
+    sample:
+        - key: AWS_REGION
+          value: us-east-1
+          category: env
+          sensitive: false
+          hcl: false
+          var_id: var-sQaLVxPGd8Bhui56
+          workspace_id: ws-c6FoAsJsrD5abMrS
+          workspace_name: network-prod
+workspaces:
+    description:
+        - The IDs of the workspaces where a matching variable applies, defined in the workspace itself or
+          through a variable set.
+        - A variable set does not count for a workspace defining the same key and category, unless it has priority.
+    returned: success
+    type: list
+    elements: str
+index:
+    description:
+        - The size of the index, and the number of variable lists read from the API or reused from C(index_file).
+    returned: success
+    type: dict
+    sample:
+        workspaces: 1200
+        varsets: 8
+        variables: 31000
+        keys: 450
+        read: 12
+        reused: 1196
+tfc_metrics:
+    description:
+        - Statistics of the API requests sent by the module, see the C(metrics) option.
+    returned: when C(metrics=true)
+    type: dict
+'''
+import asyncio
+import fnmatch
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+from ..module_utils.tfc import TfcError, get_metrics, metrics_result
+from ..module_utils.tfc_async import AsyncTfcClient
+from ansible.module_utils.basic import AnsibleModule
+
+WORKSPACES_PATH = "/organizations/{organization}/workspaces"
+WORKSPACE_VARS_PATH = "/workspaces/{workspace_id}/vars"
+VARSETS_PATH = "/organizations/{organization}/varsets"
+VARSET_VARS_PATH = "/varsets/{varset_id}/relationships/vars"
+INDEX_VERSION = 1
+
+# variables are kept as lists of these fields, a dict each would double the memory of large organizations
+VAR_FIELDS = ("id", "key", "value", "category", "sensitive", "hcl")
+ID = 0
+KEY = 1
+VALUE = 2
+CATEGORY = 3
+SENSITIVE = 4
+
+
+def value_hash(value):
+    return hashlib.sha256(json.dumps(value).encode('utf-8')).hexdigest()[:16]
+
+
+def related_ids(resource, relationship):
+    data = ((resource.get("relationships") or {}).get(relationship) or {}).get("data")
+    if data is None:
+        return []
+    if isinstance(data, dict):
+        return [data["id"]]
+    return [related["id"] for related in data]
+
+
+def slim_vars(vars):
+    return [[var["id"]] + [var["attributes"].get(name) for name in VAR_FIELDS[1:]] for var in vars]
+
+
+def load_index(path, organization):
+    try:
+        with open(path) as f:
+            index = json.load(f)
+    except (IOError, OSError, ValueError):
+        return {}
+
+    if index.get("version") != INDEX_VERSION or index.get("organization") != organization:
+        return {}
+    return index
+
+
+def save_index(path, index):
+    directory = os.path.dirname(path) or '.'
+    try:
+        os.makedirs(directory, 0o700)
+    except OSError:
+        if not os.path.isdir(directory):
+            raise TfcError('Cannot create the directory of index_file %s.' % path)
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(index, f)
+        os.rename(tmp_path, path)
+    except (IOError, OSError) as e:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise TfcError('Cannot write index_file %s: %s' % (path, str(e)))
+
+
+def is_fresh(entry, updated_at, ttl, now):
+    return (entry is not None and entry.get("updated-at") == updated_at
+            and now - entry.get("stored", 0) < ttl)
+
+
+async def crawl(client, module_params, previous):
+    """Return the index of the organization, reading the variables not reusable from the previous index."""
+    organization = module_params.get('organization')
+    validate_certs = module_params.get('validate_certs')
+    connection_timeout = module_params.get('connection_timeout')
+    page_size = module_params.get('page_size')
+    ttl = module_params.get('index_ttl')
+    now = time.time()
+
+    listings = [client.items(WORKSPACES_PATH.format(organization=organization),
+                             params=[('page[size]', page_size), ('fields[workspaces]', 'name,updated-at,project')],
+                             verify=validate_certs, timeout=connection_timeout)]
+    if module_params.get('varsets'):
+        listings.append(client.items(VARSETS_PATH.format(organization=organization),
+                                     params=[('page[size]', page_size)],
+                                     verify=validate_certs, timeout=connection_timeout))
+    listings = await asyncio.gather(*listings)
+
+    index = {"version": INDEX_VERSION, "organization": organization, "workspaces": {}, "varsets": {}}
+    reads = []
+
+    for workspace in listings[0]:
+        attributes = workspace.get("attributes") or {}
+        entry = {
+            "name": attributes.get("name"),
+            "project": (related_ids(workspace, "project") or [None])[0],
+            "updated-at": attributes.get("updated-at"),
+        }
+        cached = (previous.get("workspaces") or {}).get(workspace["id"])
+        if is_fresh(cached, entry["updated-at"], ttl, now):
+            entry.update(stored=cached["stored"], vars=cached["vars"])
+        else:
+            reads.append((entry, WORKSPACE_VARS_PATH.format(workspace_id=workspace["id"])))
+        index["workspaces"][workspace["id"]] = entry
+
+    for varset in listings[1] if len(listings) > 1 else []:
+        attributes = varset.get("attributes") or {}
+        entry = {
+            "name": attributes.get("name"),
+            "global": bool(attributes.get("global")),
+            "priority": bool(attributes.get("priority")),
+            "workspaces": related_ids(varset, "workspaces"),
+            "projects": related_ids(varset, "projects"),
+            "updated-at": attributes.get("updated-at"),
+        }
+        cached = (previous.get("varsets") or {}).get(varset["id"])
+        if is_fresh(cached, entry["updated-at"], ttl, now):
+            entry.update(stored=cached["stored"], vars=cached["vars"])
+        else:
+            reads.append((entry, VARSET_VARS_PATH.format(varset_id=varset["id"])))
+        index["varsets"][varset["id"]] = entry
+
+    async def read_vars(entry, path):
+        response = await client.read(path, verify=validate_certs, timeout=connection_timeout)
+        entry.update(stored=now, vars=slim_vars(response.get("data") or []))
+
+    await asyncio.gather(*[read_vars(entry, path) for entry, path in reads])
+
+    total = len(index["workspaces"]) + len(index["varsets"])
+    return index, {"read": len(reads), "reused": total - len(reads)}
+
+
+class VarIndex:
+    """Inverted index of the variables of an organization, by key and by value hash."""
+
+    def __init__(self, index):
+        self.workspaces = index["workspaces"]
+        self.varsets = index["varsets"]
+        self.entries = []
+        self.by_key = {}
+        self.by_value = {}
+
+        for owner, resources in (("workspace", self.workspaces), ("varset", self.varsets)):
+            for resource_id, resource in resources.items():
+                for var in resource["vars"]:
+                    position = len(self.entries)
+                    self.entries.append((owner, resource_id, var))
+                    self.by_key.setdefault(var[KEY], []).append(position)
+                    if not var[SENSITIVE]:
+                        self.by_value.setdefault(value_hash(var[VALUE]), []).append(position)
+
+        # the keys defined by each workspace, to tell which variable sets they override
+        self.workspace_keys = dict((workspace_id, set((var[KEY], var[CATEGORY]) for var in workspace["vars"]))
+                                   for workspace_id, workspace in self.workspaces.items())
+        self.project_workspaces = {}
+        for workspace_id, workspace in self.workspaces.items():
+            self.project_workspaces.setdefault(workspace["project"], []).append(workspace_id)
+
+    def search(self, key=None, value=None, category=None, sensitive=None):
+        positions = None
+        if key is not None:
+            keys = fnmatch.filter(self.by_key, key) if any(char in key for char in '*?[') else [key]
+            positions = set(position for matched in keys for position in self.by_key.get(matched, []))
+        if value is not None:
+            by_value = set(self.by_value.get(value_hash(value), []))
+            positions = by_value if positions is None else positions & by_value
+        if positions is None:
+            positions = range(len(self.entries))
+
+        return [self.entries[position] for position in sorted(positions)
+                if (category is None or self.entries[position][2][CATEGORY] == category)
+                and (sensitive is None or self.entries[position][2][SENSITIVE] == sensitive)]
+
+    def applies_to(self, owner, resource_id, var):
+        if owner == "workspace":
+            return [resource_id]
+
+        varset = self.varsets[resource_id]
+        if varset["global"]:
+            workspace_ids = list(self.workspaces)
+        else:
+            workspace_ids = [workspace_id for workspace_id in varset["workspaces"] if workspace_id in self.workspaces]
+            for project_id in varset["projects"]:
+                workspace_ids.extend(self.project_workspaces.get(project_id, []))
+
+        if varset["priority"]:
+            return workspace_ids
+        return [workspace_id for workspace_id in workspace_ids
+                if (var[KEY], var[CATEGORY]) not in self.workspace_keys[workspace_id]]
+
+    def match(self, owner, resource_id, var):
+        match = dict(zip(VAR_FIELDS[1:], var[1:]))
+        match["var_id"] = var[ID]
+        if owner == "workspace":
+            match.update(workspace_id=resource_id, workspace_name=self.workspaces[resource_id]["name"])
+        else:
+            match.update(varset_id=resource_id, varset_name=self.varsets[resource_id]["name"])
+        return match
+
+
+async def get_organization_vars(module_params):
+    index_file = module_params.get('index_file')
+
+    previous = load_index(index_file, module_params.get('organization')) if index_file else {}
+
+    async with AsyncTfcClient(module_params.get('api_token'), url=module_params.get('api_url'),
+                              max_concurrency=module_params.get('max_workers'),
+                              max_retries=module_params.get('max_retries'),
+                              rate_limit=module_params.get('rate_limit'),
+                              rate_limit_dir=module_params.get('rate_limit_dir'),
+                              metrics=get_metrics(module_params)) as client:
+        index, counts = await crawl(client, module_params, previous)
+
+    if index_file:
+        save_index(index_file, index)
+
+    var_index = VarIndex(index)
+    found = var_index.search(key=module_params.get('key'), value=module_params.get('value'),
+                             category=module_params.get('category'), sensitive=module_params.get('sensitive'))
+
+    workspaces = set()
+    for owner, resource_id, var in found:
+        workspaces.update(var_index.applies_to(owner, resource_id, var))
+
+    counts.update(workspaces=len(var_index.workspaces), varsets=len(var_index.varsets),
+                  variables=len(var_index.entries), keys=len(var_index.by_key))
+
+    return {
+        "matches": [var_index.match(owner, resource_id, var) for owner, resource_id, var in found],
+        "workspaces": sorted(workspaces),
+        "index": counts,
+    }
+
+
+def main():
+    """
+    Module tfc_organization_vars_info
+    """
+
+    argument_spec = dict(
+        api_url=dict(type='str', aliases=['url']),
+        api_token=dict(type='str', aliases=[
+                       'token'], required=True, no_log=True),
+        organization=dict(type='str', required=True),
+        key=dict(type='str', no_log=False),
+        value=dict(type='str'),
+        category=dict(type='str', choices=['terraform', 'env']),
+        sensitive=dict(type='bool'),
+        varsets=dict(type='bool', default=True),
+        index_file=dict(type='path'),
+        index_ttl=dict(type='int', default=3600),
+        page_size=dict(type='int', default=100),
+        max_workers=dict(type='int', default=16),
+        validate_certs=dict(type='bool', default=True),
+        connection_timeout=dict(type='int', default=10),
+        max_retries=dict(type='int', default=3),
+        rate_limit=dict(type='int', default=30),
+        rate_limit_dir=dict(type='path'),
+        metrics=dict(type='bool', default=False),
+        metrics_file=dict(type='path'),
+    )
+
+    module = AnsibleModule(
+        argument_spec=argument_spec,
+        supports_check_mode=True,
+    )
+
+    try:
+        result = asyncio.run(get_organization_vars(module.params))
+    except TfcError as e:
+        module.fail_json(msg=str(e), **metrics_result(module.params))
+
+    result.update(metrics_result(module.params))
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
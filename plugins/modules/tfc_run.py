@@ -0,0 +1,546 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2024 Olivier Bernard (@pytoccaz)
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+DOCUMENTATION = '''
+---
+module: tfc_run
+
+short_description: Terraform Cloud API (HCP Terraform) module to queue runs on many workspaces and wait for them.
+
+version_added: 2.2.0
+
+description:
+  - This module queues a run on each of the given workspaces concurrently, then waits for all of them.
+  - The pending runs are read in sweeps, concurrently, sparse fieldsets keeping each read small. The interval
+    between sweeps starts at C(poll_interval) and grows up to C(poll_interval_max) while no run changes status,
+    and gets back to C(poll_interval) when one does.
+  - A run stops being polled as soon as it reaches a final status (C(applied), C(planned_and_finished),
+    C(planned_and_saved), C(errored), C(discarded), C(canceled), C(force_canceled)), or when it waits for
+    a confirmation or a policy override, which this module does not give.
+  - With C(wait_strategy=webhook), the module listens for the run notifications of HCP Terraform instead, and
+    only polls the runs not heard of for C(webhook_grace) seconds. A notification configuration pointing to
+    the listener is created on each workspace for the time of the task, unless C(webhook_create=false).
+    HCP Terraform must be able to reach C(webhook_url).
+  - The module fails when a run could not be queued, ended C(errored), C(canceled) or C(force_canceled),
+    or was still running after C(wait_timeout). C(runs) is returned in any case.
+  - The module reports a change when a run was queued, or a notification configuration created.
+  - In check mode, no run is queued.
+  - See https://developer.hashicorp.com/terraform/cloud-docs/api-docs/run
+
+seealso:
+    - module: pytoccaz.terraform_cloud.tfc_vars_reconcile
+
+options:
+    workspace_ids:
+        description:
+            - The IDs of the workspaces to queue a run on.
+        type: list
+        elements: str
+
+    workspace_names:
+        description:
+            - The names of the workspaces to queue a run on, in C(organization).
+        type: list
+        elements: str
+
+    organization:
+        description:
+            - The organization of C(workspace_names).
+        type: str
+
+    message:
+        description:
+            - The message of the runs.
+        type: str
+        default: Queued by Ansible
+
+    attributes:
+        description:
+            - Other attributes of the runs, for instance C(is-destroy), C(plan-only), C(auto-apply) or C(target-addrs).
+        type: dict
+        default: {}
+
+    wait:
+        description:
+            - Wait for the runs to settle. Otherwise the module returns once the runs are queued.
+        type: bool
+        default: true
+
+    wait_timeout:
+        description:
+            - Time (in seconds) to wait for the runs to settle.
+        type: int
+        default: 1800
+
+    poll_interval:
+        description:
+            - Shortest time (in seconds) between two sweeps of the pending runs.
+        type: float
+        default: 5
+
+    poll_interval_max:
+        description:
+            - Longest time (in seconds) between two sweeps of the pending runs.
+        type: float
+        default: 60
+
+    max_workers:
+        description:
+            - Number of requests sent in parallel to queue and read the runs.
+        type: int
+        default: 8
+
+    wait_strategy:
+        description:
+            - How to learn that the runs settled.
+            - C(poll) reads the pending runs in sweeps.
+            - C(webhook) receives the notifications sent by HCP Terraform on each status change, and
+              polls only the runs silent for C(webhook_grace) seconds, for instance the canceled ones
+              which are not notified.
+        type: str
+        choices:
+            - poll
+            - webhook
+        default: poll
+
+    webhook_host:
+        description:
+            - Address the notification listener binds to.
+            - The loopback address by default, to be reached through a reverse proxy at C(webhook_url).
+              Set C(0.0.0.0) to listen on all the interfaces.
+        type: str
+        default: 127.0.0.1
+
+    webhook_port:
+        description:
+            - Port the notification listener binds to, C(0) for a free one.
+        type: int
+        default: 0
+
+    webhook_url:
+        description:
+            - URL the notifications are sent to, for instance the public address of a reverse proxy to the listener.
+            - Defaults to the address of the listener, named after the fully qualified name of the host
+              when it listens on all the interfaces.
+        type: str
+
+    webhook_token:
+        description:
+            - Secret of the HMAC-SHA512 signature of the notifications. Notifications signed with another token,
+              or not signed, are rejected.
+            - Defaults to a random token, when C(webhook_create=true).
+            - Required with C(wait_strategy=webhook) and C(webhook_create=false).
+        type: str
+
+    webhook_create:
+        description:
+            - Create a generic notification configuration on each workspace before queuing the runs,
+              and delete it once the runs are settled.
+            - This costs two requests per workspace. Set to C(false) when the workspaces already notify
+              C(webhook_url) with C(webhook_token), for instance to wait on the same workspaces repeatedly.
+        type: bool
+        default: true
+
+    webhook_grace:
+        description:
+            - Time (in seconds) without a notification of a run before it is polled.
+        type: float
+        default: 300
+
+extends_documentation_fragment:
+    - pytoccaz.terraform_cloud.tfc_options
+    - pytoccaz.terraform_cloud.tfc_index
+
+author:
+  - Olivier Bernard (@pytoccaz)
+'''
+
+EXAMPLES = '''
+- name: Apply the workspaces whose variables were changed
+  tfc_run:
+    workspace_ids: "{{ reconciled.plan.keys() | list }}"
+    message: Variables updated by Ansible
+    attributes:
+      auto-apply: true
+    token: "{{ lookup('ansible.builtin.env', 'TERRA_TOKEN') }}"
+
+- name: Plan two workspaces without applying them
+  tfc_run:
+    organization: myorga
+    workspace_names:
+      - network-prod
+      - compute-prod
+    attributes:
+      plan-only: true
+    poll_interval: 10
+    token: "{{ lookup('ansible.builtin.env', 'TERRA_TOKEN') }}"
+
+- name: Apply 200 workspaces, waiting for their notifications instead of polling them
+  tfc_run:
+    workspace_ids: "{{ workspace_ids }}"
+    attributes:
+      auto-apply: true
+    wait_strategy: webhook
+    webhook_port: 8080
+    # a reverse proxy forwarding to port 8080 of the controller
+    webhook_url: https://ansible-runner.example.com/tfc-runs
+    token: "{{ lookup('ansible.builtin.env', 'TERRA_TOKEN') }}"
+'''
+
+RETURN = '''
+runs:
+    description:
+        - The run queued on each workspace, in the order of C(workspace_ids) then C(workspace_names).
+        - C(elapsed) is the time (in seconds) from the queuing of the run to the sweep or the notification
+          that saw it settle,
+          C(status_timestamps) the times of its statuses as recorded by HCP Terraform.
+        - C(error) is set when the run could not be queued.
+        - C(notifications) is the number of notifications received for the run with C(wait_strategy=webhook).
+    returned: always
+    type: list
+    elements: dict
+    sample:
+        - workspace_id: ws-c6FoAsJsrD5abMrS
+          workspace_name: network-prod
+          run_id: run-CZcmD7eagjhyX0vN
+          status: applied
+          settled: true
+          elapsed: 94.2
+          polls: 7
+          status_timestamps:
+              plan-queued-at: "2024-05-02T09:41:04+00:00"
+              planned-at: "2024-05-02T09:41:40+00:00"
+              applied-at: "2024-05-02T09:42:37+00:00"
+statuses:
+    description:
+        - The number of runs by status.
+    returned: always
+    type: dict
+    sample:
+        applied: 11
+        errored: 1
+webhooks:
+    description:
+        - The number of notification requests received by the listener, and rejected for a wrong signature.
+    returned: when C(wait_strategy=webhook)
+    type: dict
+    sample:
+        received: 60
+        rejected: 0
+tfc_metrics:
+    description:
+        - Statistics of the API requests sent by the module, see the C(metrics) option.
+    returned: when C(metrics=true)
+    type: dict
+'''
+import secrets
+import time
+
+from ..module_utils.tfc import (TfcClient, TfcError, POOL_MAXSIZE, client_options, concurrent_map,
+                                metrics_result)
+from ..module_utils.tfc_index import get_name_index, resolve_workspace_id
+from ..module_utils.tfc_webhook import RUN_TRIGGERS, WebhookListener
+from ansible.module_utils.basic import AnsibleModule
+
+RUNS_PATH = "/runs"
+RUN_PATH = "/runs/{run_id}"
+NOTIFICATIONS_PATH = "/workspaces/{workspace_id}/notification-configurations"
+NOTIFICATION_PATH = "/notification-configurations/{notification_id}"
+
+FINAL_STATUSES = ('applied', 'planned_and_finished', 'planned_and_saved', 'errored', 'discarded', 'canceled',
+                  'force_canceled')
+FAILED_STATUSES = ('errored', 'canceled', 'force_canceled')
+POLL_BACKOFF = 1.5
+SETTLING_TRIGGERS = ('run:needs_attention', 'run:completed', 'run:errored')
+
+
+def is_settled(run):
+    attributes = run.get("attributes") or {}
+    return (attributes.get("status") in FINAL_STATUSES or attributes.get("status") == "policy_override"
+            or bool((attributes.get("actions") or {}).get("is-confirmable")))
+
+
+def update_outcome(outcome, run, now):
+    attributes = run.get("attributes") or {}
+    moved = attributes.get("status") != outcome["status"]
+    outcome["status"] = attributes.get("status")
+    outcome["status_timestamps"] = attributes.get("status-timestamps") or {}
+    if is_settled(run):
+        settle(outcome, now)
+    return moved
+
+
+def settle(outcome, now):
+    outcome["settled"] = True
+    outcome["elapsed"] = round(now - outcome.pop("queued"), 3)
+
+
+def notify_outcome(outcome, notifications, now):
+    """Apply the notifications received for a run, as a sweep would apply a read."""
+    outcome["notifications"] += len(notifications)
+    # deliveries may overtake each other
+    for notification in sorted(notifications, key=lambda notification: notification.get("run_updated_at") or ''):
+        if outcome["settled"]:
+            break
+        status = notification.get("run_status")
+        if status is None:
+            continue
+        outcome["status"] = status
+        if notification.get("run_updated_at"):
+            outcome["status_timestamps"]["%s-at" % status.replace('_', '-')] = notification["run_updated_at"]
+        if notification.get("trigger") in SETTLING_TRIGGERS or status in FINAL_STATUSES:
+            settle(outcome, now)
+
+
+def poll(pending, read, module_params):
+    """Sweep the pending runs until they settle, return the ones still pending at the deadline."""
+    poll_interval = module_params.get('poll_interval')
+    deadline = time.time() + module_params.get('wait_timeout')
+    interval = poll_interval
+
+    while pending and time.time() < deadline:
+        time.sleep(max(0, min(interval, deadline - time.time())))
+
+        moved = False
+        for outcome, run in zip(pending, read(pending)):
+            outcome["polls"] += 1
+            moved = update_outcome(outcome, run, time.time()) or moved
+        pending = [outcome for outcome in pending if not outcome["settled"]]
+
+        # poll faster while the runs move, slower while they wait in a queue
+        interval = poll_interval if moved else min(interval * POLL_BACKOFF, module_params.get('poll_interval_max'))
+
+    return pending
+
+
+def listen(pending, read, listener, module_params):
+    """Wait for the notifications of the pending runs, polling the silent ones, return the ones still pending."""
+    grace = module_params.get('webhook_grace')
+    deadline = time.time() + module_params.get('wait_timeout')
+    heard = dict((outcome["run_id"], outcome["queued"]) for outcome in pending)
+
+    while pending and time.time() < deadline:
+        next_poll = min(heard[outcome["run_id"]] for outcome in pending) + grace
+        listener.wait([outcome["run_id"] for outcome in pending], min(next_poll, deadline) - time.time())
+
+        now = time.time()
+        notifications = listener.take([outcome["run_id"] for outcome in pending])
+        for outcome in pending:
+            if outcome["run_id"] in notifications:
+                heard[outcome["run_id"]] = now
+                notify_outcome(outcome, notifications[outcome["run_id"]], now)
+        pending = [outcome for outcome in pending if not outcome["settled"]]
+
+        silent = [outcome for outcome in pending if now - heard[outcome["run_id"]] >= grace]
+        if silent:
+            for outcome, run in zip(silent, read(silent)):
+                outcome["polls"] += 1
+                heard[outcome["run_id"]] = time.time()
+                update_outcome(outcome, run, time.time())
+            pending = [outcome for outcome in pending if not outcome["settled"]]
+
+    return pending
+
+
+def queue_runs(module_params, check_mode=False):
+    validate_certs = module_params.get('validate_certs')
+    connection_timeout = module_params.get('connection_timeout')
+    organization = module_params.get('organization')
+    max_workers = module_params.get('max_workers')
+
+    client = TfcClient(module_params.get('api_token'), url=module_params.get('api_url'),
+                       pool_maxsize=max(POOL_MAXSIZE, max_workers), **client_options(module_params))
+    name_index = get_name_index(module_params)
+
+    workspace_names = list(dict.fromkeys(module_params.get('workspace_names') or []))
+
+    def resolve(workspace_name):
+        return resolve_workspace_id(client, name_index, organization, workspace_name,
+                                    verify=validate_certs, timeout=connection_timeout)
+
+    targets = [(workspace_id, None) for workspace_id in dict.fromkeys(module_params.get('workspace_ids') or [])]
+    targets.extend(zip(concurrent_map(resolve, workspace_names, max_workers), workspace_names))
+
+    outcomes = []
+    for workspace_id, workspace_name in targets:
+        outcome = {"workspace_id": workspace_id, "run_id": None, "status": None, "settled": False, "polls": 0}
+        if workspace_name is not None:
+            outcome["workspace_name"] = workspace_name
+        outcomes.append(outcome)
+
+    result = {"changed": len(outcomes) > 0, "runs": outcomes}
+    if check_mode:
+        result["statuses"] = {}
+        return result
+
+    attributes = dict(module_params.get('attributes') or {}, message=module_params.get('message'))
+    webhook = module_params.get('wait') and module_params.get('wait_strategy') == 'webhook'
+
+    def queue(outcome):
+        payload = {"data": {
+            "type": "runs",
+            "attributes": attributes,
+            "relationships": {"workspace": {"data": {"type": "workspaces", "id": outcome["workspace_id"]}}},
+        }}
+        outcome["queued"] = time.time()
+        try:
+            run = client.create(RUNS_PATH, json=payload, verify=validate_certs, timeout=connection_timeout)["data"]
+        except TfcError as e:
+            # the other runs are queued anyway, report this one
+            outcome.pop("queued")
+            outcome["error"] = str(e)
+            return
+        outcome["run_id"] = run["id"]
+        update_outcome(outcome, run, time.time())
+
+    def read(pending):
+        return concurrent_map(lambda outcome: client.read(
+            RUN_PATH.format(run_id=outcome["run_id"]), params=[('fields[runs]', 'status,status-timestamps,actions')],
+            verify=validate_certs, timeout=connection_timeout)["data"], pending, max_workers)
+
+    listener = None
+    notification_ids = []
+    try:
+        if webhook:
+            token = module_params.get('webhook_token')
+            if token is None and module_params.get('webhook_create'):
+                token = secrets.token_hex(32)
+            listener = WebhookListener(token, host=module_params.get('webhook_host'),
+                                       port=module_params.get('webhook_port')).start()
+
+            if module_params.get('webhook_create'):
+                configuration = {"data": {"type": "notification-configurations", "attributes": {
+                    "destination-type": "generic",
+                    "enabled": True,
+                    "name": "ansible-tfc-run-%s" % secrets.token_hex(4),
+                    "token": token,
+                    "triggers": RUN_TRIGGERS,
+                    "url": module_params.get('webhook_url') or listener.url,
+                }}}
+
+                def create_notification(workspace_id):
+                    notification = client.create(NOTIFICATIONS_PATH.format(workspace_id=workspace_id),
+                                                 json=configuration, verify=validate_certs,
+                                                 timeout=connection_timeout)["data"]
+                    notification_ids.append(notification["id"])
+
+                list(concurrent_map(create_notification, dict.fromkeys(outcome["workspace_id"] for outcome in outcomes),
+                                    max_workers))
+
+        list(concurrent_map(queue, outcomes, max_workers))
+
+        pending = [outcome for outcome in outcomes if outcome["run_id"] is not None and not outcome["settled"]]
+        if webhook:
+            for outcome in outcomes:
+                outcome["notifications"] = 0
+            pending = listen(pending, read, listener, module_params)
+        elif module_params.get('wait'):
+            pending = poll(pending, read, module_params)
+    finally:
+        if listener is not None:
+            listener.stop()
+            result["webhooks"] = {"received": listener.received, "rejected": listener.rejected}
+
+        def delete_notification(notification_id):
+            try:
+                client.delete(NOTIFICATION_PATH.format(notification_id=notification_id),
+                              verify=validate_certs, timeout=connection_timeout)
+            except TfcError:
+                # already gone
+                pass
+
+        list(concurrent_map(delete_notification, notification_ids, max_workers))
+
+    result["changed"] = bool(notification_ids) or any(outcome["run_id"] is not None for outcome in outcomes)
+    for outcome in outcomes:
+        outcome.pop("queued", None)
+
+    statuses = {}
+    for outcome in outcomes:
+        if outcome["status"] is not None:
+            statuses[outcome["status"]] = statuses.get(outcome["status"], 0) + 1
+    result["statuses"] = statuses
+
+    errors = [outcome for outcome in outcomes if "error" in outcome]
+    failed = [outcome for outcome in outcomes if outcome["status"] in FAILED_STATUSES]
+    if errors or failed or (module_params.get('wait') and pending):
+        result["failed"] = True
+        result["msg"] = '%d runs could not be queued, %d failed and %d did not settle in %d seconds.' % (
+            len(errors), len(failed), len(pending) if module_params.get('wait') else 0,
+            module_params.get('wait_timeout'))
+
+    return result
+
+
+def main():
+    """
+    Module tfc_run
+    """
+
+    argument_spec = dict(
+        api_url=dict(type='str', aliases=['url']),
+        api_token=dict(type='str', aliases=[
+                       'token'], required=True, no_log=True),
+        workspace_ids=dict(type='list', elements='str'),
+        workspace_names=dict(type='list', elements='str'),
+        organization=dict(type='str'),
+        message=dict(type='str', default='Queued by Ansible'),
+        attributes=dict(type='dict', default={}),
+        wait=dict(type='bool', default=True),
+        wait_timeout=dict(type='int', default=1800),
+        poll_interval=dict(type='float', default=5),
+        poll_interval_max=dict(type='float', default=60),
+        max_workers=dict(type='int', default=8),
+        wait_strategy=dict(type='str', choices=['poll', 'webhook'], default='poll'),
+        webhook_host=dict(type='str', default='127.0.0.1'),
+        webhook_port=dict(type='int', default=0),
+        webhook_url=dict(type='str'),
+        webhook_token=dict(type='str', no_log=True),
+        webhook_create=dict(type='bool', default=True),
+        webhook_grace=dict(type='float', default=300),
+        validate_certs=dict(type='bool', default=True),
+        connection_timeout=dict(type='int', default=10),
+        max_retries=dict(type='int', default=3),
+        rate_limit=dict(type='int', default=30),
+        rate_limit_dir=dict(type='path'),
+        metrics=dict(type='bool', default=False),
+        metrics_file=dict(type='path'),
+        name_index=dict(type='bool', default=False),
+        name_index_ttl=dict(type='int', default=86400),
+        name_index_dir=dict(type='path'),
+    )
+
+    module = AnsibleModule(
+        argument_spec=argument_spec,
+        supports_check_mode=True,
+        required_one_of=[('workspace_ids', 'workspace_names')],
+        required_by={'workspace_names': 'organization'},
+    )
+
+    # required_if takes a single condition: the token only matters when waiting on notifications
+    if (module.params['wait'] and module.params['wait_strategy'] == 'webhook' and not module.params['webhook_create']
+            and module.params['webhook_token'] is None):
+        module.fail_json(msg='webhook_token is required with wait_strategy=webhook and webhook_create=false.')
+
+    try:
+        result = queue_runs(module.params, check_mode=module.check_mode)
+    except TfcError as e:
+        module.fail_json(msg=str(e), **metrics_result(module.params))
+
+    result.update(metrics_result(module.params))
+    if result.get("failed"):
+        module.fail_json(**result)
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
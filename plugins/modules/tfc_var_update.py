@@ -75,8 +75,14 @@ data:
         - The data attribute from HCP Terraform route C(PATCH /vars/:variable_id)
     returned: success
     type: dict
+tfc_metrics:
+    description:
+        - Statistics of the API requests sent by the module, see the C(metrics) option.
+    returned: when C(metrics=true)
+    type: dict
+    version_added: 2.2.0
 '''
-from ..module_utils.tfc import TfcClient, TfcError
+from ..module_utils.tfc import TfcClient, TfcError, client_options, metrics_result
 from ansible.module_utils.basic import AnsibleModule
 
 WORKSPACE_VAR_PATH = "/vars/{variable_id}"
@@ -101,7 +107,7 @@ def update_var(module_params):
 
     path = WORKSPACE_VAR_PATH.format(variable_id=variable_id)
 
-    client = TfcClient(token, url=api_url)
+    client = TfcClient(token, url=api_url, **client_options(module_params))
     r = client.patch(path, json=payload, verify=validate_certs,
                      timeout=connection_timeout)
 
@@ -120,6 +126,11 @@ def main():
         variable_id=dict(type='str', aliases=['id'], required=True),
         validate_certs=dict(type='bool', default=True),
         connection_timeout=dict(type='int', default=10),
+        max_retries=dict(type='int', default=3),
+        rate_limit=dict(type='int', default=30),
+        rate_limit_dir=dict(type='path'),
+        metrics=dict(type='bool', default=False),
+        metrics_file=dict(type='path'),
         data=dict(type='dict'),
         payload=dict(type='dict'),
         attributes=dict(type='dict'),
@@ -135,8 +146,9 @@ def main():
     try:
         result = update_var(module.params)
     except TfcError as e:
-        module.fail_json(msg=str(e))
+        module.fail_json(msg=str(e), **metrics_result(module.params))
 
+    result.update(metrics_result(module.params))
     module.exit_json(**result)
 
 
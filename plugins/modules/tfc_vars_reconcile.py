@@ -0,0 +1,311 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2024 Olivier Bernard (@pytoccaz)
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+DOCUMENTATION = '''
+---
+module: tfc_vars_reconcile
+
+short_description: Terraform Cloud API (HCP Terraform) module to converge the variables of many workspaces.
+
+version_added: 2.2.0
+
+description:
+  - This module converges the variables of many workspaces to a desired state in one task.
+  - The current variables of all the workspaces are listed concurrently, then a plan of the variables
+    to create, update and (with C(purge)) delete is computed.
+  - Only the planned changes are sent, concurrently, in batches of C(batch_size) requests.
+  - In check mode, the plan is returned and nothing is changed.
+  - Sensitive values are never returned by the API, so a sensitive variable with a desired value is always updated,
+    and it is listed in C(plan) with C(changed=true) on every run.
+  - See https://developer.hashicorp.com/terraform/cloud-docs/api-docs/workspace-variables
+
+seealso:
+    - module: pytoccaz.terraform_cloud.tfc_workspace_vars_update
+
+options:
+    workspaces:
+        description:
+            - The desired variables of each workspace.
+        type: list
+        elements: dict
+        required: true
+        suboptions:
+            workspace_id:
+                description:
+                    - The ID of the workspace.
+                    - A workspace ID appearing twice makes the module fail before any change.
+                type: str
+                required: true
+            variables:
+                description:
+                    - The desired variables of the workspace.
+                    - Either a dict mapping each variable key to its attributes, or a list of dicts each holding a C(key) item along with the attributes.
+                    - A key appearing twice in the list makes the module fail before any change.
+                    - A plain value instead of a dict of attributes is a shortcut for a dict with a single C(value) item.
+                    - Created variables default to the C(terraform) category.
+                type: raw
+                required: true
+
+    purge:
+        description:
+            - Delete the variables of the workspaces which are not part of the desired state.
+        type: bool
+        default: false
+
+    max_workers:
+        description:
+            - Number of requests in flight at the same time.
+        type: int
+        default: 8
+
+    batch_size:
+        description:
+            - Number of changes sent per batch.
+            - No further batch is sent once a change of a batch has failed, and the module fails returning
+              C(plan), C(diff) and C(failed_operations).
+        type: int
+        default: 50
+
+extends_documentation_fragment:
+    - pytoccaz.terraform_cloud.tfc_options
+
+author:
+  - Olivier Bernard (@pytoccaz)
+'''
+
+EXAMPLES = '''
+- name: Converge the variables of the workspaces described in a vars file
+  tfc_vars_reconcile:
+    token: "{{ lookup('ansible.builtin.env', 'TERRA_TOKEN') }}"
+    workspaces:
+      - workspace_id: "ws-c6FoAsJsrD5abMrS"
+        variables:
+          AWS_REGION:
+            value: eu-west-3
+            category: env
+          instance_count: "3"
+      - workspace_id: "ws-xBnHMe4tPvHg6cY4"
+        variables:
+          - key: instance_count
+            value: "5"
+
+- name: Show what a purge would change
+  tfc_vars_reconcile:
+    token: "{{ lookup('ansible.builtin.env', 'TERRA_TOKEN') }}"
+    workspaces: "{{ desired_workspaces }}"
+    purge: true
+  check_mode: true
+  register: plan
+'''
+
+RETURN = '''
+plan:
+    description:
+        - The keys of the variables to create, update and delete, per workspace ID.
+        - Workspaces already in the desired state are not listed.
+        - A sensitive variable with a desired value is always listed in C(update), as its current value can't be compared.
+    returned: success, or when a change failed
+    type: dict
+    sample:
+        ws-c6FoAsJsrD5abMrS:
+            create: [AWS_REGION]
+            update: [instance_count]
+            delete: []
+diff:
+    description:
+        - The attributes of the changed variables before and after, per workspace ID then variable key.
+        - Sensitive values are hidden.
+    returned: success, or when a change failed
+    type: dict
+failed_operations:
+    description:
+        - The changes of the failed batch which were rejected, with the error of each of them.
+        - The changes of the following batches were not sent.
+    returned: when a change failed
+    type: list
+    elements: dict
+    sample:
+        - method: PATCH
+          path: /workspaces/ws-c6FoAsJsrD5abMrS/vars/var-EavQ1LztoRTQHSNT
+          msg: "Error 422 ..."
+tfc_metrics:
+    description:
+        - Statistics of the API requests sent by the module, see the C(metrics) option.
+    returned: when C(metrics=true)
+    type: dict
+    version_added: 2.2.0
+'''
+import asyncio
+
+from ..module_utils.tfc import (TfcError, get_metrics, metrics_result, normalize_variables, var_changes, var_diff,
+                                vars_by_key)
+from ..module_utils.tfc_async import AsyncTfcClient
+from ansible.module_utils.basic import AnsibleModule
+
+WORKSPACE_VAR_PATH = "/workspaces/{workspace_id}/vars/{variable_id}"
+WORKSPACE_VARS_PATH = "/workspaces/{workspace_id}/vars"
+
+
+def desired_state(workspaces):
+    desired = {}
+    duplicates = set()
+    for workspace in workspaces:
+        workspace_id = workspace['workspace_id']
+        if workspace_id in desired:
+            duplicates.add(workspace_id)
+        desired[workspace_id] = dict(normalize_variables(workspace['variables']))
+    if duplicates:
+        raise TfcError('Duplicate workspace IDs in workspaces: %s.' % ', '.join(sorted(duplicates)))
+    return desired
+
+
+def build_plan(desired, current, purge):
+    """Compare desired and current variables, returning the plan, the diff and the operations to send."""
+    plan = {}
+    diff = {"before": {}, "after": {}}
+    operations = []
+
+    for workspace_id, variables in desired.items():
+        index = current[workspace_id]
+        steps = {"create": [], "update": [], "delete": []}
+        before = {}
+        after = {}
+
+        for key, attributes in variables.items():
+            if key not in index:
+                attributes = dict({"category": "terraform"}, **attributes)
+                attributes["key"] = key
+                steps["create"].append(key)
+                after[key] = var_diff({"attributes": {}}, attributes)["after"]
+                operations.append(("POST", WORKSPACE_VARS_PATH.format(workspace_id=workspace_id),
+                                   {"data": {"type": "vars", "attributes": attributes}}))
+            elif var_changes(index[key], attributes):
+                steps["update"].append(key)
+                var = var_diff(index[key], attributes)
+                before[key] = var["before"]
+                after[key] = var["after"]
+                operations.append(("PATCH", WORKSPACE_VAR_PATH.format(workspace_id=workspace_id,
+                                                                      variable_id=index[key]["id"]),
+                                   {"data": {"attributes": attributes}}))
+
+        if purge:
+            for key in index:
+                if key not in variables:
+                    steps["delete"].append(key)
+                    current_value = {"value": index[key]["attributes"].get("value")}
+                    before[key] = var_diff(index[key], current_value)["before"]
+                    operations.append(("DELETE", WORKSPACE_VAR_PATH.format(workspace_id=workspace_id,
+                                                                           variable_id=index[key]["id"]), None))
+
+        if any(steps.values()):
+            plan[workspace_id] = steps
+            diff["before"][workspace_id] = before
+            diff["after"][workspace_id] = after
+
+    return plan, diff, operations
+
+
+async def reconcile(module_params, check_mode=False):
+    validate_certs = module_params.get('validate_certs')
+    connection_timeout = module_params.get('connection_timeout')
+    batch_size = module_params.get('batch_size')
+
+    desired = desired_state(module_params.get('workspaces'))
+
+    async with AsyncTfcClient(module_params.get('api_token'), url=module_params.get('api_url'),
+                              max_concurrency=module_params.get('max_workers'),
+                              max_retries=module_params.get('max_retries'),
+                              rate_limit=module_params.get('rate_limit'),
+                              rate_limit_dir=module_params.get('rate_limit_dir'),
+                              metrics=get_metrics(module_params)) as client:
+
+        workspace_ids = list(desired)
+        responses = await asyncio.gather(*[
+            client.read(WORKSPACE_VARS_PATH.format(workspace_id=workspace_id),
+                        verify=validate_certs, timeout=connection_timeout)
+            for workspace_id in workspace_ids], return_exceptions=True)
+
+        errors = [str(response) for response in responses if isinstance(response, Exception)]
+        if errors:
+            raise TfcError('Listing the variables of %d of the %d workspaces failed: %s' % (
+                len(errors), len(workspace_ids), '; '.join(errors)))
+        current = dict((workspace_id, vars_by_key(response["data"]))
+                       for workspace_id, response in zip(workspace_ids, responses))
+
+        plan, diff, operations = build_plan(desired, current, module_params.get('purge'))
+        result = {"changed": len(operations) > 0, "plan": plan, "diff": diff}
+
+        if check_mode:
+            return result
+
+        for start in range(0, len(operations), batch_size):
+            batch = operations[start:start + batch_size]
+            outcomes = await asyncio.gather(*[
+                client.do_request(method, path, json_data=payload, verify=validate_certs, timeout=connection_timeout)
+                for method, path, payload in batch], return_exceptions=True)
+
+            failed = [{"method": method, "path": path, "msg": str(outcome)}
+                      for (method, path, payload), outcome in zip(batch, outcomes) if isinstance(outcome, Exception)]
+            if failed:
+                result.update(
+                    changed=start + len(batch) - len(failed) > 0,
+                    failed_operations=failed,
+                    msg='%d of the %d changes failed (%d sent before the failed batch): %s' % (
+                        len(failed), len(operations), start, '; '.join(operation["msg"] for operation in failed)))
+                break
+
+    return result
+
+
+def main():
+    """
+    Module tfc_vars_reconcile
+    """
+
+    argument_spec = dict(
+        api_url=dict(type='str', aliases=['url']),
+        api_token=dict(type='str', aliases=[
+                       'token'], required=True, no_log=True),
+        workspaces=dict(type='list', elements='dict', required=True, options=dict(
+            workspace_id=dict(type='str', required=True),
+            variables=dict(type='raw', required=True),
+        )),
+        purge=dict(type='bool', default=False),
+        max_workers=dict(type='int', default=8),
+        batch_size=dict(type='int', default=50),
+        validate_certs=dict(type='bool', default=True),
+        connection_timeout=dict(type='int', default=10),
+        max_retries=dict(type='int', default=3),
+        rate_limit=dict(type='int', default=30),
+        rate_limit_dir=dict(type='path'),
+        metrics=dict(type='bool', default=False),
+        metrics_file=dict(type='path'),
+    )
+
+    module = AnsibleModule(
+        argument_spec=argument_spec,
+        supports_check_mode=True,
+    )
+
+    try:
+        result = asyncio.run(reconcile(module.params, check_mode=module.check_mode))
+    except TfcError as e:
+        module.fail_json(msg=str(e), **metrics_result(module.params))
+
+    result.update(metrics_result(module.params))
+    if result.get("failed_operations"):
+        module.fail_json(**result)
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
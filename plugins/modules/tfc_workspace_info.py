@@ -20,6 +20,11 @@ version_added: 1.0.0
 
 description:
   - This module gives detail about one particuliar workspace given its ID or workspace name and organization.
+  - It can also gather many workspaces at once given a list of IDs and/or names with C(workspace_ids) and C(workspace_names).
+    The names are looked up with one listing of the organization filtered on their common prefix or suffix when this
+    takes fewer requests than reading them one by one, and the other workspaces are read concurrently.
+    When the listing would take more requests, the names found on its first page are kept and only the others are read.
+    Names without a common prefix or suffix are only listed when the organization is small enough.
   - See https://developer.hashicorp.com/terraform/cloud-docs/api-docs/workspaces#show-workspace.
 
 options:
@@ -31,6 +36,22 @@ options:
         aliases:
           - id
 
+    fields:
+        description:
+            - JSON:API sparse fieldsets restricting the attributes and relationships returned, per resource type.
+            - Maps a resource type (C(workspaces) or any included type) to the list of the fields to keep.
+            - The C(id) and C(type) of the resources are always returned.
+        type: dict
+        version_added: 2.2.0
+
+    include:
+        description:
+            - Related resources to sideload with the workspaces, for instance C(organization), C(current_run) or C(outputs).
+            - The sideloaded resources are returned in C(included), indexed by type and ID.
+        type: list
+        elements: str
+        version_added: 2.2.0
+
     organization:
         description:
             - The name of the organization the workspace belongs to.
@@ -47,8 +68,34 @@ options:
         aliases:
           - name
 
+    workspace_ids:
+        description:
+            - The IDs of workspaces to gather, returned in C(workspaces).
+            - Duplicates are read once.
+            - Mutually exclusive with C(workspace_id) and C(workspace_name).
+        type: list
+        elements: str
+        version_added: 2.2.0
+
+    workspace_names:
+        description:
+            - The names of workspaces of C(organization) to gather, returned in C(workspaces).
+            - Duplicates are read once.
+            - Mutually exclusive with C(workspace_id) and C(workspace_name).
+        type: list
+        elements: str
+        version_added: 2.2.0
+
+    max_workers:
+        description:
+            - Number of requests sent in parallel to gather C(workspace_ids) and C(workspace_names).
+        type: int
+        default: 4
+        version_added: 2.2.0
+
 extends_documentation_fragment:
     - pytoccaz.terraform_cloud.tfc_options
+    - pytoccaz.terraform_cloud.tfc_cache
 
 author:
   - Olivier Bernard (@pytoccaz)
@@ -65,20 +112,79 @@ EXAMPLES = '''
     workspace_name: "test"
     organization: "MyOrga"
     token: "{{ lookup('ansible.builtin.env', 'TERRA_TOKEN') }}"
+
+- name: Get a workspace queried from many hosts, at most once every 5 minutes
+  tfc_workspace_info:
+    workspace_id: "ws-c6FoAsJsrD5abMrS"
+    token: "{{ lookup('ansible.builtin.env', 'TERRA_TOKEN') }}"
+    cache_ttl: 300
+
+- name: Get the name and terraform version of a workspace along with its current run status
+  tfc_workspace_info:
+    workspace_id: "ws-c6FoAsJsrD5abMrS"
+    token: "{{ lookup('ansible.builtin.env', 'TERRA_TOKEN') }}"
+    fields:
+      workspaces: [name, terraform-version, current-run]
+      runs: [status]
+    include:
+      - current_run
+
+- name: Gather the facts of many workspaces in one task
+  tfc_workspace_info:
+    organization: "MyOrga"
+    workspace_names: "{{ groups['terraform'] | map('extract', hostvars, 'workspace') | list }}"
+    token: "{{ lookup('ansible.builtin.env', 'TERRA_TOKEN') }}"
+    max_workers: 8
+  register: facts
 '''
 
 RETURN = '''
 data:
     description:
         - The data attribute from HCP Terraform route C(GET /workspaces/:workspace_id) or C(GET /organizations/:organization_name/workspaces/:name).
-    returned: success
+    returned: when C(workspace_id) or C(workspace_name) is set
+    type: dict
+workspaces:
+    description:
+        - The data attribute of each workspace gathered with C(workspace_ids) and C(workspace_names), keyed by workspace ID.
+    returned: when C(workspace_ids) or C(workspace_names) is set
+    type: dict
+    version_added: 2.2.0
+included:
+    description:
+        - The resources sideloaded with C(include), indexed by type then ID.
+        - A resource related to many workspaces appears once.
+    returned: when C(include) is set
+    type: dict
+    version_added: 2.2.0
+tfc_metrics:
+    description:
+        - Statistics of the API requests sent by the module, see the C(metrics) option.
+    returned: when C(metrics=true)
     type: dict
+    version_added: 2.2.0
 '''
-from ..module_utils.tfc import TfcClient, TfcError
+import os
+
+from ..module_utils.tfc import (TfcClient, TfcError, POOL_MAXSIZE, client_options, concurrent_map, index_included,
+                                metrics_result, sparse_params)
 from ansible.module_utils.basic import AnsibleModule
 
 WORKSPACE_PATH_BY_WORKSPACES = "/workspaces/{workspace_id}"
 WORKSPACE_PATH_BY_ORGANIZATIONS = "/organizations/{organization}/workspaces/{workspace_name}"
+WORKSPACES_PATH = "/organizations/{organization}/workspaces"
+PAGE_SIZE = 100
+
+
+def name_filter(names):
+    """Return a wildcard matching all the names, narrowed on their common prefix or suffix, or None."""
+    prefix = os.path.commonprefix(names)
+    suffix = os.path.commonprefix([name[::-1] for name in names])[::-1]
+    if not prefix and not suffix:
+        return None
+    if len(prefix) >= len(suffix):
+        return prefix + '*'
+    return '*' + suffix
 
 
 def get_workspace(module_params):
@@ -89,6 +195,8 @@ def get_workspace(module_params):
     token = module_params.get('api_token')
     connection_timeout = module_params.get('connection_timeout')
     api_url = module_params.get('api_url')
+    fields = module_params.get('fields')
+    include = module_params.get('include')
 
     if workspace_id is not None:
         path = WORKSPACE_PATH_BY_WORKSPACES.format(workspace_id=workspace_id)
@@ -96,12 +204,102 @@ def get_workspace(module_params):
         path = WORKSPACE_PATH_BY_ORGANIZATIONS.format(
             workspace_name=workspace_name, organization=organization)
 
-    client = TfcClient(token, url=api_url)
-    r = client.read(path, verify=validate_certs, timeout=connection_timeout)
+    client = TfcClient(token, url=api_url, **client_options(module_params))
+    r = client.read(path, params=sparse_params(fields, include) or None,
+                    verify=validate_certs, timeout=connection_timeout)
+
+    if include:
+        r["included"] = index_included([r])
 
     return r
 
 
+def get_workspaces(module_params):
+    organization = module_params.get('organization')
+    validate_certs = module_params.get('validate_certs')
+    token = module_params.get('api_token')
+    connection_timeout = module_params.get('connection_timeout')
+    api_url = module_params.get('api_url')
+    fields = module_params.get('fields')
+    include = module_params.get('include')
+    max_workers = module_params.get('max_workers')
+
+    workspace_ids = list(dict.fromkeys(module_params.get('workspace_ids') or []))
+    workspace_names = list(dict.fromkeys(module_params.get('workspace_names') or []))
+
+    client = TfcClient(token, url=api_url, pool_maxsize=max(POOL_MAXSIZE, max_workers),
+                       **client_options(module_params))
+    params = sparse_params(fields, include)
+
+    workspaces = {}
+    documents = []
+
+    if workspace_names:
+        # the listing needs the names to pick the workspaces
+        listing_fields = dict(fields or {})
+        names = listing_fields.get('workspaces')
+        if names:
+            if not isinstance(names, (list, tuple)):
+                names = names.split(',')
+            if 'name' not in names:
+                listing_fields['workspaces'] = list(names) + ['name']
+        listing_params = [('page[size]', PAGE_SIZE)] + sparse_params(listing_fields, include)
+        path = WORKSPACES_PATH.format(organization=organization)
+
+        def read_page(number):
+            return client.read(path, params=listing_params + [('page[number]', number)],
+                               verify=validate_certs, timeout=connection_timeout)
+
+        wildcard = name_filter(workspace_names)
+        if wildcard is not None:
+            listing_params.append(('search[wildcard-name]', wildcard))
+            pages = [read_page(1)]
+            total_pages = ((pages[0].get("meta") or {}).get("pagination") or {}).get("total-pages") or 1
+        else:
+            # an unfiltered listing covers the whole organization: count it before reading any of it
+            probe = client.read(path, params=[('page[size]', 1), ('page[number]', 1), ('fields[workspaces]', 'name')],
+                                verify=validate_certs, timeout=connection_timeout)
+            total_count = ((probe.get("meta") or {}).get("pagination") or {}).get("total-count") or 0
+            pages = []
+            total_pages = (total_count + PAGE_SIZE - 1) // PAGE_SIZE
+
+        # listing the remaining pages must take fewer requests than reading the workspaces one by one
+        complete = total_pages - len(pages) < len(workspace_names)
+        if complete:
+            pages.extend(concurrent_map(read_page, range(len(pages) + 1, total_pages + 1), max_workers))
+
+        wanted = set(workspace_names)
+        for page in pages:
+            for workspace in page.get("data") or []:
+                if (workspace.get("attributes") or {}).get("name") in wanted or workspace["id"] in workspace_ids:
+                    workspaces[workspace["id"]] = workspace
+            documents.append(page)
+
+        found = set(workspace["attributes"]["name"] for workspace in workspaces.values())
+        missing = [name for name in workspace_names if name not in found]
+        if complete and missing:
+            raise TfcError('Workspaces %s not found in organization %s.' % (', '.join(missing), organization))
+        # the names not on the pages read are read one by one
+        workspace_names = missing
+
+    paths = [WORKSPACE_PATH_BY_WORKSPACES.format(workspace_id=workspace_id)
+             for workspace_id in workspace_ids if workspace_id not in workspaces]
+    paths.extend(WORKSPACE_PATH_BY_ORGANIZATIONS.format(organization=organization, workspace_name=workspace_name)
+                 for workspace_name in workspace_names)
+
+    for r in concurrent_map(lambda path: client.read(path, params=params or None, verify=validate_certs,
+                                                     timeout=connection_timeout), paths, max_workers):
+        workspaces[r["data"]["id"]] = r["data"]
+        documents.append(r)
+
+    result = {"workspaces": workspaces}
+    if include:
+        # a listing may also sideload resources related to workspaces which were not asked for
+        result["included"] = index_included(documents)
+
+    return result
+
+
 def main():
     """
     Module tfc_workspace_info
@@ -110,28 +308,47 @@ def main():
     argument_spec = dict(
         workspace_id=dict(type='str', aliases=['id']),
         workspace_name=dict(type='str', aliases=['name']),
+        workspace_ids=dict(type='list', elements='str'),
+        workspace_names=dict(type='list', elements='str'),
+        max_workers=dict(type='int', default=4),
         organization=dict(type='str'),
+        fields=dict(type='dict'),
+        include=dict(type='list', elements='str'),
         api_url=dict(type='str', aliases=['url']),
         api_token=dict(type='str', aliases=[
                        'token'], required=True, no_log=True),
         validate_certs=dict(type='bool', default=True),
         connection_timeout=dict(type='int', default=10),
+        max_retries=dict(type='int', default=3),
+        rate_limit=dict(type='int', default=30),
+        rate_limit_dir=dict(type='path'),
+        metrics=dict(type='bool', default=False),
+        metrics_file=dict(type='path'),
+        cache_ttl=dict(type='int', default=0),
+        cache_dir=dict(type='path'),
+        cache_max_size=dict(type='int', default=50),
     )
 
     module = AnsibleModule(
         argument_spec=argument_spec,
         supports_check_mode=True,
         mutually_exclusive=(['workspace_name', "workspace_id"], [
-                            'organization', "workspace_id"],),
-        required_together=(['organization', 'workspace_name'],),
-        required_one_of=(['workspace_name', "workspace_id"],),
+                            'organization', "workspace_id"],
+                            ['workspace_id', 'workspace_ids'], ['workspace_id', 'workspace_names'],
+                            ['workspace_name', 'workspace_ids'], ['workspace_name', 'workspace_names'],),
+        required_by={'workspace_name': 'organization', 'workspace_names': 'organization'},
+        required_one_of=(['workspace_name', "workspace_id", 'workspace_ids', 'workspace_names'],),
     )
 
     try:
-        result = get_workspace(module.params)
+        if module.params['workspace_ids'] is not None or module.params['workspace_names'] is not None:
+            result = get_workspaces(module.params)
+        else:
+            result = get_workspace(module.params)
     except TfcError as e:
-        module.fail_json(msg=str(e))
+        module.fail_json(msg=str(e), **metrics_result(module.params))
 
+    result.update(metrics_result(module.params))
     module.exit_json(**result)
 
 
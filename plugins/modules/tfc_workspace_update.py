@@ -50,6 +50,7 @@ options:
 extends_documentation_fragment:
     - pytoccaz.terraform_cloud.tfc_options
     - pytoccaz.terraform_cloud.tfc_payload
+    - pytoccaz.terraform_cloud.tfc_index
 
 author:
   - Olivier Bernard (@pytoccaz)
@@ -87,8 +88,15 @@ data:
         - The data attribute from HCP Terraform route C(PATCH /workspaces/:workspace_id) or C(PATCH /organizations/:organization_name/workspaces/:name)
     returned: success
     type: dict
+tfc_metrics:
+    description:
+        - Statistics of the API requests sent by the module, see the C(metrics) option.
+    returned: when C(metrics=true)
+    type: dict
+    version_added: 2.2.0
 '''
-from ..module_utils.tfc import TfcClient, TfcError
+from ..module_utils.tfc import TfcClient, TfcError, client_options, metrics_result
+from ..module_utils.tfc_index import get_name_index
 from ansible.module_utils.basic import AnsibleModule
 
 WORKSPACE_PATH_BY_WORKSPACES = "/workspaces/{workspace_id}"
@@ -120,10 +128,15 @@ def patch_workspace(module_params):
     else:
         payload = {"data": {"attributes": attributes}}
 
-    client = TfcClient(token, url=api_url)
+    client = TfcClient(token, url=api_url, **client_options(module_params))
     r = client.patch(path, json=payload, verify=validate_certs,
                      timeout=connection_timeout)
 
+    name_index = get_name_index(module_params)
+    if name_index is not None:
+        # the workspace may have been renamed
+        name_index.add_workspaces([r["data"]], organization=organization)
+
     return r
 
 
@@ -141,6 +154,14 @@ def main():
         organization=dict(type='str'),
         validate_certs=dict(type='bool', default=True),
         connection_timeout=dict(type='int', default=10),
+        max_retries=dict(type='int', default=3),
+        rate_limit=dict(type='int', default=30),
+        rate_limit_dir=dict(type='path'),
+        metrics=dict(type='bool', default=False),
+        metrics_file=dict(type='path'),
+        name_index=dict(type='bool', default=False),
+        name_index_ttl=dict(type='int', default=86400),
+        name_index_dir=dict(type='path'),
         data=dict(type='dict'),
         payload=dict(type='dict'),
         attributes=dict(type='dict'),
@@ -159,8 +180,9 @@ def main():
     try:
         result = patch_workspace(module.params)
     except TfcError as e:
-        module.fail_json(msg=str(e))
+        module.fail_json(msg=str(e), **metrics_result(module.params))
 
+    result.update(metrics_result(module.params))
     module.exit_json(**result)
 
 
@@ -20,6 +20,8 @@ version_added: 2.0.0
 
 description:
   - This module modifies a variable attached to a workspace.
+  - The current attributes of the variable are compared with the requested ones and no update is sent when they already match.
+  - Sensitive values are never returned by the API, so an update setting the value of a sensitive variable is always sent.
   - This module is an alternative to C(tfc_var_update).
   - See https://developer.hashicorp.com/terraform/cloud-docs/api-docs/workspace-variables#update-variables
 
@@ -27,8 +29,21 @@ options:
     workspace_id:
         description:
             - The ID of the workspace which the variable is associated.
+            - Mutually exclusive with C(workspace_name) option.
         type: str
-        required: true
+
+    workspace_name:
+        description:
+            - The name of the workspace which the variable is associated.
+            - Requires C(organization).
+        type: str
+        version_added: 2.2.0
+
+    organization:
+        description:
+            - The name of the organization of C(workspace_name).
+        type: str
+        version_added: 2.2.0
 
     variable_id:
         description:
@@ -44,9 +59,18 @@ options:
         aliases:
             - key
 
+    force:
+        description:
+            - Send the update without comparing it to the current attributes of the variable.
+            - With C(variable_id), or C(variable_key) found in the name index, this saves the request listing the workspace variables.
+        type: bool
+        default: false
+        version_added: 2.2.0
+
 extends_documentation_fragment:
     - pytoccaz.terraform_cloud.tfc_options
     - pytoccaz.terraform_cloud.tfc_payload
+    - pytoccaz.terraform_cloud.tfc_index
 
 author:
   - Olivier Bernard (@pytoccaz)
@@ -71,23 +95,64 @@ EXAMPLES = '''
     data:
       attributes:
         value: "value1"
+
+- name: Change the value of a variable by workspace name and variable key, resolved from the name index
+  tfc_workspace_var_update:
+    organization: myorga
+    workspace_name: myworkspace
+    variable_key: "var1"
+    force: true
+    name_index: true
+    token: "{{ lookup('ansible.builtin.env', 'TERRA_TOKEN') }}"
+    attributes:
+      value: "value1"
 '''
 
 RETURN = '''
 data:
     description:
         - The data attribute from HCP Terraform route C(PATCH /workspaces/:workspace_id/vars/:variable_id)
+        - The current variable when no update was needed.
+        - In check mode, the current variable merged with the requested attributes, sensitive values hidden.
     returned: success
     type: dict
+diff:
+    description:
+        - The requested attributes before and after the update.
+        - Sensitive values are hidden.
+    returned: when the current attributes were compared
+    type: dict
+    version_added: 2.2.0
+tfc_metrics:
+    description:
+        - Statistics of the API requests sent by the module, see the C(metrics) option.
+    returned: when C(metrics=true)
+    type: dict
+    version_added: 2.2.0
 '''
-from ..module_utils.tfc import TfcClient, TfcError
+from ..module_utils.tfc import (TfcClient, TfcError, client_options, metrics_result, var_changes, var_diff,
+                                vars_by_key)
+from ..module_utils.tfc_index import get_name_index, resolve_workspace_id
 from ansible.module_utils.basic import AnsibleModule
 
 WORKSPACE_VAR_PATH = "/workspaces/{workspace_id}/vars/{variable_id}"
 WORKSPACE_VARS_PATH = "/workspaces/{workspace_id}/vars"
 
 
-def update_var(module_params):
+def update_var(module_params, check_mode=False):
+    name_index = get_name_index(module_params)
+
+    try:
+        return _update_var(module_params, name_index, check_mode)
+    except TfcError as e:
+        if e.status != 404 or name_index is None or not name_index.hits:
+            raise
+        # an indexed ID is stale, resolve the names again
+        name_index.discard_hits()
+        return _update_var(module_params, name_index, check_mode)
+
+
+def _update_var(module_params, name_index, check_mode):
     api_url = module_params.get('api_url')
     workspace_id = module_params.get('workspace_id')
     variable_id = module_params.get('variable_id')
@@ -98,6 +163,7 @@ def update_var(module_params):
     data = module_params.get('data')
     attributes = module_params.get('attributes')
     payload = module_params.get('payload')
+    force = module_params.get('force')
 
     if payload is not None:
         pass
@@ -106,26 +172,63 @@ def update_var(module_params):
     else:
         payload = {"data": {"attributes": attributes}}
 
-    client = TfcClient(token, url=api_url)
+    client = TfcClient(token, url=api_url, **client_options(module_params))
+
+    if workspace_id is None:
+        workspace_id = resolve_workspace_id(client, name_index, module_params.get('organization'),
+                                            module_params.get('workspace_name'),
+                                            verify=validate_certs, timeout=connection_timeout)
+
+    if variable_key is not None and force and name_index is not None:
+        variable_id = name_index.var_id(workspace_id, variable_key)
 
-    if variable_key is not None:
+    result = {"changed": True}
+
+    if variable_id is None or not force:
         path = WORKSPACE_VARS_PATH.format(workspace_id=workspace_id)
         vars = client.read(path, verify=validate_certs,
                            timeout=connection_timeout)
-
-        try:
-            variable_id = list(filter(
-                lambda var: var["attributes"]["key"] == variable_key, vars["data"]))[0]["id"]
-        except IndexError as e:
-            raise TfcError('Variable with key %s not found.' % (variable_key))
+        if name_index is not None:
+            name_index.set_vars(workspace_id, vars["data"])
+
+        if variable_key is not None:
+            var = vars_by_key(vars["data"]).get(variable_key)
+            if var is None:
+                raise TfcError('Variable with key %s not found.' % (variable_key))
+        else:
+            try:
+                var = list(filter(
+                    lambda var: var["id"] == variable_id, vars["data"]))[0]
+            except IndexError:
+                raise TfcError('Variable with ID %s not found.' % (variable_id))
+        variable_id = var["id"]
+
+        if not force:
+            requested = (payload.get("data") or {}).get("attributes") or {}
+            result["diff"] = var_diff(var, requested)
+            if not var_changes(var, requested):
+                result.update(changed=False, data=var)
+                return result
+
+            if check_mode:
+                attributes = dict(var["attributes"], **result["diff"]["after"])
+                result.update(data=dict(var, attributes=attributes))
+
+    if check_mode:
+        return result
 
     path = WORKSPACE_VAR_PATH.format(
         workspace_id=workspace_id, variable_id=variable_id)
 
     r = client.patch(path, json=payload, verify=validate_certs,
                      timeout=connection_timeout)
+    result.update(r)
+
+    if name_index is not None:
+        # the key may have been changed by the update
+        name_index.add_vars(workspace_id, [r["data"]])
 
-    return r
+    return result
 
 
 def main():
@@ -139,9 +242,20 @@ def main():
                        'token'], required=True, no_log=True),
         variable_id=dict(type='str'),
         variable_key=dict(type='str', aliases=['key'], no_log=False),
-        workspace_id=dict(type='str', required=True),
+        workspace_id=dict(type='str'),
+        workspace_name=dict(type='str'),
+        organization=dict(type='str'),
+        force=dict(type='bool', default=False),
         validate_certs=dict(type='bool', default=True),
         connection_timeout=dict(type='int', default=10),
+        max_retries=dict(type='int', default=3),
+        rate_limit=dict(type='int', default=30),
+        rate_limit_dir=dict(type='path'),
+        metrics=dict(type='bool', default=False),
+        metrics_file=dict(type='path'),
+        name_index=dict(type='bool', default=False),
+        name_index_ttl=dict(type='int', default=86400),
+        name_index_dir=dict(type='path'),
         data=dict(type='dict'),
         payload=dict(type='dict'),
         attributes=dict(type='dict'),
@@ -151,16 +265,19 @@ def main():
         argument_spec=argument_spec,
         supports_check_mode=True,
         mutually_exclusive=(['payload', 'data', 'attributes'], [
-                            'variable_key', 'variable_id']),
+                            'variable_key', 'variable_id'], ['workspace_name', 'workspace_id'],
+                            ['organization', 'workspace_id']),
+        required_together=(['organization', 'workspace_name'],),
         required_one_of=(['payload', 'data', 'attributes'],
-                         ['variable_key', 'variable_id']),
+                         ['variable_key', 'variable_id'], ['workspace_name', 'workspace_id']),
     )
 
     try:
-        result = update_var(module.params)
+        result = update_var(module.params, check_mode=module.check_mode)
     except TfcError as e:
-        module.fail_json(msg=str(e))
+        module.fail_json(msg=str(e), **metrics_result(module.params))
 
+    result.update(metrics_result(module.params))
     module.exit_json(**result)
 
 
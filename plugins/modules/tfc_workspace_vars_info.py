@@ -33,6 +33,7 @@ options:
 
 extends_documentation_fragment:
     - pytoccaz.terraform_cloud.tfc_options
+    - pytoccaz.terraform_cloud.tfc_cache
 
 author:
   - Olivier Bernard (@pytoccaz)
@@ -52,8 +53,14 @@ data:
     returned: success
     type: list
     elements: dict
+tfc_metrics:
+    description:
+        - Statistics of the API requests sent by the module, see the C(metrics) option.
+    returned: when C(metrics=true)
+    type: dict
+    version_added: 2.2.0
 '''
-from ..module_utils.tfc import TfcClient, TfcError
+from ..module_utils.tfc import TfcClient, TfcError, client_options, metrics_result
 from ansible.module_utils.basic import AnsibleModule
 
 WORKSPACE_VARS_PATH = "/workspaces/{workspace_id}/vars"
@@ -68,7 +75,7 @@ def get_workspace_vars(module_params):
 
     path = WORKSPACE_VARS_PATH.format(workspace_id=workspace_id)
 
-    client = TfcClient(token, url=api_url)
+    client = TfcClient(token, url=api_url, **client_options(module_params))
     r = client.read(path, verify=validate_certs, timeout=connection_timeout)
 
     return r
@@ -86,6 +93,14 @@ def main():
         workspace_id=dict(type='str', aliases=['id'], required=True),
         validate_certs=dict(type='bool', default=True),
         connection_timeout=dict(type='int', default=10),
+        max_retries=dict(type='int', default=3),
+        rate_limit=dict(type='int', default=30),
+        rate_limit_dir=dict(type='path'),
+        metrics=dict(type='bool', default=False),
+        metrics_file=dict(type='path'),
+        cache_ttl=dict(type='int', default=0),
+        cache_dir=dict(type='path'),
+        cache_max_size=dict(type='int', default=50),
     )
 
     module = AnsibleModule(
@@ -96,8 +111,9 @@ def main():
     try:
         result = get_workspace_vars(module.params)
     except TfcError as e:
-        module.fail_json(msg=str(e))
+        module.fail_json(msg=str(e), **metrics_result(module.params))
 
+    result.update(metrics_result(module.params))
     module.exit_json(**result)
 
 
@@ -0,0 +1,280 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2024 Olivier Bernard (@pytoccaz)
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+DOCUMENTATION = '''
+---
+module: tfc_workspace_vars_update
+
+short_description: Terraform Cloud API (HCP Terraform) module to modify many workspace vars at once.
+
+version_added: 2.2.0
+
+description:
+  - This module modifies several variables attached to a workspace in one task.
+  - The variables of the workspace are listed once to resolve their keys, then the updates are sent concurrently.
+  - Only the variables whose attributes differ from the requested ones are updated.
+  - Sensitive values are never returned by the API, so an update setting the value of a sensitive variable is always sent,
+    and the variable is reported in C(updated) with C(changed=true) on every run.
+  - See https://developer.hashicorp.com/terraform/cloud-docs/api-docs/workspace-variables#update-variables
+
+seealso:
+    - module: pytoccaz.terraform_cloud.tfc_workspace_var_update
+
+options:
+    workspace_id:
+        description:
+            - The ID of the workspace which the variables are associated.
+            - Mutually exclusive with C(workspace_name) option.
+        type: str
+        aliases:
+          - id
+
+    workspace_name:
+        description:
+            - The name of the workspace which the variables are associated.
+            - Requires C(organization).
+        type: str
+
+    organization:
+        description:
+            - The name of the organization of C(workspace_name).
+        type: str
+
+    variables:
+        description:
+            - The variables to update.
+            - Either a dict mapping each variable key to its attributes, or a list of dicts each holding a C(key) item along with the attributes.
+            - A key appearing twice in the list makes the module fail before any change.
+            - A plain value instead of a dict of attributes is a shortcut for a dict with a single C(value) item.
+        type: raw
+        required: true
+
+    create_missing:
+        description:
+            - Create the variables whose key does not exist in the workspace.
+            - Created variables default to the C(terraform) category.
+            - When C(false), a missing key makes the module fail before any change.
+        type: bool
+        default: false
+
+    max_workers:
+        description:
+            - Number of update requests sent in parallel.
+        type: int
+        default: 4
+
+extends_documentation_fragment:
+    - pytoccaz.terraform_cloud.tfc_options
+    - pytoccaz.terraform_cloud.tfc_index
+
+author:
+  - Olivier Bernard (@pytoccaz)
+'''
+
+EXAMPLES = '''
+- name: Change the value of several variables
+  tfc_workspace_vars_update:
+    workspace_id: "ws-c6FoAsJsrD5abMrS"
+    token: "{{ lookup('ansible.builtin.env', 'TERRA_TOKEN') }}"
+    variables:
+      var1: "value1"
+      var2:
+        value: "value2"
+        sensitive: true
+
+- name: Change or create variables given as a list
+  tfc_workspace_vars_update:
+    workspace_id: "ws-c6FoAsJsrD5abMrS"
+    token: "{{ lookup('ansible.builtin.env', 'TERRA_TOKEN') }}"
+    create_missing: true
+    variables:
+      - key: AWS_REGION
+        value: eu-west-3
+        category: env
+      - key: instance_count
+        value: "3"
+        hcl: true
+'''
+
+RETURN = '''
+data:
+    description:
+        - The data attributes from HCP Terraform routes C(PATCH /workspaces/:workspace_id/vars/:variable_id)
+          and C(POST /workspaces/:workspace_id/vars), in the order of C(variables).
+        - In check mode, the attributes of a variable to create are returned with its sensitive value hidden.
+    returned: success
+    type: list
+    elements: dict
+updated:
+    description:
+        - The keys of the variables updated.
+        - Variables already matching the requested attributes are not listed.
+        - A sensitive variable with a requested C(value) is always listed, as its current value can't be compared.
+    returned: success
+    type: list
+    elements: str
+created:
+    description:
+        - The keys of the variables created.
+    returned: success
+    type: list
+    elements: str
+diff:
+    description:
+        - The attributes of the updated and created variables before and after the change, keyed by variable key.
+        - Sensitive values are hidden.
+    returned: success
+    type: dict
+tfc_metrics:
+    description:
+        - Statistics of the API requests sent by the module, see the C(metrics) option.
+    returned: when C(metrics=true)
+    type: dict
+    version_added: 2.2.0
+'''
+from ..module_utils.tfc import (TfcClient, TfcError, POOL_MAXSIZE, client_options, concurrent_map,
+                                metrics_result, normalize_variables, var_changes, var_diff, vars_by_key)
+from ..module_utils.tfc_index import get_name_index, resolve_workspace_id
+from ansible.module_utils.basic import AnsibleModule
+
+WORKSPACE_VAR_PATH = "/workspaces/{workspace_id}/vars/{variable_id}"
+WORKSPACE_VARS_PATH = "/workspaces/{workspace_id}/vars"
+
+
+def update_vars(module_params, check_mode=False):
+    name_index = get_name_index(module_params)
+
+    try:
+        return _update_vars(module_params, name_index, check_mode)
+    except TfcError as e:
+        if e.status != 404 or name_index is None or not name_index.hits:
+            raise
+        # the indexed workspace ID is stale, resolve the name again
+        name_index.discard_hits()
+        return _update_vars(module_params, name_index, check_mode)
+
+
+def _update_vars(module_params, name_index, check_mode):
+    api_url = module_params.get('api_url')
+    workspace_id = module_params.get('workspace_id')
+    validate_certs = module_params.get('validate_certs')
+    token = module_params.get('api_token')
+    connection_timeout = module_params.get('connection_timeout')
+    create_missing = module_params.get('create_missing')
+    max_workers = module_params.get('max_workers')
+
+    variables = normalize_variables(module_params.get('variables'))
+
+    client = TfcClient(token, url=api_url, pool_maxsize=max(POOL_MAXSIZE, max_workers),
+                       **client_options(module_params))
+
+    if workspace_id is None:
+        workspace_id = resolve_workspace_id(client, name_index, module_params.get('organization'),
+                                            module_params.get('workspace_name'),
+                                            verify=validate_certs, timeout=connection_timeout)
+
+    path = WORKSPACE_VARS_PATH.format(workspace_id=workspace_id)
+    vars = client.read(path, verify=validate_certs, timeout=connection_timeout)["data"]
+    if name_index is not None:
+        name_index.set_vars(workspace_id, vars)
+    index = vars_by_key(vars)
+
+    missing = list(dict.fromkeys(key for key, attributes in variables if key not in index))
+    if missing and not create_missing:
+        raise TfcError('Variables with keys %s not found.' % ', '.join(missing))
+
+    updated = list(dict.fromkeys(key for key, attributes in variables
+                                 if key in index and var_changes(index[key], attributes)))
+
+    def write(variable):
+        key, attributes = variable
+        if key in index:
+            if check_mode or key not in updated:
+                return index[key]
+            path = WORKSPACE_VAR_PATH.format(
+                workspace_id=workspace_id, variable_id=index[key]["id"])
+            return client.patch(path, json={"data": {"attributes": attributes}},
+                                verify=validate_certs, timeout=connection_timeout)["data"]
+
+        attributes = dict({"category": "terraform"}, **attributes)
+        attributes["key"] = key
+        if check_mode:
+            return {"type": "vars", "attributes": var_diff({"attributes": {}}, attributes)["after"]}
+        return client.create(WORKSPACE_VARS_PATH.format(workspace_id=workspace_id),
+                             json={"data": {"type": "vars", "attributes": attributes}},
+                             verify=validate_certs, timeout=connection_timeout)["data"]
+
+    data = list(concurrent_map(write, variables, max_workers))
+
+    if name_index is not None and not check_mode:
+        name_index.add_vars(workspace_id, data)
+
+    return {
+        "changed": len(updated) + len(missing) > 0,
+        "data": data,
+        "updated": updated,
+        "created": missing,
+        "diff": {
+            "before": dict((key, var_diff(index[key], attributes)["before"])
+                           for key, attributes in variables if key in updated),
+            "after": dict((key, var_diff(index.get(key, {"attributes": {}}), attributes)["after"])
+                          for key, attributes in variables if key in updated or key in missing),
+        },
+    }
+
+
+def main():
+    """
+    Module tfc_workspace_vars_update
+    """
+
+    argument_spec = dict(
+        api_url=dict(type='str', aliases=['url']),
+        api_token=dict(type='str', aliases=[
+                       'token'], required=True, no_log=True),
+        workspace_id=dict(type='str', aliases=['id']),
+        workspace_name=dict(type='str'),
+        organization=dict(type='str'),
+        variables=dict(type='raw', required=True),
+        create_missing=dict(type='bool', default=False),
+        max_workers=dict(type='int', default=4),
+        validate_certs=dict(type='bool', default=True),
+        connection_timeout=dict(type='int', default=10),
+        max_retries=dict(type='int', default=3),
+        rate_limit=dict(type='int', default=30),
+        rate_limit_dir=dict(type='path'),
+        metrics=dict(type='bool', default=False),
+        metrics_file=dict(type='path'),
+        name_index=dict(type='bool', default=False),
+        name_index_ttl=dict(type='int', default=86400),
+        name_index_dir=dict(type='path'),
+    )
+
+    module = AnsibleModule(
+        argument_spec=argument_spec,
+        supports_check_mode=True,
+        mutually_exclusive=(['workspace_name', 'workspace_id'], ['organization', 'workspace_id']),
+        required_together=(['organization', 'workspace_name'],),
+        required_one_of=(['workspace_name', 'workspace_id'],),
+    )
+
+    try:
+        result = update_vars(module.params, check_mode=module.check_mode)
+    except TfcError as e:
+        module.fail_json(msg=str(e), **metrics_result(module.params))
+
+    result.update(metrics_result(module.params))
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
@@ -22,6 +22,14 @@ description:
     - This module lists the workspaces in one organization.
     - See https://developer.hashicorp.com/terraform/cloud-docs/api-docs/workspaces#list-workspaces.
 options:
+    all_pages:
+        description:
+            - Follow the C(links.next) pagination links and return the workspaces of all the pages in one call.
+            - C(page_number) is then the first page fetched and C(page_size) the size of each page requested.
+        type: bool
+        default: false
+        version_added: 2.2.0
+
     direct_link:
         description:
             - A complet link with urlencoded parameters for pagination or search filters.
@@ -29,6 +37,38 @@ options:
         aliases:
             - link
 
+    fields:
+        description:
+            - JSON:API sparse fieldsets restricting the attributes and relationships returned, per resource type.
+            - Maps a resource type (C(workspaces) or any included type) to the list of the fields to keep.
+            - The C(id) and C(type) of the resources are always returned.
+        type: dict
+        version_added: 2.2.0
+
+    include:
+        description:
+            - Related resources to sideload with the workspaces, for instance C(organization), C(current_run) or C(outputs).
+            - The sideloaded resources are returned in C(included), indexed by type and ID.
+        type: list
+        elements: str
+        version_added: 2.2.0
+
+    max_items:
+        description:
+            - Maximum number of workspaces returned when C(all_pages=true).
+            - No more pages are requested once the cap is reached.
+        type: int
+        version_added: 2.2.0
+
+    max_workers:
+        description:
+            - Number of pages fetched in parallel when C(all_pages=true).
+            - Once the first page gives the total number of pages, the remaining ones are requested concurrently.
+            - Set to C(1) to walk the pages one after the other.
+        type: int
+        default: 4
+        version_added: 2.2.0
+
     organization:
         description:
             - The name of the organization the workspace belongs to.
@@ -51,6 +91,32 @@ options:
         aliases:
           - size
 
+    format:
+        description:
+            - Shape of C(data).
+            - C(resources) returns the workspaces as JSON:API resources, trimmed to C(projection) when set.
+            - C(flat) returns one flat dict per workspace, keyed by the C(projection) paths without their leading
+              C(attributes.) segment, for instance C(id), C(name) and C(relationships.project.data.id).
+            - C(columns) returns one list per C(projection) path under the same keys, the workspaces being
+              in the same order in every list. It is the cheapest shape to return and to filter in Jinja.
+            - C(flat) and C(columns) require C(projection). Each workspace is kept as a compact record from the time
+              it is received.
+        type: str
+        choices:
+            - resources
+            - flat
+            - columns
+        default: resources
+        version_added: 2.2.0
+
+    projection:
+        description:
+            - Dotted paths of the workspace fields to keep in the result, for instance C(id) or C(attributes.name).
+            - Each workspace is trimmed as soon as it is received, unlike C(fields) the full resources are still transferred.
+        type: list
+        elements: str
+        version_added: 2.2.0
+
     search_name:
         description:
             - Restricts results to workspaces with a name that matches the search string using a fuzzy search.
@@ -63,8 +129,20 @@ options:
         aliases:
           - search_wildcard
 
+    stream:
+        description:
+            - Walk all the pages like C(all_pages), decoding each response incrementally.
+            - Workspaces are projected one at a time as they arrive, so combined with C(projection)
+              the memory used stays flat whatever the number of workspaces.
+            - Pages are requested one after the other (C(max_workers) is ignored) and the responses are not cached.
+        type: bool
+        default: false
+        version_added: 2.2.0
+
 extends_documentation_fragment:
     - pytoccaz.terraform_cloud.tfc_options
+    - pytoccaz.terraform_cloud.tfc_cache
+    - pytoccaz.terraform_cloud.tfc_index
 
 author:
   - Olivier Bernard (@pytoccaz)
@@ -76,22 +154,90 @@ EXAMPLES = '''
       organization: myorga
       page_size: 10
       token: "{{ lookup('ansible.builtin.env', 'TERRA_TOKEN') }}"
+
+  - name: Get all the workspaces of orga myorga, 100 per request
+    tfc_workspaces_info:
+      organization: myorga
+      all_pages: true
+      page_size: 100
+      token: "{{ lookup('ansible.builtin.env', 'TERRA_TOKEN') }}"
+
+  - name: Get only the names and IDs of all the workspaces of orga myorga
+    tfc_workspaces_info:
+      organization: myorga
+      all_pages: true
+      page_size: 100
+      fields:
+        workspaces: [name]
+      token: "{{ lookup('ansible.builtin.env', 'TERRA_TOKEN') }}"
+
+  - name: Stream a large listing keeping the IDs, names and terraform versions only
+    tfc_workspaces_info:
+      organization: myorga
+      stream: true
+      page_size: 100
+      projection:
+        - id
+        - attributes.name
+        - attributes.terraform-version
+      token: "{{ lookup('ansible.builtin.env', 'TERRA_TOKEN') }}"
+
+  - name: Get the names and terraform versions of all the workspaces as columns
+    tfc_workspaces_info:
+      organization: myorga
+      stream: true
+      page_size: 100
+      format: columns
+      projection:
+        - attributes.name
+        - attributes.terraform-version
+      token: "{{ lookup('ansible.builtin.env', 'TERRA_TOKEN') }}"
+    register: listing
+
+  - name: Show the workspaces still on terraform 1.5
+    ansible.builtin.debug:
+      msg: "{{ listing.data.name | zip(listing.data['terraform-version']) | selectattr(1, 'match', '1[.]5[.]') | map('first') }}"
 '''
 
 RETURN = '''
     data:
         description:
             - The data attribute from HCP Terraform route C(GET /organizations/:organization_name/workspaces/:name).
+            - A dict of lists with C(format=columns).
         returned: success
-        type: list
-        elements: dict
+        type: raw
+    included:
+        description:
+            - The resources sideloaded with C(include), indexed by type then ID.
+            - A resource related to many workspaces appears once.
+        returned: when C(include) is set
+        type: dict
+        version_added: 2.2.0
+    tfc_metrics:
+        description:
+            - Statistics of the API requests sent by the module, see the C(metrics) option.
+        returned: when C(metrics=true)
+        type: dict
+        version_added: 2.2.0
 '''
-from ..module_utils.tfc import TfcClient, TfcError
+from ..module_utils.tfc import (TfcClient, TfcError, POOL_MAXSIZE, client_options, index_included,
+                                metrics_result, project, sparse_params)
+from ..module_utils.tfc_index import get_name_index
+from ..module_utils.tfc_records import record_type, to_columns
 from ansible.module_utils.basic import AnsibleModule
 
 WORKSPACES_PATH = "/organizations/{organization}/workspaces"
 
 
+def shape(r, record, output_format):
+    """Turn the records of C(data) into flat dicts or columns."""
+    if output_format == 'flat':
+        r["data"] = [item.as_dict() for item in r["data"]]
+    elif output_format == 'columns':
+        r["data"] = to_columns(record, r["data"])
+    return r
+
+
 def get_workspaces(module_params):
     organization = module_params.get('organization')
     validate_certs = module_params.get('validate_certs')
@@ -103,6 +249,14 @@ def get_workspaces(module_params):
     direct_link = module_params.get('direct_link')
     search_name = module_params.get('search_name')
     search_wildcard = module_params.get('search_wildcard_name')
+    all_pages = module_params.get('all_pages')
+    max_items = module_params.get('max_items')
+    max_workers = module_params.get('max_workers')
+    fields = module_params.get('fields')
+    include = module_params.get('include')
+    projection = module_params.get('projection')
+    stream = module_params.get('stream')
+    output_format = module_params.get('format')
 
     params = None
 
@@ -117,11 +271,71 @@ def get_workspaces(module_params):
         elif search_wildcard is not None:
             params.append(('search[wildcard-name]', search_wildcard))
 
-    client = TfcClient(token, url=api_url)
-    r = client.read(path, params=params, verify=validate_certs,
-                    timeout=connection_timeout)
+    if fields or include:
+        params = (params or []) + sparse_params(fields, include)
+
+    record = None
+    trim = None
+    if output_format in ('flat', 'columns'):
+        try:
+            record = record_type(projection)
+        except ValueError as e:
+            raise TfcError(str(e))
+        trim = record.from_resource
+    elif projection:
+        def trim(item):
+            return project(item, projection)
+
+    client = TfcClient(token, url=api_url, pool_maxsize=max(POOL_MAXSIZE, max_workers),
+                       **client_options(module_params))
+
+    name_index = get_name_index(module_params)
+    names = []
+
+    def remember(items):
+        # keep the names met for the name index, before the projection drops them
+        for item in items:
+            if name_index is not None:
+                names.append({"id": item["id"], "attributes": {"name": (item.get("attributes") or {}).get("name")}})
+            yield item
+
+    if stream:
+        items = remember(client.stream_items(path, params=params, max_items=max_items,
+                                             verify=validate_certs, timeout=connection_timeout))
+        if trim is not None:
+            items = (trim(item) for item in items)
+        r = {"data": list(items)}
+        if name_index is not None:
+            name_index.add_workspaces(names, organization=organization)
+        return shape(r, record, output_format)
+
+    if all_pages:
+        data = []
+        included = {}
+        for page in client.pages(path, params=params, max_items=max_items, max_workers=max_workers,
+                                 verify=validate_certs, timeout=connection_timeout):
+            items = list(remember(page.get("data") or []))
+            if trim is not None:
+                items = [trim(item) for item in items]
+            data.extend(items)
+            index_included([page], included)
+
+        r = {"data": data[:max_items] if max_items is not None else data}
+    else:
+        r = client.read(path, params=params, verify=validate_certs,
+                        timeout=connection_timeout)
+        included = index_included([r])
+        r["data"] = list(remember(r["data"]))
+        if trim is not None:
+            r["data"] = [trim(item) for item in r["data"]]
 
-    return r
+    if name_index is not None:
+        name_index.add_workspaces(names, organization=organization)
+
+    if include:
+        r["included"] = included
+
+    return shape(r, record, output_format)
 
 
 def main():
@@ -130,7 +344,13 @@ def main():
     """
 
     argument_spec = dict(
+        all_pages=dict(type='bool', default=False),
         direct_link=dict(type='str', aliases=['link']),
+        fields=dict(type='dict'),
+        format=dict(type='str', choices=['resources', 'flat', 'columns'], default='resources'),
+        include=dict(type='list', elements='str'),
+        max_items=dict(type='int'),
+        max_workers=dict(type='int', default=4),
         organization=dict(type='str', required=True),
         api_url=dict(type='str', aliases=['url']),
         api_token=dict(type='str', aliases=[
@@ -138,9 +358,22 @@ def main():
         page_number=dict(type='int', aliases=['page'], default=1),
         page_size=dict(type='int', aliases=['size'], default=20),
         validate_certs=dict(type='bool', default=True),
+        projection=dict(type='list', elements='str'),
         search_name=dict(type='str'),
+        stream=dict(type='bool', default=False),
         search_wildcard_name=dict(type='str', aliases=['search_wildcard']),
         connection_timeout=dict(type='int', default=10),
+        max_retries=dict(type='int', default=3),
+        rate_limit=dict(type='int', default=30),
+        rate_limit_dir=dict(type='path'),
+        metrics=dict(type='bool', default=False),
+        metrics_file=dict(type='path'),
+        cache_ttl=dict(type='int', default=0),
+        cache_dir=dict(type='path'),
+        cache_max_size=dict(type='int', default=50),
+        name_index=dict(type='bool', default=False),
+        name_index_ttl=dict(type='int', default=86400),
+        name_index_dir=dict(type='path'),
     )
 
     module = AnsibleModule(
@@ -152,14 +385,20 @@ def main():
                             ['direct_link', 'search_name'],
                             ['direct_link', 'search_wildcard_name'],
                             ['search_name', 'search_wildcard_name'],
+                            ['stream', 'include'],
                             ]),
+        required_if=[
+            ('format', 'flat', ['projection']),
+            ('format', 'columns', ['projection']),
+        ],
     )
 
     try:
         result = get_workspaces(module.params)
     except TfcError as e:
-        module.fail_json(msg=str(e))
+        module.fail_json(msg=str(e), **metrics_result(module.params))
 
+    result.update(metrics_result(module.params))
     module.exit_json(**result)
 
 
@@ -0,0 +1,349 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2024 Olivier Bernard (@pytoccaz)
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+DOCUMENTATION = '''
+---
+module: tfc_workspaces_sync
+
+short_description: Terraform Cloud API (HCP Terraform) module to keep a local snapshot of the workspaces of an organization.
+
+version_added: 2.2.0
+
+description:
+  - This module keeps a snapshot of the workspaces of an organization in a local file, and returns the workspaces
+    added, modified and removed since the previous run.
+  - The snapshot records the C(updated-at) of each workspace. The workspaces are listed with their C(updated-at)
+    only, and only the workspaces updated after the snapshot or missing from it are read in full.
+  - The first run, or a run with more workspaces to read than pages in a full listing, reads the full listing instead.
+  - The API does not sort the workspaces by C(updated-at), so the listing is not cut at the last C(updated-at) seen.
+    Listing C(updated-at) alone keeps it small, and it also reveals the removed workspaces.
+  - The snapshot is a gzipped JSON file, created readable by its owner only.
+  - In check mode, the differences are returned and the snapshot is not written.
+  - See https://developer.hashicorp.com/terraform/cloud-docs/api-docs/workspaces#list-workspaces
+
+seealso:
+    - module: pytoccaz.terraform_cloud.tfc_workspaces_info
+
+options:
+    organization:
+        description:
+            - The name of the organization.
+        type: str
+        required: true
+
+    snapshot_file:
+        description:
+            - The file keeping the snapshot of the workspaces between runs.
+            - A missing file, or a snapshot of another organization or other C(fields), starts a new snapshot.
+        type: path
+        required: true
+
+    fields:
+        description:
+            - The workspace attributes kept in the snapshot, all of them by default.
+            - C(name) and C(updated-at) are always kept.
+        type: list
+        elements: str
+
+    page_size:
+        description:
+            - Size of the pages of the listings.
+        type: int
+        default: 100
+
+    max_workers:
+        description:
+            - Number of listing pages and workspace reads sent in parallel.
+        type: int
+        default: 4
+
+extends_documentation_fragment:
+    - pytoccaz.terraform_cloud.tfc_options
+
+author:
+  - Olivier Bernard (@pytoccaz)
+'''
+
+EXAMPLES = '''
+- name: Get the workspaces changed since the last run
+  tfc_workspaces_sync:
+    organization: myorga
+    snapshot_file: ~/.ansible/tfc_snapshots/myorga.json.gz
+    fields:
+      - terraform-version
+      - auto-apply
+      - execution-mode
+    token: "{{ lookup('ansible.builtin.env', 'TERRA_TOKEN') }}"
+  register: sync
+
+- name: Check the drift of the new and modified workspaces only
+  ansible.builtin.debug:
+    msg: "{{ item.attributes.name }} runs terraform {{ item.attributes['terraform-version'] }}"
+  loop: "{{ sync.added + sync.modified }}"
+'''
+
+RETURN = '''
+added:
+    description:
+        - The workspaces missing from the previous snapshot, with their C(id), C(attributes) and the IDs of
+          their C(relationships).
+    returned: success
+    type: list
+    elements: dict
+    sample:
+        - id: ws-c6FoAsJsrD5abMrS
+          attributes:
+              name: network-prod
+              terraform-version: 1.8.2
+              updated-at: "2024-05-02T09:41:03.125Z"
+          relationships:
+              project: prj-AwfuCJTkdai4xj9w
+modified:
+    description:
+        - The workspaces updated since the previous snapshot, like C(added).
+    returned: success
+    type: list
+    elements: dict
+removed:
+    description:
+        - The workspaces of the previous snapshot no longer in the organization, with their C(id) and C(attributes).
+    returned: success
+    type: list
+    elements: dict
+diff:
+    description:
+        - The attributes of the modified workspaces which differ from the snapshot, before and after, keyed by
+          workspace name.
+    returned: success
+    type: dict
+count:
+    description:
+        - The number of workspaces in the snapshot.
+    returned: success
+    type: int
+watermark:
+    description:
+        - The most recent C(updated-at) of the snapshot.
+    returned: success
+    type: str
+    sample: "2024-05-02T09:41:03.125Z"
+read:
+    description:
+        - The number of workspaces read in full, or C(all) when the full listing was read.
+    returned: success
+    type: raw
+tfc_metrics:
+    description:
+        - Statistics of the API requests sent by the module, see the C(metrics) option.
+    returned: when C(metrics=true)
+    type: dict
+'''
+import gzip
+import json
+import os
+import tempfile
+
+from ..module_utils.tfc import (TfcClient, TfcError, POOL_MAXSIZE, client_options, concurrent_map,
+                                metrics_result, sparse_params)
+from ansible.module_utils.basic import AnsibleModule
+
+WORKSPACES_PATH = "/organizations/{organization}/workspaces"
+WORKSPACE_PATH_BY_WORKSPACES = "/workspaces/{workspace_id}"
+SNAPSHOT_VERSION = 1
+
+
+def load_snapshot(path, organization, fields):
+    try:
+        with gzip.open(path, 'rt') as f:
+            snapshot = json.load(f)
+    except (IOError, OSError, ValueError, EOFError):
+        return {}
+
+    if (snapshot.get("version") != SNAPSHOT_VERSION or snapshot.get("organization") != organization
+            or snapshot.get("fields") != fields):
+        return {}
+    return snapshot.get("workspaces") or {}
+
+
+def save_snapshot(path, organization, fields, workspaces):
+    directory = os.path.dirname(path) or '.'
+    try:
+        os.makedirs(directory, 0o700)
+    except OSError:
+        if not os.path.isdir(directory):
+            raise TfcError('Cannot create the directory of snapshot_file %s.' % path)
+
+    snapshot = {"version": SNAPSHOT_VERSION, "organization": organization, "fields": fields,
+                "workspaces": workspaces}
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as raw:
+            with gzip.GzipFile(fileobj=raw, mode='wb') as f:
+                f.write(json.dumps(snapshot, separators=(',', ':')).encode('utf-8'))
+        os.rename(tmp_path, path)
+    except (IOError, OSError) as e:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise TfcError('Cannot write snapshot_file %s: %s' % (path, str(e)))
+
+
+def compact(workspace):
+    """Keep the attributes of a workspace and the IDs of its relationships."""
+    relationships = {}
+    for name, relationship in (workspace.get("relationships") or {}).items():
+        data = (relationship or {}).get("data")
+        if isinstance(data, dict):
+            relationships[name] = data.get("id")
+        elif isinstance(data, list):
+            relationships[name] = [related.get("id") for related in data]
+    return {"id": workspace["id"], "attributes": workspace.get("attributes") or {}, "relationships": relationships}
+
+
+def updated_at(workspace):
+    return (workspace.get("attributes") or {}).get("updated-at")
+
+
+def sync_workspaces(module_params, check_mode=False):
+    organization = module_params.get('organization')
+    snapshot_file = module_params.get('snapshot_file')
+    validate_certs = module_params.get('validate_certs')
+    connection_timeout = module_params.get('connection_timeout')
+    page_size = module_params.get('page_size')
+    max_workers = module_params.get('max_workers')
+
+    fields = module_params.get('fields')
+    if fields is not None:
+        fields = sorted(set(fields) | set(["name", "updated-at"]))
+    field_params = sparse_params({"workspaces": fields}) if fields is not None else []
+
+    client = TfcClient(module_params.get('api_token'), url=module_params.get('api_url'),
+                       pool_maxsize=max(POOL_MAXSIZE, max_workers), **client_options(module_params))
+    path = WORKSPACES_PATH.format(organization=organization)
+
+    def full_listing():
+        return dict((workspace["id"], compact(workspace)) for workspace in client.items(
+            path, params=[('page[size]', page_size)] + field_params, max_workers=max_workers,
+            verify=validate_certs, timeout=connection_timeout))
+
+    previous = load_snapshot(snapshot_file, organization, fields)
+
+    if not previous:
+        current = full_listing()
+        read = "all"
+    else:
+        stamps = dict((workspace["id"], updated_at(workspace)) for workspace in client.items(
+            path, params=[('page[size]', page_size), ('fields[workspaces]', 'updated-at')], max_workers=max_workers,
+            verify=validate_certs, timeout=connection_timeout))
+        outdated = [workspace_id for workspace_id, stamp in stamps.items()
+                    if workspace_id not in previous or updated_at(previous[workspace_id]) != stamp]
+
+        if len(outdated) > (len(stamps) + page_size - 1) // page_size:
+            current = full_listing()
+            read = "all"
+        else:
+            def read_workspace(workspace_id):
+                try:
+                    return compact(client.read(WORKSPACE_PATH_BY_WORKSPACES.format(workspace_id=workspace_id),
+                                               params=field_params, verify=validate_certs,
+                                               timeout=connection_timeout)["data"])
+                except TfcError as e:
+                    # deleted since the listing
+                    if e.status == 404:
+                        return None
+                    raise
+
+            current = dict((workspace_id, previous[workspace_id]) for workspace_id in stamps
+                           if workspace_id in previous)
+            for workspace_id, workspace in zip(outdated, concurrent_map(read_workspace, outdated, max_workers)):
+                if workspace is None:
+                    current.pop(workspace_id, None)
+                else:
+                    current[workspace_id] = workspace
+            read = len(outdated)
+
+    added = []
+    modified = []
+    diff = {"before": {}, "after": {}}
+    for workspace_id, workspace in current.items():
+        before = previous.get(workspace_id)
+        if before is None:
+            added.append(workspace)
+        elif updated_at(before) != updated_at(workspace):
+            modified.append(workspace)
+            name = workspace["attributes"].get("name", workspace_id)
+            names = [key for key in sorted(set(before["attributes"]) | set(workspace["attributes"]))
+                     if before["attributes"].get(key) != workspace["attributes"].get(key)]
+            diff["before"][name] = dict((key, before["attributes"].get(key)) for key in names)
+            diff["after"][name] = dict((key, workspace["attributes"].get(key)) for key in names)
+
+    removed = [dict(id=workspace_id, attributes=workspace["attributes"])
+               for workspace_id, workspace in previous.items() if workspace_id not in current]
+
+    changed = bool(added or modified or removed)
+    if changed and not check_mode:
+        save_snapshot(snapshot_file, organization, fields, current)
+
+    stamps = [updated_at(workspace) for workspace in current.values() if updated_at(workspace)]
+
+    return {
+        "changed": changed,
+        "added": added,
+        "modified": modified,
+        "removed": removed,
+        "diff": diff,
+        "count": len(current),
+        "watermark": max(stamps) if stamps else None,
+        "read": read,
+    }
+
+
+def main():
+    """
+    Module tfc_workspaces_sync
+    """
+
+    argument_spec = dict(
+        api_url=dict(type='str', aliases=['url']),
+        api_token=dict(type='str', aliases=[
+                       'token'], required=True, no_log=True),
+        organization=dict(type='str', required=True),
+        snapshot_file=dict(type='path', required=True),
+        fields=dict(type='list', elements='str'),
+        page_size=dict(type='int', default=100),
+        max_workers=dict(type='int', default=4),
+        validate_certs=dict(type='bool', default=True),
+        connection_timeout=dict(type='int', default=10),
+        max_retries=dict(type='int', default=3),
+        rate_limit=dict(type='int', default=30),
+        rate_limit_dir=dict(type='path'),
+        metrics=dict(type='bool', default=False),
+        metrics_file=dict(type='path'),
+    )
+
+    module = AnsibleModule(
+        argument_spec=argument_spec,
+        supports_check_mode=True,
+    )
+
+    try:
+        result = sync_workspaces(module.params, check_mode=module.check_mode)
+    except TfcError as e:
+        module.fail_json(msg=str(e), **metrics_result(module.params))
+
+    result.update(metrics_result(module.params))
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,297 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2024 Olivier Bernard (@pytoccaz)
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+DOCUMENTATION = '''
+---
+module: tfc_workspaces_update
+
+short_description: Terraform Cloud API (HCP Terraform) module to update many workspaces at once.
+
+version_added: 2.2.0
+
+description:
+  - This module applies the same settings to all the workspaces of an organization matching a selector.
+  - One of C(workspace_ids), C(search_wildcard_name), C(search_tags) or C(project_id) is required, unless
+    C(all_workspaces=true) opts in to update the whole organization.
+  - The target workspaces are resolved with one paginated listing, restricted to the fields being updated.
+  - Only the workspaces whose current attributes differ from the requested ones are updated, concurrently.
+  - In check mode, the drifted workspaces and their diff are returned and nothing is changed.
+  - See https://developer.hashicorp.com/terraform/cloud-docs/api-docs/workspaces#update-a-workspace
+
+seealso:
+    - module: pytoccaz.terraform_cloud.tfc_workspace_update
+
+options:
+    organization:
+        description:
+            - The name of the organization the workspaces belong to.
+        type: str
+        required: true
+
+    workspace_ids:
+        description:
+            - Restricts the update to the workspaces with these IDs.
+            - The module fails if one of them is not part of the selected workspaces.
+        type: list
+        elements: str
+
+    search_wildcard_name:
+        description:
+            - Restricts the update to workspaces with partial name matching, using * on prefix, suffix, or both.
+        type: str
+        aliases:
+          - search_wildcard
+
+    search_tags:
+        description:
+            - Restricts the update to workspaces holding all these tags.
+        type: list
+        elements: str
+
+    project_id:
+        description:
+            - Restricts the update to the workspaces of this project.
+        type: str
+
+    all_workspaces:
+        description:
+            - Update all the workspaces of the organization when no selector is given.
+            - Protects against updating the whole organization by leaving out a selector by mistake.
+        type: bool
+        default: false
+
+    attributes:
+        description:
+            - The workspace attributes to set, for instance C(terraform-version) or C(auto-apply).
+            - For an attribute holding a dict, such as C(vcs-repo), only the given sub-keys are compared.
+        type: dict
+        required: true
+
+    page_size:
+        description:
+            - Size of the pages of the listing resolving the workspaces.
+        type: int
+        default: 100
+
+    max_workers:
+        description:
+            - Number of listing pages and update requests sent in parallel.
+        type: int
+        default: 4
+
+extends_documentation_fragment:
+    - pytoccaz.terraform_cloud.tfc_options
+    - pytoccaz.terraform_cloud.tfc_index
+
+author:
+  - Olivier Bernard (@pytoccaz)
+'''
+
+EXAMPLES = '''
+- name: Roll out a terraform version to all the production workspaces
+  tfc_workspaces_update:
+    organization: myorga
+    search_wildcard_name: "prod-*"
+    token: "{{ lookup('ansible.builtin.env', 'TERRA_TOKEN') }}"
+    attributes:
+      terraform-version: "1.8.2"
+
+- name: Show which workspaces of a project are not auto-applied
+  tfc_workspaces_update:
+    organization: myorga
+    project_id: "prj-AwfuCJTkdai4xj9w"
+    token: "{{ lookup('ansible.builtin.env', 'TERRA_TOKEN') }}"
+    attributes:
+      auto-apply: true
+  check_mode: true
+
+- name: Set the execution mode of every workspace of the organization
+  tfc_workspaces_update:
+    organization: myorga
+    all_workspaces: true
+    token: "{{ lookup('ansible.builtin.env', 'TERRA_TOKEN') }}"
+    attributes:
+      execution-mode: agent
+'''
+
+RETURN = '''
+data:
+    description:
+        - The data attributes from HCP Terraform route C(PATCH /workspaces/:workspace_id) for each updated workspace.
+        - In check mode, the drifted workspaces as listed.
+    returned: success
+    type: list
+    elements: dict
+updated:
+    description:
+        - The IDs of the workspaces updated (or to update in check mode).
+    returned: success
+    type: list
+    elements: str
+matched:
+    description:
+        - The number of workspaces matching the selector.
+    returned: success
+    type: int
+diff:
+    description:
+        - The requested attributes of each drifted workspace before and after, keyed by workspace name.
+    returned: success
+    type: dict
+tfc_metrics:
+    description:
+        - Statistics of the API requests sent by the module, see the C(metrics) option.
+    returned: when C(metrics=true)
+    type: dict
+    version_added: 2.2.0
+'''
+from ..module_utils.tfc import (TfcClient, TfcError, POOL_MAXSIZE, client_options, concurrent_map,
+                                metrics_result, sparse_params)
+from ..module_utils.tfc_index import get_name_index
+from ansible.module_utils.basic import AnsibleModule
+
+WORKSPACES_PATH = "/organizations/{organization}/workspaces"
+WORKSPACE_PATH_BY_WORKSPACES = "/workspaces/{workspace_id}"
+SELECTORS = ['workspace_ids', 'search_wildcard_name', 'search_tags', 'project_id']
+
+
+def requested_part(current, value):
+    """Project a current attribute on the keys of a requested dict value, recursively."""
+    if isinstance(value, dict) and isinstance(current, dict):
+        return dict((key, requested_part(current.get(key), item)) for key, item in value.items())
+    return current
+
+
+def patch_workspaces(module_params, check_mode=False):
+    organization = module_params.get('organization')
+    workspace_ids = module_params.get('workspace_ids')
+    validate_certs = module_params.get('validate_certs')
+    token = module_params.get('api_token')
+    connection_timeout = module_params.get('connection_timeout')
+    api_url = module_params.get('api_url')
+    attributes = module_params.get('attributes')
+    max_workers = module_params.get('max_workers')
+
+    if not module_params.get('all_workspaces') and all(not module_params.get(name) for name in SELECTORS):
+        raise TfcError('One of %s is required, or all_workspaces=true to update the whole organization.'
+                       % ', '.join(SELECTORS))
+
+    params = [('page[number]', 1), ('page[size]', module_params.get('page_size'))]
+    if module_params.get('search_wildcard_name') is not None:
+        params.append(('search[wildcard-name]', module_params.get('search_wildcard_name')))
+    if module_params.get('search_tags'):
+        params.append(('search[tags]', ','.join(module_params.get('search_tags'))))
+    if module_params.get('project_id') is not None:
+        params.append(('filter[project][id]', module_params.get('project_id')))
+    # the listing only needs what is compared
+    params.extend(sparse_params({"workspaces": ["name"] + sorted(attributes)}))
+
+    client = TfcClient(token, url=api_url, pool_maxsize=max(POOL_MAXSIZE, max_workers),
+                       **client_options(module_params))
+
+    workspaces = list(client.items(WORKSPACES_PATH.format(organization=organization), params=params,
+                                   max_workers=max_workers, verify=validate_certs, timeout=connection_timeout))
+
+    name_index = get_name_index(module_params)
+    if name_index is not None:
+        name_index.add_workspaces(workspaces, organization=organization)
+
+    if workspace_ids is not None:
+        wanted = set(workspace_ids)
+        workspaces = [workspace for workspace in workspaces if workspace["id"] in wanted]
+        missing = wanted - set(workspace["id"] for workspace in workspaces)
+        if missing:
+            raise TfcError('Workspaces %s not found among the selected workspaces.' % ', '.join(sorted(missing)))
+
+    drifted = []
+    diff = {"before": {}, "after": {}}
+    for workspace in workspaces:
+        current = workspace.get("attributes") or {}
+        changes = dict((name, value) for name, value in attributes.items()
+                       if requested_part(current.get(name), value) != value)
+        if changes:
+            drifted.append(workspace)
+            name = current.get("name", workspace["id"])
+            diff["before"][name] = dict((key, requested_part(current.get(key), value))
+                                        for key, value in changes.items())
+            diff["after"][name] = changes
+
+    result = {
+        "changed": len(drifted) > 0,
+        "matched": len(workspaces),
+        "updated": [workspace["id"] for workspace in drifted],
+        "diff": diff,
+        "data": drifted,
+    }
+
+    if check_mode:
+        return result
+
+    def patch(workspace):
+        path = WORKSPACE_PATH_BY_WORKSPACES.format(workspace_id=workspace["id"])
+        return client.patch(path, json={"data": {"attributes": attributes}},
+                            verify=validate_certs, timeout=connection_timeout)["data"]
+
+    result["data"] = list(concurrent_map(patch, drifted, max_workers))
+
+    if name_index is not None and "name" in attributes:
+        name_index.add_workspaces(result["data"], organization=organization)
+
+    return result
+
+
+def main():
+    """
+    Module tfc_workspaces_update
+    """
+
+    argument_spec = dict(
+        api_url=dict(type='str', aliases=['url']),
+        api_token=dict(type='str', aliases=[
+                       'token'], required=True, no_log=True),
+        organization=dict(type='str', required=True),
+        workspace_ids=dict(type='list', elements='str'),
+        search_wildcard_name=dict(type='str', aliases=['search_wildcard']),
+        search_tags=dict(type='list', elements='str'),
+        project_id=dict(type='str'),
+        all_workspaces=dict(type='bool', default=False),
+        attributes=dict(type='dict', required=True),
+        page_size=dict(type='int', default=100),
+        max_workers=dict(type='int', default=4),
+        validate_certs=dict(type='bool', default=True),
+        connection_timeout=dict(type='int', default=10),
+        max_retries=dict(type='int', default=3),
+        rate_limit=dict(type='int', default=30),
+        rate_limit_dir=dict(type='path'),
+        metrics=dict(type='bool', default=False),
+        metrics_file=dict(type='path'),
+        name_index=dict(type='bool', default=False),
+        name_index_ttl=dict(type='int', default=86400),
+        name_index_dir=dict(type='path'),
+    )
+
+    module = AnsibleModule(
+        argument_spec=argument_spec,
+        supports_check_mode=True,
+    )
+
+    try:
+        result = patch_workspaces(module.params, check_mode=module.check_mode)
+    except TfcError as e:
+        module.fail_json(msg=str(e), **metrics_result(module.params))
+
+    result.update(metrics_result(module.params))
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2024 Olivier Bernard
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'benchmarks'))
+
+from mock_tfc import MockServer, MockState  # noqa: E402
+
+
+@pytest.fixture
+def mock_tfc():
+    """Start the mock API of C(benchmarks/mock_tfc.py) in the background.
+
+    The fixture is a function taking the options of C(MockState) and
+    C(MockServer) (e.g. C(workspaces), C(run_duration), C(rate)) and
+    returning the started server, whose C(url) is the C(api_url) to use.
+    """
+    servers = []
+
+    def start(workspaces=10, vars=2, varsets=0, run_duration=1.0, webhook_loss=0.0, **options):
+        state = MockState('org', workspaces, vars, varsets, run_duration, webhook_loss)
+        server = MockServer(state, **options)
+        # a short poll interval keeps the shutdown of each server quick
+        threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+
+    for server in servers:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2024 Olivier Bernard
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import os
+import time
+
+from ansible_collections.pytoccaz.terraform_cloud.plugins.module_utils import tfc_cache
+from ansible_collections.pytoccaz.terraform_cloud.plugins.module_utils.tfc import TfcClient, TfcMetrics
+from ansible_collections.pytoccaz.terraform_cloud.plugins.module_utils.tfc_cache import TfcResponseCache
+
+WORKSPACE_PATH = '/workspaces/ws-%016d' % 1
+
+
+def test_ttl(tmp_path, monkeypatch):
+    cache = TfcResponseCache(60, str(tmp_path))
+    key = cache.key('token', 'url', None)
+    cache.put(key, {'data': 1}, '"etag"')
+
+    entry, fresh = cache.get(key)
+    assert fresh
+    assert entry['body'] == {'data': 1}
+    assert entry['etag'] == '"etag"'
+
+    now = time.time()
+    monkeypatch.setattr(tfc_cache.time, 'time', lambda: now + 61)
+    entry, fresh = cache.get(key)
+    assert not fresh
+    # an expired entry is kept for its revalidation
+    assert entry['body'] == {'data': 1}
+
+
+def test_missing_or_corrupt_entry(tmp_path):
+    cache = TfcResponseCache(60, str(tmp_path))
+    assert cache.get(cache.key('missing')) == (None, False)
+
+    key = cache.key('corrupt')
+    with open(os.path.join(str(tmp_path), key + '.json'), 'w') as f:
+        f.write('{"stored": ')
+    assert cache.get(key) == (None, False)
+
+
+def test_keys_differ_by_token_and_params(tmp_path):
+    cache = TfcResponseCache(60, str(tmp_path))
+    keys = set([
+        cache.key('token-1', 'url', None),
+        cache.key('token-2', 'url', None),
+        cache.key('token-1', 'url', [('page[number]', 2)]),
+    ])
+    assert len(keys) == 3
+
+
+def test_eviction_of_the_least_recently_used(tmp_path):
+    # entries of 300 KiB in a cache of 1 MiB
+    cache = TfcResponseCache(60, str(tmp_path), max_size=1)
+    body = {'data': 'x' * 300 * 1024}
+    keys = [cache.key(number) for number in range(4)]
+
+    past = time.time() - 100
+    for number, key in enumerate(keys[:3]):
+        cache.put(key, body)
+        os.utime(os.path.join(str(tmp_path), key + '.json'), (past + number, past + number))
+
+    # a read makes the oldest entry the most recently used
+    assert cache.get(keys[0])[0] is not None
+    cache.put(keys[3], body)
+
+    assert cache.get(keys[1]) == (None, False)
+    for key in (keys[0], keys[2], keys[3]):
+        assert cache.get(key)[0] is not None
+
+
+def test_client_reads_from_the_cache(mock_tfc, tmp_path):
+    server = mock_tfc()
+    client = TfcClient('token', url=server.url, rate_limit=0, cache_ttl=60, cache_dir=str(tmp_path))
+
+    first = client.read(WORKSPACE_PATH)
+    assert client.read(WORKSPACE_PATH) == first
+    assert server.state.requests == 1
+
+    # another token does not share the entries
+    other = TfcClient('other', url=server.url, rate_limit=0, cache_ttl=60, cache_dir=str(tmp_path))
+    other.read(WORKSPACE_PATH)
+    assert server.state.requests == 2
+
+
+def test_client_revalidates_with_the_etag(mock_tfc, tmp_path):
+    server = mock_tfc()
+    metrics = TfcMetrics()
+    client = TfcClient('token', url=server.url, rate_limit=0, cache_ttl=60, cache_dir=str(tmp_path),
+                       metrics=metrics)
+
+    first = client.read(WORKSPACE_PATH)
+    client.cache.ttl = 0
+
+    assert client.read(WORKSPACE_PATH) == first
+    assert [record['status'] for record in metrics.records] == [200, 304]
+
+    client.patch(WORKSPACE_PATH, json={'data': {'attributes': {'description': 'changed'}}})
+    assert client.read(WORKSPACE_PATH)['data']['attributes']['description'] == 'changed'
+    assert [record['status'] for record in metrics.records] == [200, 304, 200, 200]
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2024 Olivier Bernard
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import pytest
+
+from ansible_collections.pytoccaz.terraform_cloud.plugins.module_utils.tfc import TfcClient, TfcError
+
+WORKSPACES_PATH = '/organizations/org/workspaces'
+
+
+def workspace_ids(numbers):
+    return ['ws-%016d' % number for number in numbers]
+
+
+@pytest.mark.parametrize('max_workers', [1, 4])
+def test_items_walk_all_pages(mock_tfc, max_workers):
+    server = mock_tfc(workspaces=250)
+    client = TfcClient('token', url=server.url, rate_limit=0)
+
+    items = list(client.items(WORKSPACES_PATH, params=[('page[size]', 20)], max_workers=max_workers))
+
+    assert [item['id'] for item in items] == workspace_ids(range(250))
+
+
+@pytest.mark.parametrize('max_workers', [1, 4])
+@pytest.mark.parametrize('max_items', [1, 20, 45, 1000])
+def test_items_stop_at_max_items(mock_tfc, max_workers, max_items):
+    server = mock_tfc(workspaces=100)
+    client = TfcClient('token', url=server.url, rate_limit=0)
+
+    items = list(client.items(WORKSPACES_PATH, params=[('page[size]', 20)], max_items=max_items,
+                              max_workers=max_workers))
+
+    assert [item['id'] for item in items] == workspace_ids(range(min(max_items, 100)))
+
+
+def test_prefetch_reads_only_the_needed_pages(mock_tfc):
+    server = mock_tfc(workspaces=200)
+    client = TfcClient('token', url=server.url, rate_limit=0)
+
+    list(client.items(WORKSPACES_PATH, params=[('page[size]', 20)], max_items=45, max_workers=4))
+
+    assert server.state.requests == 3
+
+
+@pytest.mark.parametrize('params', [
+    {'page[size]': 20, 'search[name]': 'workspace-001'},
+    [('page[size]', 20), ('search[name]', 'workspace-001')],
+])
+def test_prefetch_params(mock_tfc, params):
+    server = mock_tfc(workspaces=250)
+    client = TfcClient('token', url=server.url, rate_limit=0)
+
+    items = list(client.items(WORKSPACES_PATH, params=params, max_workers=4))
+
+    assert [item['id'] for item in items] == workspace_ids(range(100, 200))
+
+
+def test_prefetch_from_a_next_link(mock_tfc):
+    server = mock_tfc(workspaces=100)
+    client = TfcClient('token', url=server.url, rate_limit=0)
+
+    first = client.read(WORKSPACES_PATH, params=[('page[size]', 20)])
+    items = list(client.items(first['links']['next'], max_workers=4))
+
+    assert [item['id'] for item in items] == workspace_ids(range(20, 100))
+
+
+def test_error_status(mock_tfc):
+    server = mock_tfc()
+    client = TfcClient('token', url=server.url, rate_limit=0)
+
+    with pytest.raises(TfcError) as e:
+        client.read('/workspaces/ws-unknown')
+
+    assert e.value.status == 404
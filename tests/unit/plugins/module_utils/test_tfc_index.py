@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2024 Olivier Bernard
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import time
+
+from ansible_collections.pytoccaz.terraform_cloud.plugins.module_utils import tfc_index
+from ansible_collections.pytoccaz.terraform_cloud.plugins.module_utils.tfc_index import TfcNameIndex, get_name_index
+from ansible_collections.pytoccaz.terraform_cloud.plugins.modules.tfc_workspace_var_update import update_var
+
+
+def workspace(workspace_id, name, organization=None):
+    resource = {'id': workspace_id, 'attributes': {'name': name}}
+    if organization is not None:
+        resource['relationships'] = {'organization': {'data': {'id': organization}}}
+    return resource
+
+
+def var(var_id, key):
+    return {'id': var_id, 'attributes': {'key': key}}
+
+
+def test_hits(tmp_path):
+    index = TfcNameIndex(str(tmp_path / 'index.json'))
+    index.add_workspaces([workspace('ws-1', 'network'), workspace('ws-2', 'compute', 'other')], organization='org')
+    index.add_workspaces([workspace('ws-3', 'storage', 'other')])
+    index.set_vars('ws-1', [var('var-1', 'region'), var('var-2', 'count')])
+
+    assert index.workspace_id('org', 'network') == 'ws-1'
+    # the organization given to add_workspaces wins over the relationships
+    assert index.workspace_id('org', 'compute') == 'ws-2'
+    assert index.workspace_id('other', 'storage') == 'ws-3'
+    assert index.var_id('ws-1', 'count') == 'var-2'
+    assert index.workspace_id('org', 'missing') is None
+    assert index.var_id('ws-2', 'region') is None
+
+    assert index.hits == [('workspaces', 'org', 'network'), ('workspaces', 'org', 'compute'),
+                          ('workspaces', 'other', 'storage'), ('vars', 'ws-1', 'count')]
+
+
+def test_persistence(tmp_path):
+    path = str(tmp_path / 'index.json')
+    first = TfcNameIndex(path)
+    second = TfcNameIndex(path)
+    first.add_workspaces([workspace('ws-1', 'network')], organization='org')
+    # a write merges the entries written by the other processes since the load
+    second.add_workspaces([workspace('ws-2', 'compute')], organization='org')
+
+    index = TfcNameIndex(path)
+    assert index.workspace_id('org', 'network') == 'ws-1'
+    assert index.workspace_id('org', 'compute') == 'ws-2'
+
+
+def test_staleness(tmp_path, monkeypatch):
+    index = TfcNameIndex(str(tmp_path / 'index.json'), ttl=60)
+    index.add_workspaces([workspace('ws-1', 'network')], organization='org')
+    index.add_vars('ws-1', [var('var-1', 'region')])
+
+    now = time.time()
+    monkeypatch.setattr(tfc_index.time, 'time', lambda: now + 61)
+    assert index.workspace_id('org', 'network') is None
+    assert index.var_id('ws-1', 'region') is None
+    assert index.hits == []
+
+
+def test_renames(tmp_path):
+    index = TfcNameIndex(str(tmp_path / 'index.json'))
+    index.add_workspaces([workspace('ws-1', 'network')], organization='org')
+    index.add_workspaces([workspace('ws-1', 'network-prod')], organization='org')
+    index.add_vars('ws-1', [var('var-1', 'region')])
+    index.add_vars('ws-1', [var('var-1', 'aws_region'), var('var-2', 'count')])
+
+    assert index.workspace_id('org', 'network') is None
+    assert index.workspace_id('org', 'network-prod') == 'ws-1'
+    assert index.var_id('ws-1', 'region') is None
+    assert index.var_id('ws-1', 'aws_region') == 'var-1'
+    assert index.var_id('ws-1', 'count') == 'var-2'
+
+
+def test_set_vars_replaces_the_listing(tmp_path):
+    index = TfcNameIndex(str(tmp_path / 'index.json'))
+    index.set_vars('ws-1', [var('var-1', 'region'), var('var-2', 'count')])
+    index.set_vars('ws-1', [var('var-2', 'count')])
+
+    assert index.var_id('ws-1', 'region') is None
+    assert index.var_id('ws-1', 'count') == 'var-2'
+
+
+def test_discard_hits(tmp_path):
+    path = str(tmp_path / 'index.json')
+    index = TfcNameIndex(path)
+    index.add_workspaces([workspace('ws-1', 'network'), workspace('ws-2', 'compute')], organization='org')
+
+    assert index.workspace_id('org', 'network') == 'ws-1'
+    index.discard_hits()
+
+    assert index.hits == []
+    assert index.workspace_id('org', 'network') is None
+    assert index.workspace_id('org', 'compute') == 'ws-2'
+    assert TfcNameIndex(path).workspace_id('org', 'network') is None
+
+
+def test_stale_id_resolved_again_after_a_404(mock_tfc, tmp_path):
+    server = mock_tfc()
+    module_params = dict(
+        api_url=server.url,
+        api_token='token',
+        organization='org',
+        workspace_name='workspace-00001',
+        variable_key='var_0',
+        attributes={'value': 'changed'},
+        force=False,
+        validate_certs=True,
+        connection_timeout=10,
+        rate_limit=0,
+        name_index=True,
+        name_index_dir=str(tmp_path),
+    )
+    # the workspace was deleted and created again since it was indexed
+    get_name_index(module_params).add_workspaces([workspace('ws-%016d' % 999, 'workspace-00001')],
+                                                 organization='org')
+
+    result = update_var(module_params)
+
+    assert result['changed']
+    assert result['data']['attributes']['value'] == 'changed'
+    index = get_name_index(module_params)
+    assert index.workspace_id('org', 'workspace-00001') == 'ws-%016d' % 1
+    assert index.var_id('ws-%016d' % 1, 'var_0') == 'var-%08d%08d' % (1, 0)
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2024 Olivier Bernard
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import json
+import multiprocessing
+import time
+
+import pytest
+
+from ansible_collections.pytoccaz.terraform_cloud.plugins.module_utils.tfc import (BACKOFF, BACKOFF_MAX, TfcClient,
+                                                                                   TfcError, TfcMetrics,
+                                                                                   TfcRateLimiter, TfcSharedRateLimiter,
+                                                                                   retry_delay, spread)
+
+
+def test_spread():
+    delays = [spread(2.0) for i in range(200)]
+    assert all(2.0 <= delay <= 2.0 + BACKOFF for delay in delays)
+    assert len(set(delays)) > 1
+
+
+@pytest.mark.parametrize('attempt', [0, 1, 3, 10])
+def test_retry_delay_backoff(attempt):
+    delay = min(BACKOFF_MAX, BACKOFF * 2 ** attempt)
+    for i in range(50):
+        assert delay <= retry_delay(attempt) <= 2 * delay
+
+
+@pytest.mark.parametrize('headers', [{'Retry-After': '3'}, {'X-RateLimit-Reset': '3.0'}])
+def test_retry_delay_waits_for_the_api(headers):
+    delays = [retry_delay(0, headers) for i in range(50)]
+    assert all(3.0 <= delay <= 3.0 + BACKOFF for delay in delays)
+    # the jitter comes on top of the instant given to all the throttled clients
+    assert len(set(delays)) > 1
+
+
+def test_retry_delay_ignores_invalid_headers():
+    assert BACKOFF <= retry_delay(0, {'Retry-After': 'Wed, 21 Oct 2015 07:28:00 GMT'}) <= 2 * BACKOFF
+
+
+def test_limiter_paces_the_requests():
+    limiter = TfcRateLimiter(10)
+    delays = [limiter.reserve() for i in range(15)]
+
+    assert delays[:10] == [0] * 10
+    assert delays[10:] == pytest.approx([0.1, 0.2, 0.3, 0.4, 0.5], abs=0.05)
+
+
+def test_limiter_update_lowers_the_rate():
+    limiter = TfcRateLimiter(30)
+    limiter.update({'X-RateLimit-Limit': '10', 'X-RateLimit-Remaining': '2'})
+
+    assert limiter.rate == 10
+    assert [limiter.reserve() for i in range(3)] == pytest.approx([0, 0, 0.1], abs=0.05)
+
+
+def test_limiter_update_never_raises_the_rate():
+    limiter = TfcRateLimiter(5)
+    limiter.update({'X-RateLimit-Limit': '30'})
+
+    assert limiter.rate == 5
+
+
+def test_limiter_update_blocks_until_the_reset():
+    limiter = TfcRateLimiter(30)
+    limiter.update({'X-RateLimit-Limit': '30', 'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': '2'})
+
+    assert 2 - 0.01 <= limiter.reserve() <= 2 + BACKOFF
+
+
+def test_limiter_block():
+    limiter = TfcRateLimiter(30)
+    limiter.block(1.5)
+    limiter.block(0.5)
+
+    assert limiter.reserve() == pytest.approx(1.5, abs=0.05)
+
+
+def test_retry_after_429(mock_tfc):
+    server = mock_tfc(rate=5)
+    metrics = TfcMetrics()
+    # the client does not pace itself: the mock answers 429 once its budget is spent
+    client = TfcClient('token', url=server.url, rate_limit=0, max_retries=10, metrics=metrics)
+
+    started = time.time()
+    for i in range(10):
+        client.read('/workspaces/ws-%016d' % i)
+
+    summary = metrics.summary()
+    assert summary['count'] == 10
+    assert summary['errors'] == 0
+    assert summary['throttled'] > 0
+    assert summary['retries'] == summary['throttled']
+    # past the 5 requests of the bucket, the mock allows 5 requests per second
+    assert time.time() - started >= 0.8
+
+
+def test_429_exhausting_the_retries(mock_tfc):
+    server = mock_tfc(rate=1)
+    client = TfcClient('token', url=server.url, rate_limit=0, max_retries=0)
+
+    client.read('/workspaces/ws-%016d' % 0)
+    with pytest.raises(TfcError) as e:
+        client.read('/workspaces/ws-%016d' % 0)
+
+    assert e.value.status == 429
+
+
+def test_shared_limiter_shares_the_tokens(tmp_path):
+    path = str(tmp_path / 'state' / 'bucket.json')
+    first = TfcSharedRateLimiter(path, 10)
+    second = TfcSharedRateLimiter(path, 10)
+
+    delays = [limiter.reserve() for i in range(5) for limiter in (first, second)]
+    assert delays == [0] * 10
+    assert second.reserve() == pytest.approx(0.1, abs=0.05)
+    assert first.reserve() == pytest.approx(0.2, abs=0.05)
+
+
+def test_shared_limiter_shares_the_updates(tmp_path):
+    path = str(tmp_path / 'bucket.json')
+    first = TfcSharedRateLimiter(path, 30)
+    second = TfcSharedRateLimiter(path, 30)
+
+    first.update({'X-RateLimit-Limit': '10', 'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': '2'})
+    assert 2 - 0.01 <= second.reserve() <= 2 + BACKOFF
+
+    with open(path) as state_file:
+        assert json.load(state_file)['rate'] == 10
+
+
+def test_shared_limiter_shares_the_blocks(tmp_path):
+    path = str(tmp_path / 'bucket.json')
+    TfcSharedRateLimiter(path, 30).block(1.5)
+
+    assert TfcSharedRateLimiter(path, 30).reserve() == pytest.approx(1.5, abs=0.05)
+
+
+def test_shared_limiter_keeps_the_lowest_rate(tmp_path):
+    path = str(tmp_path / 'bucket.json')
+    TfcSharedRateLimiter(path, 5).reserve()
+    limiter = TfcSharedRateLimiter(path, 30)
+
+    delays = [limiter.reserve() for i in range(6)]
+    assert delays[:4] == [0] * 4
+    assert delays[4:] == pytest.approx([0.2, 0.4], abs=0.05)
+
+
+def reserve_in_process(path, queue):
+    limiter = TfcSharedRateLimiter(path, 10)
+    queue.put([limiter.reserve() for i in range(5)])
+
+
+def test_shared_limiter_across_processes(tmp_path):
+    path = str(tmp_path / 'bucket.json')
+    context = multiprocessing.get_context('fork')
+    queue = context.Queue()
+    processes = [context.Process(target=reserve_in_process, args=(path, queue)) for i in range(4)]
+    for process in processes:
+        process.start()
+    delays = sorted(delay for process in processes for delay in queue.get(timeout=30))
+    for process in processes:
+        process.join()
+
+    # 20 reservations against a bucket of 10 tokens refilled at 10 per second
+    assert len(delays) == 20
+    assert delays[:10] == [0] * 10
+    assert delays[-1] >= 0.5
+    assert all(later - earlier <= 0.1 + 0.01 for earlier, later in zip(delays[10:], delays[11:]))
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2024 Olivier Bernard
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import pytest
+
+from ansible_collections.pytoccaz.terraform_cloud.plugins.module_utils.tfc_records import (flat_name, record_type,
+                                                                                            to_columns)
+
+RESOURCES = [
+    {'id': 'ws-1', 'type': 'workspaces',
+     'attributes': {'name': 'network', 'terraform-version': '1.5.7', 'vcs-repo': {'branch': 'main'}},
+     'relationships': {'project': {'data': {'id': 'prj-1'}}}},
+    {'id': 'ws-2', 'type': 'workspaces', 'attributes': {'name': 'compute', 'vcs-repo': None}},
+]
+
+PATHS = ['id', 'attributes.name', 'attributes.terraform-version', 'attributes.vcs-repo.branch',
+         'relationships.project.data.id']
+
+
+@pytest.mark.parametrize('path, name', [
+    ('attributes.name', 'name'),
+    ('attributes.vcs-repo.branch', 'vcs-repo.branch'),
+    ('id', 'id'),
+    ('relationships.project.data.id', 'relationships.project.data.id'),
+])
+def test_flat_name(path, name):
+    assert flat_name(path) == name
+
+
+def test_from_resource():
+    record = record_type(PATHS)
+
+    assert [record.from_resource(resource).as_dict() for resource in RESOURCES] == [
+        {'id': 'ws-1', 'name': 'network', 'terraform-version': '1.5.7', 'vcs-repo.branch': 'main',
+         'relationships.project.data.id': 'prj-1'},
+        # a missing path, or one going through a null value, gives None
+        {'id': 'ws-2', 'name': 'compute', 'terraform-version': None, 'vcs-repo.branch': None,
+         'relationships.project.data.id': None},
+    ]
+
+
+def test_records_have_no_dict():
+    item = record_type(PATHS).from_resource(RESOURCES[0])
+    assert not hasattr(item, '__dict__')
+    with pytest.raises(AttributeError):
+        item.other = 1
+
+
+def test_record_types_are_cached():
+    assert record_type(PATHS) is record_type(list(PATHS))
+    assert record_type(PATHS) is not record_type(PATHS[:2])
+
+
+def test_slots_of_clashing_names():
+    record = record_type(['attributes.a-b', 'attributes.a_b', 'attributes.1st'])
+
+    assert record._fields == ('a-b', 'a_b', '1st')
+    assert len(set(record.__slots__)) == 3
+    assert record.from_resource({'attributes': {'a-b': 1, 'a_b': 2, '1st': 3}}).values() == [1, 2, 3]
+
+
+def test_duplicate_fields():
+    with pytest.raises(ValueError):
+        record_type(['attributes.name', 'name'])
+
+
+def test_to_columns():
+    record = record_type(PATHS[:3])
+    records = [record.from_resource(resource) for resource in RESOURCES]
+
+    assert to_columns(record, records) == {
+        'id': ['ws-1', 'ws-2'],
+        'name': ['network', 'compute'],
+        'terraform-version': ['1.5.7', None],
+    }
+    assert to_columns(record, []) == {'id': [], 'name': [], 'terraform-version': []}
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2024 Olivier Bernard
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import json
+import random
+
+import pytest
+
+from ansible_collections.pytoccaz.terraform_cloud.plugins.module_utils.tfc_stream import (JsonDataStream,
+                                                                                           JsonStreamError)
+
+DOCUMENTS = [
+    {"data": []},
+    {"data": [], "meta": {"pagination": {"current-page": 1, "total-pages": 1}}},
+    {"data": [{"id": "ws-1", "attributes": {"name": "café ☃", "count": 1234.5, "ratio": -2.5e-3}}],
+     "count": 1234.5},
+    {"links": {"next": None}, "data": [0, -1, 12, 3.25, 6.02e23, -1E-7, True, False, None, "1234", [1, 2], {}],
+     "meta": {"total": 123456789}},
+    {"data": [{"id": "var-%d" % number, "attributes": {"key": "key-%d" % number, "value": "%d" % number * 3,
+                                                       "sensitive": number % 2 == 0}}
+              for number in range(50)],
+     "meta": {"pagination": {"current-page": 3, "total-count": 1234}}},
+    {"meta": {"count": 10}, "included": [{"id": "prj-1"}]},
+]
+
+
+def split(body, rng):
+    """Cut a body at random boundaries, in chunks of 1 to 8 bytes."""
+    chunks = []
+    start = 0
+    while start < len(body):
+        end = start + rng.randint(1, 8)
+        chunks.append(body[start:end])
+        start = end
+    return chunks
+
+
+def decode(chunks):
+    stream = JsonDataStream(chunks)
+    items = list(stream)
+    return items, stream.members
+
+
+@pytest.mark.parametrize('document', DOCUMENTS)
+@pytest.mark.parametrize('indent', [None, 2])
+def test_random_chunks(document, indent):
+    body = json.dumps(document, indent=indent, ensure_ascii=False).encode('utf-8')
+    expected_members = dict((name, value) for name, value in document.items() if name != 'data')
+
+    rng = random.Random(len(body))
+    for trial in range(200):
+        items, members = decode(split(body, rng))
+        assert items == document.get("data", [])
+        assert members == expected_members
+
+
+def test_every_boundary():
+    body = b'{"data":[1,-2.5,3e2,{"id":"x"}],"count":1234.5}'
+    for cut in range(1, len(body)):
+        items, members = decode([body[:cut], body[cut:]])
+        assert items == [1, -2.5, 300.0, {"id": "x"}]
+        assert members == {"count": 1234.5}
+
+
+def test_number_cut_at_dot():
+    items, members = decode([b'{"data":[{"id":"x"}],"count": 1234', b'.', b'5}'])
+    assert members == {"count": 1234.5}
+
+
+def test_number_cut_at_exponent():
+    items, members = decode([b'{"data":[12', b'e', b'-', b'3, 4', b']}'])
+    assert items == [0.012, 4]
+
+
+def test_trailing_whitespace():
+    items, members = decode([b'{"data":[1]}', b' \n', b'\t'])
+    assert items == [1]
+
+
+@pytest.mark.parametrize('chunks', [
+    [b'{"data":[1]}', b' x'],
+    [b'{"data":[1]}{}'],
+    [b'{}', b'[]'],
+])
+def test_trailing_garbage(chunks):
+    with pytest.raises(JsonStreamError):
+        decode(chunks)
+
+
+@pytest.mark.parametrize('chunks', [
+    [b'{"data":[1,2'],
+    [b'{"data":[1,2]'],
+    [b'{"data":[1 2]}'],
+    [b'{"count":12.}'],
+    [b'[1, 2]'],
+])
+def test_invalid_documents(chunks):
+    with pytest.raises(JsonStreamError):
+        decode(chunks)
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2024 Olivier Bernard
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import json
+import threading
+
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pytest
+
+from ansible_collections.pytoccaz.terraform_cloud.plugins.module_utils.tfc_webhook import (SIGNATURE_HEADER,
+                                                                                            WebhookListener,
+                                                                                            signature)
+
+TOKEN = 'secret'
+NOTIFICATION = {'run_id': 'run-1', 'notifications': [{'trigger': 'run:completed', 'run_status': 'applied'}]}
+
+
+@pytest.fixture
+def listener():
+    listener = WebhookListener(TOKEN).start()
+    yield listener
+    listener.stop()
+
+
+def post(listener, body, headers=None):
+    try:
+        with urlopen(Request(listener.url, data=body, headers=headers or {}), timeout=5) as response:
+            return response.status
+    except HTTPError as e:
+        return e.code
+
+
+def signed(body, token=TOKEN):
+    return {SIGNATURE_HEADER: signature(token, body)}
+
+
+def test_signature():
+    # HMAC-SHA512 hex digest, as sent by HCP Terraform
+    assert signature('token', b'{"run_id": "run-1"}') == (
+        '679b40615cf57ac41afcec9847ef9bba646b6b74fdc7aa74b8ff9cec2721f8ab'
+        'd33392731c7f8a422b914699726446fd59b014c8589870503ccaa8ac1c76d1d0')
+
+
+def test_listens_on_the_loopback(listener):
+    assert listener.url.startswith('http://127.0.0.1:')
+
+
+def test_signed_notification(listener):
+    body = json.dumps(NOTIFICATION).encode('utf-8')
+
+    assert post(listener, body, signed(body)) == 200
+    assert listener.received == 1
+    assert listener.rejected == 0
+    assert listener.take(['run-1', 'run-2']) == {'run-1': NOTIFICATION['notifications']}
+    assert listener.take(['run-1']) == {}
+
+
+@pytest.mark.parametrize('headers', [
+    {},
+    {SIGNATURE_HEADER: ''},
+    {SIGNATURE_HEADER: 'deadbeef'},
+    signed(b'{"run_id": "run-2"}'),
+    signed(json.dumps(NOTIFICATION).encode('utf-8'), token='other'),
+])
+def test_rejected_notification(listener, headers):
+    body = json.dumps(NOTIFICATION).encode('utf-8')
+
+    assert post(listener, body, headers) == 401
+    assert listener.rejected == 1
+    assert listener.received == 0
+    assert listener.take(['run-1']) == {}
+
+
+def test_invalid_json(listener):
+    body = b'{"run_id": '
+    assert post(listener, body, signed(body)) == 400
+    assert listener.rejected == 1
+
+
+def test_verification_request(listener):
+    # sent on the creation of a notification configuration, without a run
+    body = json.dumps({'run_id': None, 'notifications': [{'trigger': 'verification'}]}).encode('utf-8')
+    assert post(listener, body, signed(body)) == 200
+    assert listener.received == 0
+
+
+def test_wait(listener):
+    assert not listener.wait(['run-1'], 0.1)
+
+    body = json.dumps(NOTIFICATION).encode('utf-8')
+    timer = threading.Timer(0.1, post, args=(listener, body, signed(body)))
+    timer.start()
+    try:
+        assert listener.wait(['run-1'], 5)
+    finally:
+        timer.join()
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2024 Olivier Bernard
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from ansible_collections.pytoccaz.terraform_cloud.plugins.modules import tfc_run
+from ansible_collections.pytoccaz.terraform_cloud.plugins.modules.tfc_run import is_settled, poll, queue_runs
+
+
+def params(server, workspaces=3, **options):
+    module_params = dict(
+        api_url=server.url,
+        api_token='token',
+        workspace_ids=['ws-%016d' % number for number in range(workspaces)],
+        message='Queued by the tests',
+        attributes={'auto-apply': True},
+        wait=True,
+        wait_timeout=30,
+        poll_interval=0.05,
+        poll_interval_max=0.2,
+        max_workers=4,
+        wait_strategy='poll',
+        validate_certs=True,
+        connection_timeout=10,
+        rate_limit=0,
+    )
+    module_params.update(options)
+    return module_params
+
+
+def run(status, confirmable=False):
+    return {"attributes": {"status": status, "actions": {"is-confirmable": confirmable}}}
+
+
+def test_is_settled():
+    assert is_settled(run('applied'))
+    assert is_settled(run('errored'))
+    assert is_settled(run('policy_override'))
+    assert is_settled(run('planned', confirmable=True))
+    assert not is_settled(run('planned'))
+    assert not is_settled(run('applying'))
+
+
+def test_poll_backs_off_while_no_run_moves(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(tfc_run.time, 'sleep', sleeps.append)
+    statuses = ['plan_queued'] * 5 + ['planning', 'applied']
+
+    def read(pending):
+        return [run(statuses.pop(0)) for outcome in pending]
+
+    pending = [{"run_id": "run-1", "status": "pending", "settled": False, "polls": 0, "queued": 0}]
+    assert poll(pending, read, dict(poll_interval=1, poll_interval_max=3, wait_timeout=60)) == []
+
+    # a moving run brings the interval back to poll_interval
+    assert sleeps == [1, 1, 1.5, 2.25, 3, 3, 1]
+    assert pending[0]["polls"] == 7
+    assert pending[0]["status"] == "applied"
+
+
+def test_runs_applied(mock_tfc):
+    server = mock_tfc(run_duration=0.3)
+    result = queue_runs(params(server))
+
+    assert result['changed']
+    assert 'failed' not in result
+    assert result['statuses'] == {'applied': 3}
+    for outcome in result['runs']:
+        assert outcome['settled']
+        assert outcome['polls'] > 0
+        assert outcome['elapsed'] > 0
+        assert 'applied-at' in outcome['status_timestamps']
+        assert 'queued' not in outcome
+
+
+def test_runs_waiting_for_a_confirmation(mock_tfc):
+    server = mock_tfc(run_duration=0.3)
+    result = queue_runs(params(server, attributes={'auto-apply': False}))
+
+    assert result['statuses'] == {'planned': 3}
+    assert all(outcome['settled'] for outcome in result['runs'])
+
+
+def test_failed_runs(mock_tfc):
+    server = mock_tfc(run_duration=0.3)
+    result = queue_runs(params(server, message='fail on purpose'))
+
+    assert result['failed']
+    assert result['statuses'] == {'errored': 3}
+    assert result['msg'] == '0 runs could not be queued, 3 failed and 0 did not settle in 30 seconds.'
+
+
+def test_wait_timeout(mock_tfc):
+    server = mock_tfc(run_duration=30)
+    result = queue_runs(params(server, wait_timeout=1))
+
+    assert result['failed']
+    assert result['msg'] == '0 runs could not be queued, 0 failed and 3 did not settle in 1 seconds.'
+    assert not any(outcome['settled'] for outcome in result['runs'])
+
+
+def test_no_wait(mock_tfc):
+    server = mock_tfc(run_duration=30)
+    result = queue_runs(params(server, wait=False))
+
+    assert result['changed']
+    assert 'failed' not in result
+    assert all(outcome['run_id'] and outcome['polls'] == 0 for outcome in result['runs'])
+
+
+def test_workspace_not_found(mock_tfc):
+    server = mock_tfc(run_duration=0.3)
+    result = queue_runs(params(server, workspace_ids=['ws-%016d' % 0, 'ws-%016d' % 999]))
+
+    # the other runs are queued and waited for anyway
+    assert result['changed']
+    assert result['failed']
+    assert result['statuses'] == {'applied': 1}
+    assert result['runs'][1]['run_id'] is None
+    assert 'error' in result['runs'][1]
+
+
+def test_no_change_when_no_run_was_queued(mock_tfc):
+    server = mock_tfc()
+    result = queue_runs(params(server, workspace_ids=['ws-%016d' % 999]))
+
+    assert not result['changed']
+    assert result['failed']
+
+
+def test_check_mode(mock_tfc):
+    server = mock_tfc()
+    result = queue_runs(params(server), check_mode=True)
+
+    assert result['changed']
+    assert result['statuses'] == {}
+    assert server.state.runs == {}
+
+
+def test_webhook(mock_tfc):
+    server = mock_tfc(run_duration=0.5)
+    result = queue_runs(params(server, wait_strategy='webhook', webhook_host='127.0.0.1', webhook_port=0,
+                               webhook_create=True, webhook_grace=30))
+
+    assert result['changed']
+    assert 'failed' not in result
+    assert result['statuses'] == {'applied': 3}
+    assert result['webhooks']['received'] > 0
+    assert result['webhooks']['rejected'] == 0
+    for outcome in result['runs']:
+        assert outcome['settled']
+        assert outcome['notifications'] > 0
+        assert outcome['polls'] == 0
+    # the notification configurations live for the time of the task
+    assert server.state.notification_configurations == {}
+
+
+def test_webhook_lost_notifications_are_polled(mock_tfc):
+    server = mock_tfc(run_duration=0.3, webhook_loss=1.0)
+    result = queue_runs(params(server, wait_strategy='webhook', webhook_host='127.0.0.1', webhook_port=0,
+                               webhook_create=True, webhook_grace=0.5))
+
+    assert result['statuses'] == {'applied': 3}
+    assert result['webhooks']['received'] == 0
+    for outcome in result['runs']:
+        assert outcome['notifications'] == 0
+        assert outcome['polls'] > 0
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2024 Olivier Bernard
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import pytest
+
+from ansible_collections.pytoccaz.terraform_cloud.plugins.modules.tfc_workspaces_info import get_workspaces
+
+LISTINGS = [
+    dict(all_pages=False, page_size=100),
+    dict(all_pages=True, page_size=20, max_workers=1),
+    dict(all_pages=True, page_size=20, max_workers=4),
+    dict(stream=True, page_size=20),
+]
+
+
+def params(server, **options):
+    module_params = dict(
+        api_url=server.url,
+        api_token='token',
+        organization='org',
+        validate_certs=True,
+        connection_timeout=10,
+        rate_limit=0,
+        page_number=1,
+        page_size=20,
+        max_workers=1,
+        format='resources',
+    )
+    module_params.update(options)
+    return module_params
+
+
+@pytest.mark.parametrize('listing', LISTINGS)
+def test_flat(mock_tfc, listing):
+    server = mock_tfc(workspaces=50)
+    r = get_workspaces(params(server, format='flat', projection=['id', 'attributes.name'], **listing))
+
+    assert r['data'] == [{'id': 'ws-%016d' % number, 'name': 'workspace-%05d' % number} for number in range(50)]
+
+
+# max_items only caps the listings walking the pages
+@pytest.mark.parametrize('listing', LISTINGS[1:])
+def test_columns(mock_tfc, listing):
+    server = mock_tfc(workspaces=50)
+    r = get_workspaces(params(server, format='columns', projection=['id', 'attributes.name'], max_items=30,
+                              **listing))
+
+    assert r['data'] == {
+        'id': ['ws-%016d' % number for number in range(30)],
+        'name': ['workspace-%05d' % number for number in range(30)],
+    }
+
+
+def test_resources_projection(mock_tfc):
+    server = mock_tfc(workspaces=5)
+    r = get_workspaces(params(server, projection=['id', 'attributes.name']))
+
+    assert r['data'][0] == {'id': 'ws-%016d' % 0, 'attributes': {'name': 'workspace-%05d' % 0}}